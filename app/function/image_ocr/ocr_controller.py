@@ -1077,6 +1077,202 @@ class PPTImageReplacer:
                 logger.error(f"❌ 备用方案也失败: {str(backup_error)}")
 
 
+def ocr_extract_images(presentation_path: str,
+                       selected_pages: Optional[List[int]] = None):
+    """
+    OCR第一步：校验输入并提取PPT中的图片
+
+    Args:
+        presentation_path: PPT文件路径
+        selected_pages: 真实页码（第一页为1），None表示全篇处理
+
+    Returns:
+        (图片提取器, 临时目录, 图片映射)；提取器需由调用方在结束后 cleanup()
+    """
+    # 验证输入文件
+    if not os.path.exists(presentation_path):
+        raise FileNotFoundError(f"PPT文件不存在: {presentation_path}")
+
+    # 修正selected_pages为0-based索引
+    prs = Presentation(presentation_path)
+    total_slides = len(prs.slides)
+    if selected_pages is not None:
+        selected_pages = [p-1 for p in selected_pages if 1 <= p <= total_slides]
+        if not selected_pages:
+            logger.warning("selected_pages参数无有效页码，将处理全部页面")
+            selected_pages = None
+
+    # 1. 提取图片
+    logger.info("=" * 50)
+    logger.info("🔍 第一步：提取PPT中的图片")
+    logger.info("=" * 50)
+    extractor = PPTImageExtractor()
+    try:
+        temp_dir, image_mapping = extractor.extract_images_from_slides(
+            presentation_path, selected_pages
+        )
+    except Exception:
+        extractor.cleanup()
+        raise
+    if image_mapping:
+        logger.info(f"  图片提取完成，临时目录: {temp_dir}")
+    return extractor, temp_dir, image_mapping
+
+
+def ocr_recognize_and_translate(temp_dir: str,
+                                enable_translation: bool = True,
+                                target_language: str = "中文",
+                                source_language: str = "英文",
+                                enable_text_splitting: str = "False") -> Tuple[Dict, bool]:
+    """
+    OCR第二至五步：识别提取出的图片文字、可选分行、翻译并读取结果
+    只读写临时目录，不访问PPT文件，可与其他修改PPT的步骤并行执行
+
+    Args:
+        temp_dir: ocr_extract_images 返回的临时目录
+        enable_translation: 是否启用翻译功能
+        target_language: 目标语言
+        source_language: 源语言
+        enable_text_splitting: 是否启用文本行分割处理
+
+    Returns:
+        (更新后的图片映射, 翻译是否可用)
+    """
+    # 2. 调用qwen-vl-ocr的api进行图片的文字提取
+    logger.info("\n" + "=" * 50)
+    logger.info("🤖 第二步：调用OCR QWEN API进行文本识别")
+    logger.info("=" * 50)
+
+    folder_path = temp_dir  # 替换为你的图片文件夹路径
+    json_path = os.path.join(temp_dir, "image_mapping.json")  # 使用temp_dir作为文件夹路径
+    API_KEY = os.getenv("QWEN_API_KEY")
+
+    # 执行批量处理
+    process_folder_with_mapping(folder_path, json_path, API_KEY)
+
+    # 3. 文本行分割处理（可选）
+    if enable_text_splitting == "True_spliting":
+        logger.info("\n" + "=" * 50)
+        logger.info("✂️ 第三步：文本行分割处理")
+        logger.info("=" * 50)
+        
+        splitter = TextLineSplitter()
+        split_success = splitter.process_json_file(json_path)
+        
+        if split_success:
+            logger.info("  文本行分割完成")
+        else:
+            logger.warning("⚠️ 文本行分割失败，将使用原始文本继续处理")
+    else:
+        logger.info("\n" + "=" * 50)
+        logger.info("⏭️ 第三步：跳过文本行分割处理")
+        logger.info("=" * 50)
+        logger.info("  保持原始文本格式")
+
+    # 4. 翻译OCR识别结果
+    step_num = 4 if enable_text_splitting != "False" else 3
+    if enable_translation:
+        logger.info("\n" + "=" * 50)
+        logger.info(f"🌐 第{step_num}步：翻译识别结果 ({source_language} → {target_language})")
+        logger.info("=" * 50)
+        
+        translation_success = TranslationManager.translate_ocr_results(
+            temp_dir=temp_dir,
+            target_language=target_language,
+            source_language=source_language
+        )
+        
+        if translation_success:
+            logger.info(f"  翻译完成")
+            
+            # 显示翻译摘要
+            mapping_file = os.path.join(temp_dir, "image_mapping.json")
+            summary = TranslationManager.get_translation_summary(mapping_file)
+            if summary:
+                logger.info(f"📊 翻译摘要:")
+                logger.info(f"   - 总图片数: {summary.get('total_images', 0)}")
+                logger.info(f"   - 包含文本的图片: {summary.get('images_with_text', 0)}")
+                logger.info(f"   - 包含翻译的图片: {summary.get('images_with_translation', 0)}")
+                logger.info(f"   - 翻译成功率: {summary.get('translation_success_rate', 0):.1f}%")
+        else:
+            logger.warning("⚠️ 翻译失败，将只显示原文")
+            enable_translation = False
+
+    # 5. 读取更新后的映射文件
+    step_num = 5 if enable_translation else (4 if enable_text_splitting != "False" else 3)
+    logger.info(f"\n" + "=" * 50)
+    logger.info(f"📖 第{step_num}步：读取处理结果")
+    logger.info("=" * 50)
+    mapping_file = os.path.join(temp_dir, "image_mapping.json")
+    if not os.path.exists(mapping_file):
+        raise Exception(f"映射文件不存在: {mapping_file}")
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        updated_mapping = json.load(f)
+    logger.info("  处理结果读取完成")
+    
+    # 统计结果
+    ocr_count = 0
+    translation_count = 0
+    for slide_info in updated_mapping.values():
+        for image_info in slide_info.get("images", []):
+            if "all_text" in image_info and image_info["all_text"]:
+                ocr_count += 1
+                filename = image_info.get("filename", "未知文件")
+                text_preview = str(list(image_info["all_text"].values())[0])[:50] + "..."
+                logger.info(f"   📄 {filename}: {text_preview}")
+                
+                if enable_translation and "translated_text" in image_info and image_info["translated_text"]:
+                    translation_count += 1
+                    trans_preview = str(list(image_info["translated_text"].values())[0])[:50] + "..."
+                    logger.info(f"   🌐 翻译: {trans_preview}")
+    
+    logger.info(f"📊 共识别出 {ocr_count} 张包含文本的图片")
+    if enable_translation:
+        logger.info(f"📊 共翻译了 {translation_count} 张图片的文本")
+
+    return updated_mapping, enable_translation
+
+
+def ocr_render_results(presentation_path: str,
+                       updated_mapping: Dict,
+                       output_path: str = None,
+                       enable_translation: bool = True,
+                       enable_text_splitting: str = "False") -> str:
+    """
+    OCR最后一步：将识别结果和翻译写回PPT
+
+    Args:
+        presentation_path: PPT文件路径
+        updated_mapping: ocr_recognize_and_translate 返回的图片映射
+        output_path: 输出文件路径
+        enable_translation: 是否显示翻译
+        enable_text_splitting: 是否启用了文本行分割（仅影响步骤编号）
+
+    Returns:
+        处理后的PPT文件路径
+    """
+    # 6. 将OCR结果和翻译添加到PPT右侧
+    step_num = 6 if enable_translation else (5 if enable_text_splitting != "False" else 4)
+    logger.info(f"\n" + "=" * 50)
+    content_desc = "OCR识别结果和翻译" if enable_translation else "OCR识别结果"
+    logger.info(f"🎨 第{step_num}步：在PPT右侧添加{content_desc}")
+    logger.info("=" * 50)
+    
+    PPTImageReplacer.add_ocr_text_to_slides(
+        presentation_path=presentation_path,
+        image_mapping=updated_mapping,
+        output_path=output_path,
+        show_translation=enable_translation
+    )
+    
+    success_desc = "OCR结果和翻译" if enable_translation else "OCR结果"
+    logger.info(f"  {success_desc}已添加到PPT右侧")
+    logger.info("\n" + "=" * 50)
+    logger.info("🎉 处理完成！")
+    logger.info("=" * 50)
+    return output_path or presentation_path
+
+
 def ocr_controller(presentation_path: str, 
                   selected_pages: Optional[List[int]] = None, 
                   output_path: str = None,
@@ -1100,147 +1296,28 @@ def ocr_controller(presentation_path: str,
         处理后的PPT文件路径
     """
     extractor = None
-    ocr_processor = None
     try:
-        # 验证输入文件
-        if not os.path.exists(presentation_path):
-            raise FileNotFoundError(f"PPT文件不存在: {presentation_path}")
-
-        # 修正selected_pages为0-based索引
-        prs = Presentation(presentation_path)
-        total_slides = len(prs.slides)
-        if selected_pages is not None:
-            selected_pages = [p-1 for p in selected_pages if 1 <= p <= total_slides]
-            if not selected_pages:
-                logger.warning("selected_pages参数无有效页码，将处理全部页面")
-                selected_pages = None
-
-        # 1. 提取图片
-        logger.info("=" * 50)
-        logger.info("🔍 第一步：提取PPT中的图片")
-        logger.info("=" * 50)
-        extractor = PPTImageExtractor()
-        temp_dir, image_mapping = extractor.extract_images_from_slides(
-            presentation_path, selected_pages
-        )
+        extractor, temp_dir, image_mapping = ocr_extract_images(presentation_path, selected_pages)
         if not image_mapping:
             logger.warning("未找到需要处理的图片")
             return presentation_path
-        logger.info(f"  图片提取完成，临时目录: {temp_dir}")
 
-        # 2. 调用qwen-vl-ocr的api进行图片的文字提取
-        logger.info("\n" + "=" * 50)
-        logger.info("🤖 第二步：调用OCR QWEN API进行文本识别")
-        logger.info("=" * 50)
-
-        folder_path = temp_dir  # 替换为你的图片文件夹路径
-        json_path = os.path.join(temp_dir, "image_mapping.json")  # 使用temp_dir作为文件夹路径
-        API_KEY = os.getenv("QWEN_API_KEY")
-
-        # 执行批量处理
-        process_folder_with_mapping(folder_path, json_path, API_KEY)
-
-        # 3. 文本行分割处理（可选）
-        if enable_text_splitting == "True_spliting":
-            logger.info("\n" + "=" * 50)
-            logger.info("✂️ 第三步：文本行分割处理")
-            logger.info("=" * 50)
-            
-            splitter = TextLineSplitter()
-            split_success = splitter.process_json_file(json_path)
-            
-            if split_success:
-                logger.info("  文本行分割完成")
-            else:
-                logger.warning("⚠️ 文本行分割失败，将使用原始文本继续处理")
-        else:
-            logger.info("\n" + "=" * 50)
-            logger.info("⏭️ 第三步：跳过文本行分割处理")
-            logger.info("=" * 50)
-            logger.info("  保持原始文本格式")
-
-        # 4. 翻译OCR识别结果
-        step_num = 4 if enable_text_splitting != "False" else 3
-        if enable_translation:
-            logger.info("\n" + "=" * 50)
-            logger.info(f"🌐 第{step_num}步：翻译识别结果 ({source_language} → {target_language})")
-            logger.info("=" * 50)
-            
-            translation_success = TranslationManager.translate_ocr_results(
-                temp_dir=temp_dir,
-                target_language=target_language,
-                source_language=source_language
-            )
-            
-            if translation_success:
-                logger.info(f"  翻译完成")
-                
-                # 显示翻译摘要
-                mapping_file = os.path.join(temp_dir, "image_mapping.json")
-                summary = TranslationManager.get_translation_summary(mapping_file)
-                if summary:
-                    logger.info(f"📊 翻译摘要:")
-                    logger.info(f"   - 总图片数: {summary.get('total_images', 0)}")
-                    logger.info(f"   - 包含文本的图片: {summary.get('images_with_text', 0)}")
-                    logger.info(f"   - 包含翻译的图片: {summary.get('images_with_translation', 0)}")
-                    logger.info(f"   - 翻译成功率: {summary.get('translation_success_rate', 0):.1f}%")
-            else:
-                logger.warning("⚠️ 翻译失败，将只显示原文")
-                enable_translation = False
-
-        # 5. 读取更新后的映射文件
-        step_num = 5 if enable_translation else (4 if enable_text_splitting != "False" else 3)
-        logger.info(f"\n" + "=" * 50)
-        logger.info(f"📖 第{step_num}步：读取处理结果")
-        logger.info("=" * 50)
-        mapping_file = os.path.join(temp_dir, "image_mapping.json")
-        if not os.path.exists(mapping_file):
-            raise Exception(f"映射文件不存在: {mapping_file}")
-        with open(mapping_file, 'r', encoding='utf-8') as f:
-            updated_mapping = json.load(f)
-        logger.info("  处理结果读取完成")
-        
-        # 统计结果
-        ocr_count = 0
-        translation_count = 0
-        for slide_info in updated_mapping.values():
-            for image_info in slide_info.get("images", []):
-                if "all_text" in image_info and image_info["all_text"]:
-                    ocr_count += 1
-                    filename = image_info.get("filename", "未知文件")
-                    text_preview = str(list(image_info["all_text"].values())[0])[:50] + "..."
-                    logger.info(f"   📄 {filename}: {text_preview}")
-                    
-                    if enable_translation and "translated_text" in image_info and image_info["translated_text"]:
-                        translation_count += 1
-                        trans_preview = str(list(image_info["translated_text"].values())[0])[:50] + "..."
-                        logger.info(f"   🌐 翻译: {trans_preview}")
-        
-        logger.info(f"📊 共识别出 {ocr_count} 张包含文本的图片")
-        if enable_translation:
-            logger.info(f"📊 共翻译了 {translation_count} 张图片的文本")
+        updated_mapping, enable_translation = ocr_recognize_and_translate(
+            temp_dir,
+            enable_translation=enable_translation,
+            target_language=target_language,
+            source_language=source_language,
+            enable_text_splitting=enable_text_splitting
+        )
 
-        # 6. 将OCR结果和翻译添加到PPT右侧
-        step_num = 6 if enable_translation else (5 if enable_text_splitting != "False" else 4)
-        logger.info(f"\n" + "=" * 50)
-        content_desc = "OCR识别结果和翻译" if enable_translation else "OCR识别结果"
-        logger.info(f"🎨 第{step_num}步：在PPT右侧添加{content_desc}")
-        logger.info("=" * 50)
-        
-        PPTImageReplacer.add_ocr_text_to_slides(
-            presentation_path=presentation_path,
-            image_mapping=updated_mapping,
+        return ocr_render_results(
+            presentation_path,
+            updated_mapping,
             output_path=output_path,
-            show_translation=enable_translation
+            enable_translation=enable_translation,
+            enable_text_splitting=enable_text_splitting
         )
         
-        success_desc = "OCR结果和翻译" if enable_translation else "OCR结果"
-        logger.info(f"  {success_desc}已添加到PPT右侧")
-        logger.info("\n" + "=" * 50)
-        logger.info("🎉 处理完成！")
-        logger.info("=" * 50)
-        return output_path or presentation_path
-        
     except Exception as e:
         error_msg = f"OCR控制器处理失败: {str(e)}"
         logger.error(f"❌ {error_msg}")
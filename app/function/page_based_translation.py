@@ -302,8 +302,9 @@ class PageBasedTranslator:
 
     async def translate_slide_paragraphs(self, slide, slide_index: int,
                                        source_language: str, target_language: str,
-                                       field: str = "通用") -> Dict[int, str]:
-        """翻译单页幻灯片的段落"""
+                                       field: str = "通用",
+                                       translate_func=None) -> Dict[int, str]:
+        """翻译单页幻灯片的段落（translate_func 为可选的批量翻译入口，接收文本返回 {原文: 译文}）"""
         # 1. 收集段落
         paragraphs = self.collect_slide_paragraphs(slide, slide_index)
         if not paragraphs:
@@ -322,16 +323,19 @@ class PageBasedTranslator:
 
             logger.info(f"开始翻译第 {slide_index + 1} 页内容...")
 
-            # 构造翻译参数，PPT翻译不需要清理Markdown
-            translation_result = await translate_async(
-                text=translation_text,
-                field=field,
-                stop_words=[],  # 空的停止词列表
-                custom_translations={},  # 空的自定义翻译
-                source_language=source_language,
-                target_language=target_language,
-                clean_markdown=False  # PPT翻译不需要清理Markdown
-            )
+            if translate_func is not None:
+                translation_result = await translate_func(translation_text)
+            else:
+                # 构造翻译参数，PPT翻译不需要清理Markdown
+                translation_result = await translate_async(
+                    text=translation_text,
+                    field=field,
+                    stop_words=[],  # 空的停止词列表
+                    custom_translations={},  # 空的自定义翻译
+                    source_language=source_language,
+                    target_language=target_language,
+                    clean_markdown=False  # PPT翻译不需要清理Markdown
+                )
 
             if not translation_result:
                 logger.error(f"第 {slide_index + 1} 页翻译失败：返回空结果")
@@ -361,14 +365,17 @@ class PageBasedTranslator:
         return matches
 
     def apply_translations_to_slide(self, slide, slide_index: int,
-                                  matches: Dict[int, str], bilingual_translation: str = "1"):
-        """将翻译结果应用到幻灯片"""
+                                  matches: Dict[int, str], bilingual_translation: str = "1",
+                                  paragraphs: Optional[List[ParagraphInfo]] = None):
+        """将翻译结果应用到幻灯片（并发翻译多页时应显式传入该页的段落列表）"""
         if not matches:
             logger.info(f"第 {slide_index + 1} 页没有翻译结果需要应用")
             return 0
 
         applied_count = 0
-        paragraphs = self.current_slide_paragraphs
+        dirty_shape_indices = set()  # 本页实际写入过译文的形状
+        if paragraphs is None:
+            paragraphs = self.current_slide_paragraphs
 
         for para_idx, translation in matches.items():
             if para_idx >= len(paragraphs):
@@ -452,6 +459,7 @@ class PageBasedTranslator:
                         text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
 
                         applied_count += 1
+                        dirty_shape_indices.add(para_info.shape_index)
                         logger.debug(f"✓ 应用文本框翻译: '{para_info.text[:30]}...' -> '{translation[:30]}...'")
                         logger.debug(f"  自适应: 已设置为TEXT_TO_FIT_SHAPE")
 
@@ -531,23 +539,27 @@ class PageBasedTranslator:
                             text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
 
                             applied_count += 1
+                            dirty_shape_indices.add(para_info.shape_index)
                             logger.debug(f"✓ 应用表格翻译: '{para_info.text[:30]}...' -> '{translation[:30]}...'")
                             logger.debug(f"  自适应: 已设置为TEXT_TO_FIT_SHAPE")
 
             except Exception as e:
                 logger.error(f"应用翻译失败 (段落 {para_idx}): {str(e)}")
 
-        # 确保所有文本框都设置了自动适应
-        self.ensure_all_textboxes_autofit(slide)
+        # 确保写入过译文的文本框都设置了自动适应；未改动的形状保持原有版式
+        if dirty_shape_indices:
+            self.ensure_all_textboxes_autofit(slide, dirty_shape_indices)
 
         logger.info(f"第 {slide_index + 1} 页翻译应用完成: {applied_count} 个段落")
         return applied_count
 
-    def ensure_all_textboxes_autofit(self, slide):
-        """确保幻灯片中所有文本框都设置了文字大小适应文本框大小"""
+    def ensure_all_textboxes_autofit(self, slide, shape_indices=None):
+        """确保幻灯片中所有文本框都设置了文字大小适应文本框大小（shape_indices 给定时只处理这些形状）"""
         textbox_count = 0
 
-        for shape in slide.shapes:
+        for shape_index, shape in enumerate(slide.shapes):
+            if shape_indices is not None and shape_index not in shape_indices:
+                continue
             if shape.has_text_frame:
                 text_frame = shape.text_frame
                 text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
@@ -567,17 +579,20 @@ page_translator = PageBasedTranslator()
 
 async def translate_slide_by_page(slide, slide_index: int, source_language: str,
                                 target_language: str, bilingual_translation: str = "1",
-                                field: str = "通用") -> int:
+                                field: str = "通用", translate_func=None) -> int:
     """按页翻译幻灯片（外部接口）"""
     try:
         # 翻译段落
         matches = await page_translator.translate_slide_paragraphs(
-            slide, slide_index, source_language, target_language, field
+            slide, slide_index, source_language, target_language, field, translate_func
         )
+        # 多页并发翻译时共享实例的 current_slide_paragraphs 会被其他页覆盖，
+        # 因此在返回后立即取出本页段落并显式传递
+        paragraphs = page_translator.current_slide_paragraphs if matches else None
 
         # 应用翻译
         applied_count = page_translator.apply_translations_to_slide(
-            slide, slide_index, matches, bilingual_translation
+            slide, slide_index, matches, bilingual_translation, paragraphs
         )
 
         return applied_count
@@ -1,11 +1,17 @@
+import hashlib
+import io
 import json
 import sys
 import time
 import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # from mypy.messages import best_matches
 from pptx import Presentation
-from pptx.dml.color import RGBColor
+from pptx.enum.dml import MSO_COLOR_TYPE
+from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pptx.enum.text import MSO_AUTO_SIZE
 from pptx.util import Pt, Inches
 import re
@@ -18,7 +24,8 @@ import logging
 
 # from modelscope.utils.constant import Tasks
 import difflib
-import re
+
+import numpy as np
 
 # 导入工具函数
 from ..utils.ppt_utils import (
@@ -38,6 +45,18 @@ from .translate_by_qwen import translate_qwen, get_field
 # from .translate_by_gpt4o import translate_gpt4o
 from colorama import init
 
+# 可选依赖：Aho-Corasick 多模式匹配，用于快速筛选停止词和自定义翻译
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 可选依赖：RapidFuzz 的 C 实现相似度计算，未安装时回退到 difflib
+try:
+    from rapidfuzz.distance import Indel
+except ImportError:
+    Indel = None
+
 from ..utils.task_queue import translation_queue
 
 # 初始化 colorama
@@ -47,10 +66,175 @@ init()
 src_language = "English"  # 源语言
 trg_language = "Chinese"  # 目标语言
 
+# 领域分析结果缓存：同一份文本无需重复请求LLM
+_FIELD_CACHE: dict = {}
+_FIELD_CACHE_MAX_ENTRIES = 128
+
+# 翻译结果缓存：相同输入（文本、领域、停止词、自定义翻译、语言）不重复请求LLM
+_TRANSLATION_CACHE: dict = {}
+_TRANSLATION_CACHE_MAX_ENTRIES = 256
+_TRANSLATION_CACHE_LOCK = threading.Lock()
+
+# 幻灯片并发翻译的线程数
+_SLIDE_TRANSLATION_WORKERS = 5
+# 合并为一个翻译请求的幻灯片文本最大字符数
+_SLIDE_BATCH_MAX_CHARS = 2000
+
+# 垂直制表符删除表（配合 str.replace 去除 "_x000B_" 转义形式）
+_VB_TABLE = str.maketrans("", "", "\u000B")
+
+# 预编译的正则表达式
+_REF_RE = re.compile(r"\d+\s*[A-Za-z&\s\.\-]+,\s*\d{4}")
+_PAGENUM_RE = re.compile(r"\d{1,3}")
+_BRACE_RE = re.compile(r"\{([^}]+)\}")
+_SIMILARITY_PUNCT_RE = re.compile(r'[.,!?;:()\[\]{}"\'`~]')
+_NONWORD_RE = re.compile(r"[^\w]")
+_WS_RE = re.compile(r"^[\s\n\r\t]*$")
+_NUM_RE = re.compile(r"^[\d\s\.,\-%]+$")
+_PUNCT_RE = re.compile(r"^[^\w\s]+$")
+_SPECIAL_RE = re.compile(r"^[\s\-_=+\*#@$%^&()]+$")
+
+# 注释文本框字体：14磅（单位为百分之一磅）、红色
+_ANNOTATION_FONT_SZ = "1400"
+_ANNOTATION_FONT_COLOR = "FF0000"
+
+# 形状类别能力标记缓存 {(形状类, shape_type): 能力标记}
+_SHAPE_TYPE_CAPS: dict = {}
+
+# 形状变形检测容差（EMU），0.5个单位，更敏感地检测变形
+_DEFORM_TOLERANCE = 0.5
+
+
+def get_field_cached(all_text: str) -> str:
+    """
+    带缓存的领域分析，按文本摘要缓存 get_field 的结果
+
+    Args:
+        all_text: 演示文稿的全部文本
+
+    Returns:
+        领域分析结果字符串
+    """
+    key = hashlib.blake2b(all_text.encode("utf-8"), digest_size=16).hexdigest()
+    field = _FIELD_CACHE.get(key)
+    if field is None:
+        field = str(get_field(all_text))
+        # 超出容量时按插入顺序淘汰最早的条目
+        if len(_FIELD_CACHE) >= _FIELD_CACHE_MAX_ENTRIES:
+            _FIELD_CACHE.pop(next(iter(_FIELD_CACHE)))
+        _FIELD_CACHE[key] = field
+    return field
+
+
+def translate_qwen_cached(
+    text: str, field: str, stop_words: list, custom_words: dict, source_language: str, target_language: str
+) -> dict:
+    """
+    带缓存的 translate_qwen，按全部输入参数的指纹缓存翻译映射
+
+    Args:
+        text: 待翻译文本
+        field: 文本领域
+        stop_words: 停止词列表
+        custom_words: 自定义翻译字典
+        source_language: 源语言
+        target_language: 目标语言
+
+    Returns:
+        翻译映射字典 {原文: 译文}
+    """
+    fingerprint = json.dumps(
+        [text, field, sorted(stop_words), sorted(custom_words.items()), source_language, target_language],
+        ensure_ascii=False,
+    )
+    key = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+    data = _TRANSLATION_CACHE.get(key)
+    if data is None:
+        data = translate_qwen(text, field, stop_words, custom_words, source_language, target_language)
+        # 翻译失败的结果不缓存，以便下次重试
+        if not any(str(v).startswith(("[翻译失败", "[翻译异常")) for v in data.values()):
+            # 幻灯片并发翻译时多个线程会同时写入缓存
+            with _TRANSLATION_CACHE_LOCK:
+                if len(_TRANSLATION_CACHE) >= _TRANSLATION_CACHE_MAX_ENTRIES:
+                    _TRANSLATION_CACHE.pop(next(iter(_TRANSLATION_CACHE)))
+                _TRANSLATION_CACHE[key] = data
+    # 返回副本，避免调用方修改缓存内容
+    return dict(data)
+
+
+def build_word_automaton(stop_words_list, custom_translations: dict):
+    """
+    为停止词和自定义翻译构建 Aho-Corasick 自动机，整份演示文稿只需构建一次
+
+    Args:
+        stop_words_list: 全部停止词
+        custom_translations: 全部自定义翻译 {原文: 译文}
+
+    Returns:
+        自动机对象；未安装 pyahocorasick 时返回 None
+    """
+    if ahocorasick is None:
+        return None
+
+    # 同一个词可能既是停止词又有自定义翻译，合并为一个模式
+    # 模式负载: (词, 在停止词列表中的位置或None, 是否有自定义翻译)
+    entries = {}
+    for index, word in enumerate(stop_words_list):
+        if word and word not in entries:
+            entries[word] = [index, False]
+    for word in custom_translations:
+        if word:
+            entries.setdefault(word, [None, False])[1] = True
+
+    automaton = ahocorasick.Automaton()
+    for word, (stop_index, is_custom) in entries.items():
+        automaton.add_word(word, (word, stop_index, is_custom))
+    if len(automaton):
+        automaton.make_automaton()
+    return automaton
+
+
+def filter_applicable_words(text: str, stop_words_list, custom_translations: dict, automaton=None):
+    """
+    筛选在文本中出现的停止词和自定义翻译
+
+    安装了 pyahocorasick 时对文本做一次多模式扫描，结果直接由命中的模式得到；
+    否则逐个做子串查找。
+
+    Args:
+        text: 待翻译文本
+        stop_words_list: 全部停止词
+        custom_translations: 全部自定义翻译 {原文: 译文}
+        automaton: build_word_automaton 预先构建的自动机，为空时临时构建
+
+    Returns:
+        (停止词列表, 自定义翻译字典)
+    """
+    if automaton is None:
+        automaton = build_word_automaton(stop_words_list, custom_translations)
+
+    if automaton is None:
+        stop_words = [w for w in stop_words_list if w in text]
+        custom_words = {k: v for k, v in custom_translations.items() if k in text}
+        return stop_words, custom_words
+
+    stop_indices = set()
+    custom_words = {}
+    if len(automaton):
+        for _, (word, stop_index, is_custom) in automaton.iter(text):
+            if stop_index is not None:
+                stop_indices.add(stop_index)
+            if is_custom and word not in custom_words:
+                custom_words[word] = custom_translations[word]
+
+    # 停止词保持原列表中的顺序
+    stop_words = [stop_words_list[i] for i in sorted(stop_indices)]
+    return stop_words, custom_words
+
 
 def match(text):
     # 使用正则表达式查找被 {} 包裹的内容
-    matches = re.findall(r"\{([^}]+)\}", text)
+    matches = _BRACE_RE.findall(text)
     # 打印匹配到的内容
     # print(matches)
 
@@ -67,6 +251,12 @@ def match(text):
 # 字符串处理函数已移动到 utils/ppt_utils.py
 
 
+def _normalize_similarity_text(text: str) -> str:
+    """相似度计算前的文本归一化：转小写、合并空白、去除常见标点符号"""
+    normalized = " ".join(text.lower().split())
+    return _SIMILARITY_PUNCT_RE.sub("", normalized).strip()
+
+
 def calculate_translation_similarity(original_text: str, translated_text: str) -> float:
     """
     计算原文和译文的相似度
@@ -81,28 +271,45 @@ def calculate_translation_similarity(original_text: str, translated_text: str) -
     if not original_text or not translated_text:
         return 0.0
 
-    def normalize_text(text):
-        # 转小写
-        normalized = text.lower()
-        # 去除多余空格
-        normalized = " ".join(normalized.split())
-        # 去除常见标点符号
-        normalized = re.sub(r'[.,!?;:()\[\]{}"\'`~]', "", normalized)
-        return normalized.strip()
+    return _normalized_similarity(
+        _normalize_similarity_text(original_text), _normalize_similarity_text(translated_text)
+    )
+
 
-    norm_original = normalize_text(original_text)
-    norm_translated = normalize_text(translated_text)
+def _normalized_similarity(norm_original: str, norm_translated: str, threshold: float = None) -> float:
+    """
+    对已归一化的两段文本计算综合相似度
 
+    给定 threshold 时，一旦确定结果达不到阈值就提前返回，此时返回值只保证小于阈值。
+    """
     if not norm_original or not norm_translated:
         return 0.0
 
-    # 计算字符级相似度
-    char_similarity = difflib.SequenceMatcher(None, norm_original, norm_translated).ratio()
-
-    # 计算词级相似度
     words_original = norm_original.split()
     words_translated = norm_translated.split()
-    word_similarity = difflib.SequenceMatcher(None, words_original, words_translated).ratio()
+
+    # 综合相似度 = 字符相似度*0.6 + 词相似度*0.4，词相似度不超过1，
+    # 因此字符相似度至少需要 (threshold-0.4)/0.6 才可能达到阈值
+    char_cutoff = None if threshold is None else max(0.0, (threshold - 0.4) / 0.6)
+
+    if Indel is not None:
+        # 计算字符级相似度（C实现，score_cutoff 使达不到下限的比较提前结束）
+        char_similarity = Indel.normalized_similarity(norm_original, norm_translated, score_cutoff=char_cutoff)
+        if char_cutoff is not None and char_similarity < char_cutoff:
+            return char_similarity * 0.6
+
+        # 计算词级相似度
+        word_cutoff = None if threshold is None else max(0.0, (threshold - char_similarity * 0.6) / 0.4)
+        word_similarity = Indel.normalized_similarity(words_original, words_translated, score_cutoff=word_cutoff)
+    else:
+        # 计算字符级相似度
+        matcher = difflib.SequenceMatcher(None, norm_original, norm_translated)
+        if char_cutoff is not None and matcher.quick_ratio() < char_cutoff:
+            return matcher.quick_ratio() * 0.6
+        char_similarity = matcher.ratio()
+
+        # 计算词级相似度
+        word_similarity = difflib.SequenceMatcher(None, words_original, words_translated).ratio()
 
     # 综合相似度 (字符相似度权重0.6，词相似度权重0.4)
     combined_similarity = char_similarity * 0.6 + word_similarity * 0.4
@@ -127,22 +334,36 @@ def should_skip_translation_insertion(
     """
     if not original_text or not translated_text:
         if debug:
-            logging.info(f"跳过翻译：空文本 (原文: '{original_text}', 译文: '{translated_text}')")
+            logging.info("跳过翻译：空文本 (原文: '%s', 译文: '%s')", original_text, translated_text)
         return True
 
     # 如果原文和译文完全相同，跳过
     if original_text.strip() == translated_text.strip():
         if debug:
-            logging.info(f"跳过翻译：文本完全相同 ('{original_text}')")
+            logging.info("跳过翻译：文本完全相同 ('%s')", original_text)
         return True
 
+    norm_original = _normalize_similarity_text(original_text)
+    norm_translated = _normalize_similarity_text(translated_text)
+
+    # 长度差异过大时相似度不可能达到阈值：字符相似度不超过 2*min/(la+lb)，
+    # 词相似度不超过1，据此得到综合相似度的上界，无需计算匹配
+    la, lb = len(norm_original), len(norm_translated)
+    if la and lb:
+        upper_bound = 0.6 * (2 * min(la, lb) / (la + lb)) + 0.4
+        if upper_bound < threshold:
+            if debug:
+                logging.info("相似度检查: '%.30s...' vs '%.30s...'", original_text, translated_text)
+                logging.info("  相似度上界: %.3f, 阈值: %s, 跳过: False", upper_bound, threshold)
+            return False
+
     # 计算相似度
-    similarity = calculate_translation_similarity(original_text, translated_text)
+    similarity = _normalized_similarity(norm_original, norm_translated, threshold)
     should_skip = similarity >= threshold
 
     if debug:
-        logging.info(f"相似度检查: '{original_text[:30]}...' vs '{translated_text[:30]}...'")
-        logging.info(f"  相似度: {similarity:.3f}, 阈值: {threshold}, 跳过: {should_skip}")
+        logging.info("相似度检查: '%.30s...' vs '%.30s...'", original_text, translated_text)
+        logging.info("  相似度: %.3f, 阈值: %s, 跳过: %s", similarity, threshold, should_skip)
 
     return should_skip
 
@@ -158,7 +379,7 @@ def save_shape_geometry(shape):
             "rotation": getattr(shape, "rotation", 0),
         }
     except Exception as e:
-        logging.debug(f"保存形状几何属性失败: {e}")
+        logging.debug("保存形状几何属性失败: %s", e)
         return {}
 
 
@@ -190,13 +411,33 @@ def restore_shape_geometry(shape, geometry_info):
         return True
 
     except Exception as e:
-        logging.debug(f"恢复形状几何属性失败: {e}")
+        logging.debug("恢复形状几何属性失败: %s", e)
         return False
 
 
+def _get_shape_type_caps(shape):
+    """获取形状类别的能力标记（按形状类和 shape_type 缓存，同类形状只探测一次）"""
+    shape_type = shape.shape_type
+    cache_key = (type(shape), shape_type)
+    caps = _SHAPE_TYPE_CAPS.get(cache_key)
+    if caps is None:
+        is_auto_shape = shape_type == MSO_SHAPE_TYPE.AUTO_SHAPE
+
+        caps = {
+            "has_shapes": hasattr(shape, "shapes"),
+            "has_fill": hasattr(shape, "fill"),
+            "has_line": hasattr(shape, "line"),
+            "has_shadow": hasattr(shape, "shadow"),
+            "is_auto_shape": is_auto_shape,
+        }
+        _SHAPE_TYPE_CAPS[cache_key] = caps
+    return caps
+
+
 def detect_complex_shape_type(shape):
     """检测复杂形状类型"""
     try:
+        caps = _get_shape_type_caps(shape)
         shape_info = {
             "type": "simple",
             "has_fill": False,
@@ -208,59 +449,53 @@ def detect_complex_shape_type(shape):
         }
 
         # 检查是否为组合形状
-        try:
-            if hasattr(shape, "shapes") and shape.shapes:
-                shape_info["type"] = "group"
-                shape_info["is_group"] = True
-                return shape_info
-        except:
-            pass
+        if caps["has_shapes"]:
+            try:
+                if shape.shapes:
+                    shape_info["type"] = "group"
+                    shape_info["is_group"] = True
+                    return shape_info
+            except Exception:
+                pass
 
         # 检查填充属性
-        try:
-            if hasattr(shape, "fill"):
-                fill = shape.fill
-                if hasattr(fill, "type") and fill.type is not None:
+        if caps["has_fill"]:
+            try:
+                fill_type = shape.fill.type
+                if fill_type is not None:
                     shape_info["has_fill"] = True
-                    if fill.type != 0:  # 不是无填充
+                    if fill_type != 0:  # 不是无填充
                         shape_info["type"] = "complex"
-        except:
-            pass
+            except Exception:
+                pass
 
         # 检查线条属性
-        try:
-            if hasattr(shape, "line"):
-                line = shape.line
-                if hasattr(line, "color") and line.color is not None:
+        if caps["has_line"]:
+            try:
+                if shape.line.color is not None:
                     shape_info["has_line"] = True
                     shape_info["type"] = "complex"
-        except:
-            pass
+            except Exception:
+                pass
 
         # 检查阴影效果
-        try:
-            if hasattr(shape, "shadow"):
-                shadow = shape.shadow
-                if hasattr(shadow, "visible") and shadow.visible:
+        if caps["has_shadow"]:
+            try:
+                if getattr(shape.shadow, "visible", False):
                     shape_info["has_shadow"] = True
                     shape_info["type"] = "complex"
-        except:
-            pass
+            except Exception:
+                pass
 
         # 检查是否为自定义形状
-        try:
-            from pptx.enum.shapes import MSO_SHAPE_TYPE
-
-            if shape.shape_type == MSO_SHAPE_TYPE.AUTO_SHAPE:
-                shape_info["is_custom"] = True
-                shape_info["type"] = "custom"
-        except:
-            pass
+        if caps["is_auto_shape"]:
+            shape_info["is_custom"] = True
+            shape_info["type"] = "custom"
 
         return shape_info
 
     except Exception as e:
-        logging.debug(f"检测形状类型失败: {e}")
+        logging.debug("检测形状类型失败: %s", e)
         return {"type": "unknown", "error": str(e)}
 
 
@@ -289,119 +524,122 @@ def save_complex_shape_properties(shape):
 
         # 保存填充属性（增强版）
         try:
-            if hasattr(shape, "fill"):
-                fill = shape.fill
-                properties["fill_properties"] = {
-                    "type": getattr(fill, "type", None),
-                    "transparency": getattr(fill, "transparency", None),
+            fill = shape.fill
+        except AttributeError:
+            fill = None
+        if fill is not None:
+            try:
+                fill_props = {
+                    "type": fill.type,
+                    "transparency": None,
                     "fore_color_rgb": None,
                     "back_color_rgb": None,
                 }
+                properties["fill_properties"] = fill_props
 
-                # 保存颜色信息
+                # 透明度及颜色信息：无填充或非纯色填充时访问会抛出异常
                 try:
-                    if hasattr(fill, "fore_color") and hasattr(fill.fore_color, "rgb"):
-                        properties["fill_properties"]["fore_color_rgb"] = fill.fore_color.rgb
-                except:
+                    fill_props["transparency"] = fill.transparency
+                except Exception:
                     pass
 
                 try:
-                    if hasattr(fill, "back_color") and hasattr(fill.back_color, "rgb"):
-                        properties["fill_properties"]["back_color_rgb"] = fill.back_color.rgb
-                except:
+                    fill_props["fore_color_rgb"] = fill.fore_color.rgb
+                except Exception:
                     pass
-        except Exception as e:
-            properties["fill_properties"]["error"] = str(e)
+
+                try:
+                    fill_props["back_color_rgb"] = fill.back_color.rgb
+                except Exception:
+                    pass
+            except Exception as e:
+                properties["fill_properties"]["error"] = str(e)
 
         # 保存线条属性（完整版，修复边框颜色问题）
         try:
-            if hasattr(shape, "line"):
-                line = shape.line
-                properties["line_properties"] = {
-                    "width": getattr(line, "width", None),
-                    "dash_style": getattr(line, "dash_style", None),
+            line = shape.line
+        except AttributeError:
+            line = None
+        if line is not None:
+            try:
+                line_props = {
+                    "width": line.width,
+                    "dash_style": line.dash_style,
                     "fill_type": None,
                     "transparency": None,
                     "color_info": None,
                 }
+                properties["line_properties"] = line_props
 
                 # 保存线条填充类型（决定是否有边框）
                 try:
-                    if hasattr(line, "fill"):
-                        properties["line_properties"]["fill_type"] = getattr(line.fill, "type", None)
-                        properties["line_properties"]["transparency"] = getattr(line.fill, "transparency", None)
-                except:
+                    line_fill = line.fill
+                    line_props["fill_type"] = line_fill.type
+                    line_props["transparency"] = line_fill.transparency
+                except Exception:
                     pass
 
                 # 保存线条颜色（完整版）
                 try:
-                    if hasattr(line, "color"):
-                        color = line.color
-                        color_info = {}
+                    color = line.color
+                    try:
+                        color_type = color.type
+                    except Exception:
+                        color_type = None
 
-                        # 检查颜色类型
-                        try:
-                            from pptx.enum.dml import MSO_COLOR_TYPE
-
-                            color_type = getattr(color, "type", None)
-
-                            if color_type == MSO_COLOR_TYPE.RGB:
-                                color_info = {"color_type": "rgb", "rgb_value": getattr(color, "rgb", None)}
-                            elif color_type == MSO_COLOR_TYPE.THEME:
-                                color_info = {"color_type": "theme", "theme_color": getattr(color, "theme_color", None)}
-                            elif color_type == MSO_COLOR_TYPE.AUTO:
-                                color_info = {"color_type": "auto"}
-                            else:
-                                # 尝试获取RGB作为后备
-                                color_info = {"color_type": "rgb", "rgb_value": getattr(color, "rgb", None)}
-                        except:
-                            # 如果无法获取类型，直接尝试RGB
-                            try:
-                                color_info = {"color_type": "rgb", "rgb_value": getattr(color, "rgb", None)}
-                            except:
-                                color_info = {"color_type": "error"}
-
-                        properties["line_properties"]["color_info"] = color_info
+                    try:
+                        if color_type == MSO_COLOR_TYPE.THEME:
+                            color_info = {"color_type": "theme", "theme_color": color.theme_color}
+                        elif color_type == MSO_COLOR_TYPE.AUTO:
+                            color_info = {"color_type": "auto"}
+                        else:
+                            # RGB颜色或无法识别的类型，尝试获取RGB作为后备
+                            color_info = {"color_type": "rgb", "rgb_value": color.rgb}
+                    except Exception:
+                        color_info = {"color_type": "rgb", "rgb_value": None}
 
+                    line_props["color_info"] = color_info
                 except Exception as e:
-                    properties["line_properties"]["color_info"] = {"color_type": "error", "error": str(e)}
-        except Exception as e:
-            properties["line_properties"]["error"] = str(e)
+                    line_props["color_info"] = {"color_type": "error", "error": str(e)}
+            except Exception as e:
+                properties["line_properties"]["error"] = str(e)
 
         # 保存阴影属性
         try:
-            if hasattr(shape, "shadow"):
-                shadow = shape.shadow
-                properties["shadow_properties"] = {
-                    "visible": getattr(shadow, "visible", None),
-                    "style": getattr(shadow, "style", None),
-                    "blur_radius": getattr(shadow, "blur_radius", None),
-                    "distance": getattr(shadow, "distance", None),
-                    "direction": getattr(shadow, "direction", None),
-                }
+            shadow = shape.shadow
+            properties["shadow_properties"] = {
+                "visible": getattr(shadow, "visible", None),
+                "style": getattr(shadow, "style", None),
+                "blur_radius": getattr(shadow, "blur_radius", None),
+                "distance": getattr(shadow, "distance", None),
+                "direction": getattr(shadow, "direction", None),
+            }
+        except AttributeError:
+            pass
         except Exception as e:
             properties["shadow_properties"]["error"] = str(e)
 
         # 保存文本框属性（增强版）
         try:
-            if hasattr(shape, "text_frame"):
-                text_frame = shape.text_frame
-                properties["text_frame_properties"] = {
-                    "auto_size": getattr(text_frame, "auto_size", None),
-                    "word_wrap": getattr(text_frame, "word_wrap", None),
-                    "margin_left": getattr(text_frame, "margin_left", None),
-                    "margin_right": getattr(text_frame, "margin_right", None),
-                    "margin_top": getattr(text_frame, "margin_top", None),
-                    "margin_bottom": getattr(text_frame, "margin_bottom", None),
-                    "vertical_anchor": getattr(text_frame, "vertical_anchor", None),
-                }
+            text_frame = shape.text_frame
+            properties["text_frame_properties"] = {
+                "auto_size": text_frame.auto_size,
+                "word_wrap": text_frame.word_wrap,
+                "margin_left": text_frame.margin_left,
+                "margin_right": text_frame.margin_right,
+                "margin_top": text_frame.margin_top,
+                "margin_bottom": text_frame.margin_bottom,
+                "vertical_anchor": text_frame.vertical_anchor,
+            }
+        except AttributeError:
+            pass
         except Exception as e:
             properties["text_frame_properties"]["error"] = str(e)
 
         # 保存高级属性
         try:
             properties["advanced_properties"] = {
-                "has_text_frame": getattr(shape, "has_text_frame", False),
+                "has_text_frame": shape.has_text_frame,
                 "has_table": getattr(shape, "has_table", False),
                 "has_chart": getattr(shape, "has_chart", False),
                 "auto_shape_type": getattr(shape, "auto_shape_type", None),
@@ -412,7 +650,7 @@ def save_complex_shape_properties(shape):
         return properties
 
     except Exception as e:
-        logging.debug(f"保存复杂形状属性失败: {e}")
+        logging.debug("保存复杂形状属性失败: %s", e)
         return {}
 
 
@@ -454,71 +692,77 @@ def restore_complex_shape_properties(shape, properties):
                     except:
                         pass
         except Exception as e:
-            logging.debug(f"恢复基本几何属性失败: {e}")
+            logging.debug("恢复基本几何属性失败: %s", e)
 
         # 恢复填充属性
         try:
             fill_props = properties.get("fill_properties", {})
-            if fill_props and hasattr(shape, "fill") and "error" not in fill_props:
+            if fill_props and "error" not in fill_props:
                 fill = shape.fill
                 total_operations += 1
 
-                if "type" in fill_props and fill_props["type"] is not None:
+                fill_type = fill_props.get("type")
+                if fill_type is not None:
                     try:
-                        fill.type = fill_props["type"]
+                        fill.type = fill_type
                         success_operations += 1
-                    except:
+                    except Exception:
                         pass
 
-                if "transparency" in fill_props and fill_props["transparency"] is not None:
+                transparency = fill_props.get("transparency")
+                if transparency is not None:
                     try:
-                        fill.transparency = fill_props["transparency"]
-                    except:
+                        fill.transparency = transparency
+                    except Exception:
                         pass
+        except AttributeError:
+            pass
         except Exception as e:
-            logging.debug(f"恢复填充属性失败: {e}")
+            logging.debug("恢复填充属性失败: %s", e)
 
         # 恢复线条属性（完整版，修复边框颜色问题）
         try:
             line_props = properties.get("line_properties", {})
-            if line_props and hasattr(shape, "line") and "error" not in line_props:
+            if line_props and "error" not in line_props:
                 line = shape.line
                 total_operations += 1
 
                 # 恢复线条宽度
-                if "width" in line_props and line_props["width"] is not None:
+                line_width = line_props.get("width")
+                if line_width is not None:
                     try:
-                        line.width = line_props["width"]
+                        line.width = line_width
                         success_operations += 1
-                        logging.debug(f"恢复线条宽度: {line_props['width']}")
+                        logging.debug("恢复线条宽度: %s", line_width)
                     except Exception as e:
-                        logging.debug(f"恢复线条宽度失败: {e}")
+                        logging.debug("恢复线条宽度失败: %s", e)
 
                 # 恢复线条样式
-                if "dash_style" in line_props and line_props["dash_style"] is not None:
+                dash_style = line_props.get("dash_style")
+                if dash_style is not None:
                     try:
-                        line.dash_style = line_props["dash_style"]
-                        logging.debug(f"恢复线条样式: {line_props['dash_style']}")
+                        line.dash_style = dash_style
+                        logging.debug("恢复线条样式: %s", dash_style)
                     except Exception as e:
-                        logging.debug(f"恢复线条样式失败: {e}")
+                        logging.debug("恢复线条样式失败: %s", e)
 
                 # 恢复线条填充类型（决定是否有边框）
-                if "fill_type" in line_props and line_props["fill_type"] is not None:
+                line_fill_type = line_props.get("fill_type")
+                if line_fill_type is not None:
                     try:
-                        if hasattr(line, "fill"):
-                            line.fill.type = line_props["fill_type"]
-                            logging.debug(f"恢复线条填充类型: {line_props['fill_type']}")
+                        line.fill.type = line_fill_type
+                        logging.debug("恢复线条填充类型: %s", line_fill_type)
                     except Exception as e:
-                        logging.debug(f"恢复线条填充类型失败: {e}")
+                        logging.debug("恢复线条填充类型失败: %s", e)
 
                 # 恢复线条透明度
-                if "transparency" in line_props and line_props["transparency"] is not None:
+                line_transparency = line_props.get("transparency")
+                if line_transparency is not None:
                     try:
-                        if hasattr(line, "fill"):
-                            line.fill.transparency = line_props["transparency"]
-                            logging.debug(f"恢复线条透明度: {line_props['transparency']}")
+                        line.fill.transparency = line_transparency
+                        logging.debug("恢复线条透明度: %s", line_transparency)
                     except Exception as e:
-                        logging.debug(f"恢复线条透明度失败: {e}")
+                        logging.debug("恢复线条透明度失败: %s", e)
 
                 # 恢复线条颜色（完整版）
                 color_info = line_props.get("color_info")
@@ -532,18 +776,16 @@ def restore_complex_shape_properties(shape, properties):
                             if rgb_value is not None:
                                 color.rgb = rgb_value
                                 success_operations += 1
-                                logging.debug(f"恢复线条RGB颜色: {rgb_value}")
+                                logging.debug("恢复线条RGB颜色: %s", rgb_value)
 
                         elif color_type == "theme" and "theme_color" in color_info:
                             theme_color = color_info["theme_color"]
                             if theme_color is not None:
                                 color.theme_color = theme_color
                                 success_operations += 1
-                                logging.debug(f"恢复线条主题颜色: {theme_color}")
+                                logging.debug("恢复线条主题颜色: %s", theme_color)
 
                         elif color_type == "auto":
-                            from pptx.enum.dml import MSO_COLOR_TYPE
-
                             color.type = MSO_COLOR_TYPE.AUTO
                             success_operations += 1
                             logging.debug("恢复线条自动颜色")
@@ -553,49 +795,54 @@ def restore_complex_shape_properties(shape, properties):
                             if "rgb_value" in color_info and color_info["rgb_value"] is not None:
                                 color.rgb = color_info["rgb_value"]
                                 success_operations += 1
-                                logging.debug(f"使用RGB后备恢复线条颜色: {color_info['rgb_value']}")
+                                logging.debug("使用RGB后备恢复线条颜色: %s", color_info["rgb_value"])
 
                     except Exception as e:
-                        logging.debug(f"恢复线条颜色失败: {e}")
+                        logging.debug("恢复线条颜色失败: %s", e)
 
+        except AttributeError:
+            pass
         except Exception as e:
-            logging.debug(f"恢复线条属性失败: {e}")
+            logging.debug("恢复线条属性失败: %s", e)
 
         # 恢复文本框属性
         try:
             tf_props = properties.get("text_frame_properties", {})
-            if tf_props and hasattr(shape, "text_frame") and "error" not in tf_props:
+            if tf_props and "error" not in tf_props:
                 text_frame = shape.text_frame
                 total_operations += 1
 
-                # 恢复边距
-                for margin in ["margin_left", "margin_right", "margin_top", "margin_bottom"]:
-                    if margin in tf_props and tf_props[margin] is not None:
-                        try:
-                            setattr(text_frame, margin, tf_props[margin])
-                        except:
-                            pass
-
-                # 恢复其他属性
-                for prop in ["word_wrap", "vertical_anchor"]:
-                    if prop in tf_props and tf_props[prop] is not None:
+                # 恢复边距及其他属性
+                for prop in (
+                    "margin_left",
+                    "margin_right",
+                    "margin_top",
+                    "margin_bottom",
+                    "word_wrap",
+                    "vertical_anchor",
+                ):
+                    value = tf_props.get(prop)
+                    if value is not None:
                         try:
-                            setattr(text_frame, prop, tf_props[prop])
-                        except:
+                            setattr(text_frame, prop, value)
+                        except Exception:
                             pass
 
                 success_operations += 1
+        except AttributeError:
+            pass
         except Exception as e:
-            logging.debug(f"恢复文本框属性失败: {e}")
+            logging.debug("恢复文本框属性失败: %s", e)
 
         # 计算成功率
-        success_rate = (success_operations / max(total_operations, 1)) * 100
-        logging.debug(f"形状属性恢复成功率: {success_rate:.1f}% ({success_operations}/{total_operations})")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            success_rate = (success_operations / max(total_operations, 1)) * 100
+            logging.debug("形状属性恢复成功率: %.1f%% (%s/%s)", success_rate, success_operations, total_operations)
 
         return success_operations > 0
 
     except Exception as e:
-        logging.debug(f"恢复复杂形状属性失败: {e}")
+        logging.debug("恢复复杂形状属性失败: %s", e)
         return False
 
 
@@ -609,41 +856,12 @@ def has_shape_deformed(shape, original_properties):
         if not basic:
             return False
 
-        # 使用更严格的容差 - 从2降低到0.5
-        tolerance = 0.5  # 0.5个单位的容差，更敏感地检测变形
-
-        # 检查宽度变化
-        if "width" in basic:
-            width_diff = abs(shape.width - basic["width"])
-            if width_diff > tolerance:
-                logging.warning(f"检测到宽度变化: {width_diff:.2f} > {tolerance}")
-                return True
-
-        # 检查高度变化
-        if "height" in basic:
-            height_diff = abs(shape.height - basic["height"])
-            if height_diff > tolerance:
-                logging.warning(f"检测到高度变化: {height_diff:.2f} > {tolerance}")
-                return True
-
-        # 检查左边距变化
-        if "left" in basic:
-            left_diff = abs(shape.left - basic["left"])
-            if left_diff > tolerance:
-                logging.warning(f"检测到左边距变化: {left_diff:.2f} > {tolerance}")
-                return True
-
-        # 检查上边距变化
-        if "top" in basic:
-            top_diff = abs(shape.top - basic["top"])
-            if top_diff > tolerance:
-                logging.warning(f"检测到上边距变化: {top_diff:.2f} > {tolerance}")
-                return True
-
-        return False
+        current = (shape.width, shape.height, shape.left, shape.top)
+        original = (basic["width"], basic["height"], basic["left"], basic["top"])
+        return any(abs(c - o) > _DEFORM_TOLERANCE for c, o in zip(current, original))
 
     except Exception as e:
-        logging.debug(f"检查形状变形失败: {e}")
+        logging.debug("检查形状变形失败: %s", e)
         return True  # 出错时假设已变形，采用保守策略
 
 
@@ -652,12 +870,9 @@ def safe_set_autofit_with_size_preservation(text_frame, shape):
     try:
         # 1. 检测形状类型
         shape_info = detect_complex_shape_type(shape)
-        logging.debug(f"检测到形状类型: {shape_info['type']}")
-
-        # 2. 保存完整属性
-        original_properties = save_complex_shape_properties(shape)
+        logging.debug("检测到形状类型: %s", shape_info["type"])
 
-        # 3. 根据形状类型选择策略
+        # 2. 根据形状类型选择策略
         if shape_info["type"] == "group":
             # 组合形状：不设置自适应，避免破坏组合结构
             logging.info("跳过组合形状的自适应设置")
@@ -667,6 +882,9 @@ def safe_set_autofit_with_size_preservation(text_frame, shape):
             # 复杂形状：谨慎设置自适应
             logging.debug("为复杂形状设置自适应")
 
+            # 保存完整属性，用于变形检测和全量恢复
+            original_properties = save_complex_shape_properties(shape)
+
             # 保存当前状态
             current_auto_size = text_frame.auto_size
 
@@ -698,7 +916,9 @@ def safe_set_autofit_with_size_preservation(text_frame, shape):
 
         else:
             # 简单形状或自定义形状：使用标准方法
-            logging.debug(f"为{shape_info['type']}形状设置自适应")
+            logging.debug("为%s形状设置自适应", shape_info["type"])
+            # 简单形状只需恢复几何属性，无需保存填充/线条/阴影等完整属性
+            original_properties = {"basic_geometry": save_shape_geometry(shape)}
             text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
             restore_complex_shape_properties(shape, original_properties)
             return True
@@ -708,6 +928,100 @@ def safe_set_autofit_with_size_preservation(text_frame, shape):
         return False
 
 
+def batch_set_autofit_with_size_preservation(shapes):
+    """
+    批量设置自适应并保护形状大小
+
+    与逐个调用 safe_set_autofit_with_size_preservation 的效果相同，但复杂形状的
+    变形检测在设置自适应前后各读取一次全部几何属性，用数组一次比较完成。
+
+    Args:
+        shapes: 包含文本框的形状列表
+
+    Returns:
+        成功设置自适应的形状数量
+    """
+    succeeded = 0
+    complex_entries = []
+
+    for shape in shapes:
+        try:
+            shape_info = detect_complex_shape_type(shape)
+            if shape_info["type"] == "complex":
+                original_properties = save_complex_shape_properties(shape)
+                basic = original_properties.get("basic_geometry")
+                if basic and None not in (basic["width"], basic["height"], basic["left"], basic["top"]):
+                    complex_entries.append((shape, original_properties))
+                    continue
+            # 组合、简单、自定义形状及缺少几何信息的复杂形状逐个处理
+            if safe_set_autofit_with_size_preservation(shape.text_frame, shape):
+                succeeded += 1
+        except Exception as e:
+            logging.error(f"设置自适应失败: {e}")
+
+    if not complex_entries:
+        return succeeded
+
+    geom_before = np.array(
+        [
+            [basic["width"], basic["height"], basic["left"], basic["top"]]
+            for basic in (props["basic_geometry"] for _, props in complex_entries)
+        ],
+        dtype=np.int64,
+    )
+
+    # 设置自适应
+    original_auto_sizes = []
+    for shape, _ in complex_entries:
+        original_auto_sizes.append(shape.text_frame.auto_size)
+        shape.text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+
+    # 一次比较全部复杂形状是否变形
+    try:
+        geom_after = np.array(
+            [[shape.width, shape.height, shape.left, shape.top] for shape, _ in complex_entries],
+            dtype=np.int64,
+        )
+        deformed_mask = np.any(np.abs(geom_after - geom_before) > _DEFORM_TOLERANCE, axis=1)
+    except Exception as e:
+        logging.debug("检查形状变形失败: %s", e)
+        deformed_mask = np.ones(len(complex_entries), dtype=bool)  # 出错时假设已变形，采用保守策略
+
+    for (shape, original_properties), current_auto_size, deformed in zip(
+        complex_entries, original_auto_sizes, deformed_mask
+    ):
+        try:
+            if deformed:
+                logging.warning("检测到复杂形状变形，恢复原始状态")
+                shape.text_frame.auto_size = current_auto_size
+                restore_complex_shape_properties(shape, original_properties)
+            else:
+                # 恢复其他属性，保持自适应
+                restore_complex_shape_properties(shape, original_properties)
+                shape.text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+                succeeded += 1
+        except Exception as e:
+            logging.warning(f"复杂形状设置自适应失败: {e}")
+            shape.text_frame.auto_size = current_auto_size
+            restore_complex_shape_properties(shape, original_properties)
+
+    return succeeded
+
+
+def save_presentation(prs, path):
+    """
+    保存演示文稿：先序列化到内存缓冲区，再一次性写入磁盘
+
+    Args:
+        prs: 演示文稿对象
+        path: 保存路径
+    """
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    with open(path, "wb") as f:
+        f.write(buffer.getbuffer())
+
+
 def process_presentation_add_annotations(
     path_to_presentation,
     annotations,
@@ -730,21 +1044,16 @@ def process_presentation_add_annotations(
                         # print(text)
                         # text=text+"\n"
                         all_text += text + "\n"
-    field = str(get_field(all_text))
+    field = get_field_cached(all_text)
     tage_text = ""
     annotations = annotations["annotations"]
     for item in annotations:
         text = item["ocrResult"].replace("\n", " ")
         tage_text += text + "\n"
-    stop_words = list()
-    custom_words = dict()
-    for i in stop_words_list:
-        if i in tage_text:
-            stop_words.append(i)
-    for k, v in custom_translations.items():
-        if k in tage_text:
-            custom_words[k] = v
-    data = translate_qwen(tage_text, field, stop_words, custom_words, source_language, target_language)
+    stop_words, custom_words = filter_applicable_words(tage_text, stop_words_list, custom_translations)
+    data = translate_qwen_cached(tage_text, field, stop_words, custom_words, source_language, target_language)
+    translated_keys = list(data.keys())
+    bilingual = str(bilingual_translation) == "1"
     for item in annotations:
         page = item["page"]
         original_text = item["ocrResult"]
@@ -753,7 +1062,7 @@ def process_presentation_add_annotations(
         slide_height = prs.slide_height
         left = slide_width - Inches(2)  # 文本框的左边距
         top = 0  # 文本框的上边距
-        new_text = find_most_similar(original_text, list(data.keys()))
+        new_text = find_most_similar(original_text, translated_keys)
         # 设置文本框的宽度和高度
         width = Inches(2)
         height = Inches(1)
@@ -761,37 +1070,251 @@ def process_presentation_add_annotations(
         # 添加文本框
         shape = slide.shapes.add_textbox(left, top, width, height)
         text_frame = shape.text_frame
-        original_text = re.sub(r"_x000B_|\u000B", "", original_text)
+        original_text = original_text.replace("_x000B_", "").translate(_VB_TABLE)
         translated_text = data[new_text]
-        translated_text = re.sub(r"_x000B_|\u000B", "", translated_text)
-        if str(bilingual_translation) == "1":
+        translated_text = translated_text.replace("_x000B_", "").translate(_VB_TABLE)
+        if bilingual:
             text_frame.text = original_text + "\n" + translated_text
         else:
             text_frame.text = data[new_text]
 
         # 设置文本框中文字的字体和颜色（保持注释功能的红色，但可配置）
+        # 直接写入 a:rPr，避免逐个经过 Pt/RGBColor 属性封装
         for p in text_frame.paragraphs:
             for run in p.runs:
-                run.font.size = Pt(14)  # 设置字体大小
+                rPr = run._r.get_or_add_rPr()
+                rPr.set("sz", _ANNOTATION_FONT_SZ)  # 设置字体大小
                 # 注释功能使用红色字体以便区分，这是预期行为
-                run.font.color.rgb = RGBColor(255, 0, 0)  # 设置字体颜色为红色
-    prs.save(path_to_presentation)
+                rPr.get_or_change_to_solidFill().get_or_change_to_srgbClr().set("val", _ANNOTATION_FONT_COLOR)
+    save_presentation(prs, path_to_presentation)
 
 
 def is_valid_reference(text):
-    pattern = r"\d+\s*[A-Za-z&\s\.\-]+,\s*\d{4}"
-    return bool(re.match(pattern, text))
+    return bool(_REF_RE.match(text))
 
 
 def is_page_number(text):
     text = text.strip()
 
     # 常见纯数字页码
-    if re.fullmatch(r"\d{1,3}", text):
+    if _PAGENUM_RE.fullmatch(text):
         return True
     return False
 
 
+def collect_slide_text(slide, current_slide_index):
+    """
+    遍历一次幻灯片，收集待翻译文本以及写回译文时需要的段落和表格文本块
+
+    Args:
+        slide: 幻灯片对象
+        current_slide_index: 幻灯片序号（从1开始）
+
+    Returns:
+        (幻灯片文本, [(形状, 文本框, [(段落, 去除首尾空白的段落文本)])], [(表格文本块, 原始文本)])
+    """
+    text_parts = []
+    table_parts = []
+    text_shapes = []
+    table_runs = []
+    table_count = 0
+
+    # 遍历每个形状（包含文本的元素，如文本框）
+    for shape in slide.shapes:
+        if shape.has_text_frame:
+            text_frame = shape.text_frame
+            paragraphs = []
+            for paragraph in text_frame.paragraphs:
+                text = paragraph.text.strip()
+                paragraphs.append((paragraph, text))
+                if text:  # 忽略空文本
+                    text_parts.append(text)
+                    text_parts.append("\n")
+            text_shapes.append((shape, text_frame, paragraphs))
+        elif shape.has_table:  # 检查该形状是否为表格
+            table_count += 1
+            logging.info("处理第 %d 张幻灯片中的表格 #%d", current_slide_index, table_count)
+            # 遍历表格中的每一行、每一列
+            for row in shape.table.rows:
+                for cell in row.cells:
+                    for paragraph in cell.text_frame.paragraphs:
+                        for run in paragraph.runs:
+                            # 获取单元格的文本
+                            run_text = run.text
+                            table_runs.append((run, run_text))
+                            table_parts.append("【")
+                            table_parts.append(run_text.strip())
+                            table_parts.append("】\n")
+
+    # 文本框文本在前，表格文本在后
+    slide_text = "".join(text_parts) + "".join(table_parts)
+    return slide_text, text_shapes, table_runs
+
+
+def build_clean_values(data):
+    """预先计算每条译文去除非单词字符后的形式，供原文/译文是否实质相同的比较使用"""
+    return {k: _NONWORD_RE.sub("", v) for k, v in data.items()}
+
+
+def apply_slide_translations(
+    slide, current_slide_index, data, bilingual_translation, clean_values=None, collected=None
+):
+    """
+    将翻译结果写回单张幻灯片的文本框和表格
+
+    Args:
+        slide: 幻灯片对象
+        current_slide_index: 幻灯片序号（从1开始）
+        data: 翻译映射字典 {原文: 译文}
+        bilingual_translation: 是否双语显示（"1"表示双语）
+        clean_values: 译文去除非单词字符后的形式 {原文: 清理后的译文}，为空时按 data 计算
+        collected: collect_slide_text 返回的 (文本框列表, 表格文本块列表)，为空时重新遍历幻灯片
+
+    Returns:
+        更新的文本块数量
+    """
+    # 应用翻译结果
+    logging.info("开始应用翻译结果到第 %d 张幻灯片...", current_slide_index)
+    text_blocks_updated = 0
+    autofit_shapes = []
+    bilingual = str(bilingual_translation) == "1"
+
+    translation_keys = list(data.keys())
+    if clean_values is None:
+        clean_values = build_clean_values(data)
+    if collected is None:
+        _, text_shapes, table_runs = collect_slide_text(slide, current_slide_index)
+    else:
+        text_shapes, table_runs = collected
+
+    # 本张幻灯片内相同文本的模糊匹配结果只计算一次
+    similar_cache = {}
+
+    def find_similar_cached(text):
+        # 精确命中直接返回，无需模糊匹配
+        if text in data:
+            return text
+        result = similar_cache.get(text)
+        if result is None:
+            result = find_most_similar(text, translation_keys)
+            similar_cache[text] = result
+        return result
+
+    # 本张幻灯片内相同文本的译文查找、清理和相似度判断只做一次
+    # 缓存值为 None 表示该文本不需要写入译文
+    resolved_paragraphs = {}
+    resolved_runs = {}
+
+    def resolve_paragraph(original_text):
+        """返回 (清理后的原文, 译文)，不需要写入译文时返回 None"""
+        if original_text in resolved_paragraphs:
+            return resolved_paragraphs[original_text]
+
+        # 查找翻译
+        translated_text = ""
+        new_text = find_similar_cached(original_text)
+        matched_text = data.get(new_text)
+        if matched_text is not None:
+            clean_text1 = _NONWORD_RE.sub("", original_text)
+            clean_text2 = clean_values[new_text]
+            if clean_text1 != clean_text2:
+                translated_text = matched_text
+
+        cleaned_original = original_text.replace("_x000B_", "").translate(_VB_TABLE)
+        translated_text = translated_text.replace("_x000B_", "").translate(_VB_TABLE)
+        result = None
+        if not is_page_number(cleaned_original) and translated_text and translated_text != cleaned_original:
+            # 检查相似度，如果相似度过高则跳过翻译
+            if should_skip_translation_insertion(cleaned_original, translated_text, threshold=0.9, debug=True):
+                logging.info("跳过高相似度翻译: '%.30s...' -> '%.30s...'", cleaned_original, translated_text)
+            else:
+                result = (cleaned_original, translated_text)
+
+        resolved_paragraphs[original_text] = result
+        return result
+
+    def resolve_run(run_text):
+        """返回表格单元格文本的译文，不需要写入译文时返回 None"""
+        if run_text in resolved_runs:
+            return resolved_runs[run_text]
+
+        result = None
+        new_text = find_similar_cached(run_text)
+        if new_text is not None and new_text in data:
+            translated_text = data[new_text]
+            if _NONWORD_RE.sub("", run_text) != clean_values[new_text]:
+                # 检查相似度，如果相似度过高则跳过翻译
+                if should_skip_translation_insertion(run_text, translated_text, threshold=0.9, debug=True):
+                    logging.info("跳过表格高相似度翻译: '%.30s...' -> '%.30s...'", run_text, translated_text)
+                else:
+                    result = translated_text
+
+        resolved_runs[run_text] = result
+        return result
+
+    for shape, text_frame, paragraphs in text_shapes:
+        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+        needs_autofit = False
+
+        # 没有译文时，任何段落都不会被替换，跳过逐段处理
+        if not data:
+            continue
+
+        for paragraph, original_text in paragraphs:
+            original_text = remove_invalid_utf8_chars(original_text)
+            if not original_text or is_valid_reference(original_text):
+                continue
+
+            resolved = resolve_paragraph(original_text)
+            if resolved is None:
+                continue
+            original_text, translated_text = resolved
+
+            # 保存原始颜色
+            runs = paragraph.runs
+            original_color = get_font_color(runs[0]) if runs else None
+
+            # 应用翻译
+            text_blocks_updated += 1
+            needs_autofit = True
+            paragraph.clear()
+            run = paragraph.add_run()
+            if bilingual:
+                run.text = original_text + "\n" + translated_text
+            else:
+                run.text = translated_text
+            run.font.size = Pt(24)  # 例如字体大小，可根据需要调整
+
+            # 恢复颜色
+            if original_color:
+                apply_font_color(run, original_color)
+
+        # 只对实际写入了译文的形状做自适应和尺寸保护
+        if needs_autofit:
+            autofit_shapes.append(shape)
+
+    # 处理表格翻译
+    cells_updated = 0
+    for run, run_text in table_runs:
+        run.font.size = Pt(10)
+        translated_text = resolve_run(run_text)
+        if translated_text is None:
+            continue
+
+        cells_updated += 1
+        if bilingual:
+            run.text = run_text + "\n" + translated_text + "\n"
+        else:
+            run.text = translated_text + "\n"
+
+    # 安全地设置自适应并保护形状大小（整张幻灯片批量处理）
+    batch_set_autofit_with_size_preservation(autofit_shapes)
+
+    logging.info("第 %d 张幻灯片处理完成，更新了 %d 个文本块", current_slide_index, text_blocks_updated)
+
+    return text_blocks_updated
+
+
 def process_presentation(
     path_to_presentation,
     stop_words_list,
@@ -830,185 +1353,108 @@ def process_presentation(
 
         # 获取领域
         logging.info("正在分析文本领域...")
-        field = str(get_field(all_text))
+        field = get_field_cached(all_text)
         logging.info(f"文本领域分析结果: {field}")
 
-        # 处理每张幻灯片
+        # 收集每张选中幻灯片的文本，准备翻译任务
         processed_slides = 0
         skipped_slides = 0
+        slide_tasks = []
+        # 停止词/自定义翻译的匹配索引整份演示文稿共用
+        word_automaton = build_word_automaton(stop_words_list, custom_translations)
 
         for current_slide_index, slide in enumerate(prs.slides, 1):
-            # 更新翻译进度
-            # 由于缺少task_id参数，这里暂时使用用户ID进行更新
-            # 这是一个临时解决方案，理想情况下，应该从调用方传入task_id
-            # 在实际使用时，应该从任务上下文中获取用户ID，而不是使用硬编码的值
-            translation_queue.update_progress_by_user(1, current_slide_index, total_slides)  # 替换为按用户ID更新进度
-
             # 检查是否需要处理当前幻灯片
             if current_slide_index not in select_page:
-                logging.info(f"跳过第 {current_slide_index} 张幻灯片 (不在选中页面列表中)")
+                logging.info("跳过第 %d 张幻灯片 (不在选中页面列表中)", current_slide_index)
                 skipped_slides += 1
                 continue
 
-            logging.info(f"开始处理第 {current_slide_index} 张幻灯片 ({current_slide_index}/{total_slides})")
-
-            # 收集当前幻灯片的文本
-            slide_text = ""
-            # 遍历每个形状（包含文本的元素，如文本框）
-            for shape in slide.shapes:
-                if shape.has_text_frame:
-                    text_frame = shape.text_frame
-                    for paragraph in text_frame.paragraphs:
-                        text = paragraph.text.strip()
-                        if text:  # 忽略空文本
-                            slide_text += text + "\n"
-
-            # 处理表格
-            table_count = 0
-            for shape in slide.shapes:
-                if shape.has_table:  # 检查该形状是否为表格
-                    table_count += 1
-                    logging.info(f"处理第 {current_slide_index} 张幻灯片中的表格 #{table_count}")
-                    # 获取表格
-                    table = shape.table
-                    # 遍历表格中的每一行
-                    for row in table.rows:
-                        # 遍历每一列
-                        for cell in row.cells:
-                            for paragraph in cell.text_frame.paragraphs:
-                                for run in paragraph.runs:
-                                    # 获取单元格的文本
-                                    text = run.text.strip()
-                                    slide_text += "【" + text + "】" + "\n"
-
-            logging.info(f"第 {current_slide_index} 张幻灯片文本收集完成，共 {len(slide_text)} 个字符")
-
-            # 筛选停止词和自定义翻译
-            logging.info("正在筛选适用的停止词和自定义翻译...")
-            stop_words = list()
-            custom_words = dict()
-            for i in stop_words_list:
-                if i in slide_text:
-                    stop_words.append(i)
-
-            for k, v in custom_translations.items():
-                if k in slide_text:
-                    custom_words[k] = v
-
-            logging.info(f"应用 {len(stop_words)} 个停止词和 {len(custom_words)} 个自定义翻译")
-
-            # 翻译文本
-            logging.info(f"开始翻译第 {current_slide_index} 张幻灯片...")
-            data = translate_local_qwen(slide_text, field, stop_words, custom_words, source_language, target_language)
-            logging.info(f"翻译完成，获得 {len(list(data.keys()))} 个翻译结果")
-
-            # 应用翻译结果
-            logging.info(f"开始应用翻译结果到第 {current_slide_index} 张幻灯片...")
-            text_blocks_updated = 0
-
-            for shape in slide.shapes:
-                if shape.has_text_frame:
-                    text_frame = shape.text_frame
-                    text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-
-                    for paragraph in text_frame.paragraphs:
-                        original_text = paragraph.text.strip()
-                        original_text = remove_invalid_utf8_chars(original_text)
-                        if original_text:  # Ensure text is not empty
-                            if is_valid_reference(original_text):
-                                continue
-
-                            # 保存原始颜色
-                            if paragraph.runs:
-                                original_color = get_font_color(paragraph.runs[0])
-                            else:
-                                original_color = None
-
-                            # 查找翻译
-                            translated_text = ""
-                            new_text = find_most_similar(original_text, list(data.keys()))
-                            if new_text in data:
-                                clean_text1 = re.sub(r"[^\w]", "", original_text)
-                                clean_text2 = re.sub(r"[^\w]", "", data[new_text])
-                                if clean_text1 != clean_text2:
-                                    translated_text = data[new_text]
-
-                            # 应用翻译
-                            original_text = re.sub(r"_x000B_|\u000B", "", original_text)
-                            translated_text = re.sub(r"_x000B_|\u000B", "", translated_text)
-                            if not is_page_number(original_text):
-                                if translated_text != original_text and translated_text:
-                                    # 检查相似度，如果相似度过高则跳过翻译
-                                    if should_skip_translation_insertion(
-                                        original_text, translated_text, threshold=0.9, debug=True
-                                    ):
-                                        logging.info(
-                                            f"跳过高相似度翻译: '{original_text[:30]}...' -> '{translated_text[:30]}...'"
-                                        )
-                                        continue
-
-                                    text_blocks_updated += 1
-                                    paragraph.clear()
-                                    run = paragraph.add_run()
-                                    if str(bilingual_translation) == "1":
-                                        run.text = original_text + "\n" + translated_text
-                                    else:
-                                        run.text = translated_text
-                                    run.font.size = Pt(24)  # 例如字体大小，可根据需要调整
-
-                            # 恢复颜色
-                            if original_color:
-                                apply_font_color(run, original_color)
-
-                            # 安全地设置自适应并保护形状大小
-                            safe_set_autofit_with_size_preservation(text_frame, shape)
-                elif shape.has_table:  # 检查该形状是否为表格
-                    # 处理表格翻译
-                    table = shape.table
-                    cells_updated = 0
-                    # 遍历表格中的每一行
-                    for row in table.rows:
-                        # 遍历每一列
-                        for cell in row.cells:
-                            for paragraph in cell.text_frame.paragraphs:
-                                for run in paragraph.runs:
-                                    run.font.size = Pt(10)
-                                    # 获取单元格的文本
-                                    new_text = find_most_similar(run.text, list(data.keys()))
-                                    if new_text is None or new_text not in data:
-                                        clean_text2 = ""
-                                    else:
-                                        clean_text1 = re.sub(r"[^\w]", "", run.text)
-                                        clean_text2 = re.sub(r"[^\w]", "", data[new_text])
-
-                                        if clean_text1 != clean_text2:
-                                            # 检查相似度，如果相似度过高则跳过翻译
-                                            if should_skip_translation_insertion(
-                                                run.text, data[new_text], threshold=0.9, debug=True
-                                            ):
-                                                logging.info(
-                                                    f"跳过表格高相似度翻译: '{run.text[:30]}...' -> '{data[new_text][:30]}...'"
-                                                )
-                                                continue
-
-                                            cells_updated += 1
-                                            if str(bilingual_translation) == "1":
-                                                run.text = run.text + "\n" + data[new_text] + "\n"
-                                            else:
-                                                run.text = data[new_text] + "\n"
-
-            logging.info(f"第 {current_slide_index} 张幻灯片处理完成，更新了 {text_blocks_updated} 个文本块")
-            processed_slides += 1
+            # 收集当前幻灯片的文本，同时记录段落和表格文本块供写回时复用
+            slide_text, text_shapes, table_runs = collect_slide_text(slide, current_slide_index)
+            logging.info("第 %d 张幻灯片文本收集完成，共 %d 个字符", current_slide_index, len(slide_text))
+
+            slide_tasks.append((current_slide_index, slide, slide_text, (text_shapes, table_runs)))
+
+        # 将文本较少的相邻幻灯片合并为一个翻译批次，减少LLM请求次数
+        slide_batches = []
+        batch_indices, batch_texts, batch_chars = [], [], 0
+        for current_slide_index, _, slide_text, _ in slide_tasks:
+            if batch_indices and batch_chars + len(slide_text) > _SLIDE_BATCH_MAX_CHARS:
+                slide_batches.append((batch_indices, "".join(batch_texts)))
+                batch_indices, batch_texts, batch_chars = [], [], 0
+            batch_indices.append(current_slide_index)
+            batch_texts.append(slide_text)
+            batch_chars += len(slide_text)
+        if batch_indices:
+            slide_batches.append((batch_indices, "".join(batch_texts)))
+
+        # 并发翻译各批次（各批次的翻译相互独立）
+        logging.info(
+            f"开始并发翻译 {len(slide_tasks)} 张幻灯片，共 {len(slide_batches)} 个批次 "
+            f"(并发数: {_SLIDE_TRANSLATION_WORKERS})..."
+        )
+        slides_by_index = {
+            current_slide_index: (slide, collected) for current_slide_index, slide, _, collected in slide_tasks
+        }
+        with ThreadPoolExecutor(max_workers=_SLIDE_TRANSLATION_WORKERS) as executor:
+            futures = {}
+            for batch_indices, batch_text in slide_batches:
+                # 筛选停止词和自定义翻译
+                stop_words, custom_words = filter_applicable_words(
+                    batch_text, stop_words_list, custom_translations, word_automaton
+                )
+                logging.info(
+                    f"第 {batch_indices[0]}-{batch_indices[-1]} 张幻灯片应用 "
+                    f"{len(stop_words)} 个停止词和 {len(custom_words)} 个自定义翻译"
+                )
+                future = executor.submit(
+                    translate_qwen_cached,
+                    batch_text,
+                    field,
+                    stop_words,
+                    custom_words,
+                    source_language,
+                    target_language,
+                )
+                futures[future] = batch_indices
+
+            completed_count = 0
+            for future in as_completed(futures):
+                batch_indices = futures[future]
+                data = future.result()
+                clean_values = build_clean_values(data)
+                logging.info(
+                    f"第 {batch_indices[0]}-{batch_indices[-1]} 张幻灯片翻译完成，获得 {len(data)} 个翻译结果"
+                )
+
+                # 批次翻译完成后立即写回，与其余批次的翻译请求重叠进行
+                # （写入操作会修改演示文稿，只在当前线程中串行执行）
+                for current_slide_index in batch_indices:
+                    slide, collected = slides_by_index[current_slide_index]
+                    apply_slide_translations(
+                        slide,
+                        current_slide_index,
+                        data,
+                        bilingual_translation,
+                        clean_values,
+                        collected,
+                    )
+                    processed_slides += 1
+                completed_count += len(batch_indices)
+                # 更新翻译进度
+                # 由于缺少task_id参数，这里暂时使用用户ID进行更新
+                # 这是一个临时解决方案，理想情况下，应该从调用方传入task_id
+                # 在实际使用时，应该从任务上下文中获取用户ID，而不是使用硬编码的值
+                translation_queue.update_progress_by_user(1, completed_count, len(slide_tasks))
 
         # 保存演示文稿
         logging.info("正在保存演示文稿...")
-        prs.save(path_to_presentation)
+        save_presentation(prs, path_to_presentation)
         logging.info(f"演示文稿处理完成: 处理了 {processed_slides} 张幻灯片，跳过了 {skipped_slides} 张幻灯片")
         return True
     except Exception as e:
         logging.error(f"处理演示文稿时出错: {str(e)}")
-        import traceback
-
         logging.error(traceback.format_exc())
         return False
 
@@ -1028,37 +1474,33 @@ def has_meaningful_text_content(text_frame):
             return False
 
         # 检查所有段落
-        total_text = ""
-        for paragraph in text_frame.paragraphs:
-            for run in paragraph.runs:
-                if run.text:
-                    total_text += run.text
+        total_text = "".join(run.text for paragraph in text_frame.paragraphs for run in paragraph.runs)
 
         # 去除空白字符
         total_text = total_text.strip()
 
-        # 如果没有文本，返回False
-        if not total_text:
+        # 如果没有文本或只是单个字符，返回False
+        if len(total_text) <= 1:
             return False
 
+        # 含有字母（包括中日韩文字）时，以下各项正则均不可能匹配，直接判定为有意义
+        if any(ch.isalpha() for ch in total_text):
+            return True
+
         # 检查是否只是空白字符、换行符等
-        if re.match(r"^[\s\n\r\t]*$", total_text):
+        if _WS_RE.match(total_text):
             return False
 
         # 检查是否只是纯数字（页码等）
-        if re.match(r"^[\d\s\.,\-%]+$", total_text):
+        if _NUM_RE.match(total_text):
             return False
 
         # 检查是否只是纯标点符号
-        if re.match(r"^[^\w\s]+$", total_text):
-            return False
-
-        # 检查是否只是单个字符
-        if len(total_text) <= 1:
+        if _PUNCT_RE.match(total_text):
             return False
 
         # 检查是否只是特殊字符
-        if re.match(r"^[\s\-_=+\*#@$%^&()]+$", total_text):
+        if _SPECIAL_RE.match(total_text):
             return False
 
         # 如果通过了所有检查，认为包含有意义的文字
@@ -1066,7 +1508,7 @@ def has_meaningful_text_content(text_frame):
 
     except Exception as e:
         # 出错时保守处理，认为包含文字（避免跳过需要处理的文本框）
-        logging.debug(f"检测文本内容时出错: {e}")
+        logging.debug("检测文本内容时出错: %s", e)
         return True
 
 
@@ -1095,7 +1537,7 @@ def should_adjust_textbox_layout(shape):
 
     except Exception as e:
         # 出错时保守处理，进行调整（避免跳过需要处理的文本框）
-        logging.debug(f"判断是否调整文本框时出错: {e}")
+        logging.debug("判断是否调整文本框时出错: %s", e)
         return True
 
 
@@ -1113,11 +1555,7 @@ def get_textbox_content_summary(text_frame):
         if not text_frame or not hasattr(text_frame, "paragraphs"):
             return "无文本框"
 
-        total_text = ""
-        for paragraph in text_frame.paragraphs:
-            for run in paragraph.runs:
-                if run.text:
-                    total_text += run.text
+        total_text = "".join(run.text for paragraph in text_frame.paragraphs for run in paragraph.runs)
 
         total_text = total_text.strip()
 
@@ -1147,20 +1585,19 @@ def safe_set_autofit_with_content_check(text_frame, shape, debug=False):
     try:
         # 检查是否应该调整
         if not should_adjust_textbox_layout(shape):
+            content_summary = get_textbox_content_summary(text_frame)
             if debug:
-                content_summary = get_textbox_content_summary(text_frame)
-                logging.info(f"跳过文本框调整: {content_summary}")
+                logging.info("跳过文本框调整: %s", content_summary)
 
             return {
                 "adjusted": False,
                 "reason": "no_meaningful_content",
-                "content": get_textbox_content_summary(text_frame),
+                "content": content_summary,
             }
 
         # 包含有意义的文字，进行调整
         if debug:
-            content_summary = get_textbox_content_summary(text_frame)
-            logging.info(f"调整文本框: {content_summary}")
+            logging.info("调整文本框: %s", get_textbox_content_summary(text_frame))
 
         # 使用现有的复杂形状处理逻辑
         success = safe_set_autofit_with_size_preservation(text_frame, shape)
@@ -11,6 +11,10 @@ import logging
 import re
 import json
 import platform
+import threading
+import gc
+import importlib
+import traceback
 from typing import Dict, List, Any, Optional, Union, Tuple
 import concurrent.futures
 from pptx import Presentation
@@ -19,6 +23,12 @@ from pptx.dml.color import RGBColor
 from pptx.util import Pt, Inches
 import difflib
 
+# 可选依赖：RapidFuzz 批量模糊匹配（C实现），未安装时回退到 difflib
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
 # 导入异步API客户端
 from .local_qwen_async import translate_async, batch_translate_async, get_field_async
 # 导入其他翻译模型的异步客户端
@@ -40,7 +50,10 @@ from .ppt_translate import (
     has_meaningful_text_content,
     should_adjust_textbox_layout,
     get_textbox_content_summary,
-    safe_set_autofit_with_content_check
+    safe_set_autofit_with_content_check,
+    save_presentation,
+    build_word_automaton,
+    filter_applicable_words
 )
 
 # 配置日志记录器
@@ -50,6 +63,56 @@ logger = logging.getLogger(__name__)
 BATCH_SIZE = 20  # 每批处理的文本数量
 MAX_BATCH_CHAR_COUNT = 2000  # 每批最大字符数
 SLIDE_PROCESSING_THREADS = 3  # 幻灯片并行处理线程数（减少以避免资源竞争）
+ANNOTATION_BATCH_SIZE = 12  # 注释翻译每个请求包含的注释数量
+
+# 段落级翻译缓存：(原文, 源语言, 目标语言, 领域, 模型, 停止词, 自定义词典) -> 译文 或 正在翻译中的 Future
+# 模板化PPT中重复的页眉页脚、标题只需请求一次API；停止词和自定义词典也是键的一部分，
+# 不同任务的词表互不影响。多个事件循环线程可能同时访问，用线程锁保护
+_TRANSLATION_CACHE: Dict[tuple, Any] = {}
+_TRANSLATION_CACHE_MAX_ENTRIES = 4096
+_TRANSLATION_CACHE_LOCK = threading.Lock()
+
+# 阻塞操作专用线程池：COM 调用在单线程套间中本就串行执行，单线程即可；
+# python-pptx 的读写与形状遍历使用独立的小线程池，避免与默认线程池中的其他任务互相挤占
+_com_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='ppt-com')
+_pptx_pool = concurrent.futures.ThreadPoolExecutor(max_workers=SLIDE_PROCESSING_THREADS, thread_name_prefix='pptx-io')
+# run_async_in_thread 在已有事件循环时使用的常驻线程池，避免每次调用都创建并销毁线程
+_ASYNC_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv("PPT_ASYNC_WORKERS", "4")), thread_name_prefix='ppt-async'
+)
+# 上述线程池中各工作线程的常驻事件循环
+_WORKER_LOOPS = threading.local()
+
+# 按需导入的重量级模块（COM布局调整、UNO、OCR），首次使用时导入一次后复用
+_LAZY_MODULES: Dict[str, Any] = {}
+
+def _lazy_module(name: str):
+    """
+    按需导入并缓存模块
+
+    Args:
+        name: 相对于本包的模块名，如 '.adjust_text_size'
+
+    Returns:
+        模块对象
+    """
+    module = _LAZY_MODULES.get(name)
+    if module is None:
+        module = _LAZY_MODULES[name] = importlib.import_module(name, __package__)
+    return module
+
+# 模型名称 -> 异步翻译函数
+_MODEL_DISPATCH = {
+    'qwen': translate_async,
+    'deepseek': None,  # TODO: translate_deepseek_async
+    'gpt-4o': None,  # TODO: translate_gpt4o_async
+}
+
+# 预编译的正则：引用和页码判断会对每个段落调用
+_REF_RE = re.compile(r'\d+\s*[A-Za-z&\s\.\-]+,\s*\d{4}')
+_PAGE_RE = re.compile(r'\d{1,3}')
+# 比较文本时删除的空白字符
+_SPACE_TABLE = str.maketrans('', '', ' \t\u3000')
 
 def get_font_color(run):
     """获取文本颜色，处理RGB颜色和主题颜色"""
@@ -68,78 +131,90 @@ def apply_font_color(run, color):
         run.font.color.theme_color = color
 
 def compare_strings_ignore_spaces(str1, str2):
-    """比较两个字符串，忽略空格"""
-    str1_no_spaces = str1.replace(" ", "")
-    str2_no_spaces = str2.replace(" ", "")
-    return str1_no_spaces == str2_no_spaces
+    """比较两个字符串，忽略空格（含制表符和全角空格）"""
+    return str1.translate(_SPACE_TABLE) == str2.translate(_SPACE_TABLE)
 
 def find_most_similar(target, candidates):
     """从候选列表中找到与目标最相似的字符串"""
     if not candidates:
         return None
-    return max(candidates, key=lambda x: difflib.SequenceMatcher(None, target, x).ratio())
+    if process is not None:
+        return process.extractOne(target, candidates, scorer=fuzz.ratio)[0]
+    # 复用同一个匹配器，只替换候选串；目标串保持在 seq1
+    # （ratio 不对称，角色须与 SequenceMatcher(None, target, candidate) 一致）
+    matcher = difflib.SequenceMatcher(None, target)
+
+    def _ratio(candidate):
+        matcher.set_seq2(candidate)
+        return matcher.ratio()
+
+    return max(candidates, key=_ratio)
 
 def remove_invalid_utf8_chars(s: str) -> str:
     """移除字符串中无效的UTF-8字符"""
+    # 纯ASCII文本不可能包含无效字符，跳过编解码往返
+    if s.isascii():
+        return s
     utf8_bytes = s.encode('utf-8', errors='ignore')
     clean_str = utf8_bytes.decode('utf-8', errors='ignore')
     return clean_str
 
 def is_valid_reference(text):
     """检查文本是否为有效的参考文献"""
-    pattern = r'\d+\s*[A-Za-z&\s\.\-]+,\s*\d{4}'
-    return bool(re.match(pattern, text))
+    return bool(_REF_RE.match(text))
 
 def is_page_number(text):
     """检查文本是否为页码"""
-    text = text.strip()
-    if re.fullmatch(r'\d{1,3}', text):
-        return True
-    return False
+    return _PAGE_RE.fullmatch(text.strip()) is not None
 
-async def _adjust_ppt_layout_async(presentation_path: str) -> bool:
+async def _run_autofit(fn_name: str, presentation_path: str, executor) -> bool:
     """
-    异步调整PPT布局，使用现有的set_textbox_autofit函数
+    在线程池中调用 adjust_text_size 模块中的布局调整函数
 
     Args:
+        fn_name: 布局调整函数名
         presentation_path: PPT文件路径
+        executor: 执行该调用的线程池
 
     Returns:
         调整是否成功
     """
-    try:
-        # 在线程池中执行COM操作以避免阻塞
-        loop = asyncio.get_event_loop()
+    def _call():
+        try:
+            autofit_func = getattr(_lazy_module('.adjust_text_size'), fn_name)
 
-        def _call_set_textbox_autofit():
-            """调用现有的set_textbox_autofit函数"""
-            try:
-                # 导入set_textbox_autofit函数
-                from .adjust_text_size import set_textbox_autofit
+            # 获取绝对路径
+            abs_path = os.path.abspath(presentation_path)
+            logger.debug(f"调用{fn_name}，文件路径: {abs_path}")
 
-                # 获取绝对路径
-                abs_path = os.path.abspath(presentation_path)
-                logger.debug(f"调用set_textbox_autofit，文件路径: {abs_path}")
+            if autofit_func(abs_path):
+                logger.info(f"{fn_name}调用成功")
+                return True
+            logger.warning(f"{fn_name}调用失败")
+            return False
 
-                # 调用现有的布局调整函数
-                result = set_textbox_autofit(abs_path)
+        except (ImportError, AttributeError) as import_error:
+            logger.warning(f"无法导入{fn_name}函数: {import_error}")
+            return False
+        except Exception as e:
+            logger.error(f"调用{fn_name}时出错: {e}")
+            return False
 
-                if result:
-                    logger.info("set_textbox_autofit调用成功")
-                    return True
-                else:
-                    logger.warning("set_textbox_autofit调用失败")
-                    return False
+    return await asyncio.get_running_loop().run_in_executor(executor, _call)
 
-            except ImportError as import_error:
-                logger.warning(f"无法导入set_textbox_autofit函数: {import_error}")
-                return False
-            except Exception as e:
-                logger.error(f"调用set_textbox_autofit时出错: {e}")
-                return False
+async def _adjust_ppt_layout_async(presentation_path: str) -> bool:
+    """
+    异步调整PPT布局，使用现有的set_textbox_autofit函数
 
-        # 在线程池中执行COM操作
-        result = await loop.run_in_executor(None, _call_set_textbox_autofit)
+    Args:
+        presentation_path: PPT文件路径
+
+    Returns:
+        调整是否成功
+    """
+    try:
+        # 在COM线程池中执行以避免阻塞
+        result = await _run_autofit('set_textbox_autofit', presentation_path, _com_pool)
 
         # 如果COM操作失败，尝试基础调整
         if not result:
@@ -165,41 +240,7 @@ async def _basic_layout_adjustment_async(presentation_path: str) -> bool:
         调整是否成功
     """
     try:
-        # 在线程池中执行非COM操作以避免阻塞
-        loop = asyncio.get_event_loop()
-
-        def _call_set_textbox_autofit_no_com():
-            """调用非COM的set_textbox_autofit函数"""
-            try:
-                # 导入非COM的set_textbox_autofit函数
-                from .adjust_text_size import set_textbox_autofit_no_com
-
-                # 获取绝对路径
-                abs_path = os.path.abspath(presentation_path)
-                logger.debug(f"调用set_textbox_autofit_no_com，文件路径: {abs_path}")
-
-                # 调用非COM的布局调整函数
-                result = set_textbox_autofit_no_com(abs_path)
-
-                if result:
-                    logger.info("set_textbox_autofit_no_com调用成功")
-                    return True
-                else:
-                    logger.warning("set_textbox_autofit_no_com调用失败")
-                    return False
-
-            except ImportError as import_error:
-                logger.warning(f"无法导入set_textbox_autofit_no_com函数: {import_error}")
-                return False
-            except Exception as e:
-                logger.error(f"调用set_textbox_autofit_no_com时出错: {e}")
-                return False
-
-        # 在线程池中执行非COM操作
-        result = await loop.run_in_executor(None, _call_set_textbox_autofit_no_com)
-
-        return result
-
+        return await _run_autofit('set_textbox_autofit_no_com', presentation_path, _pptx_pool)
     except Exception as e:
         logger.error(f"基础布局调整过程出错: {e}")
         return False
@@ -216,63 +257,74 @@ async def _force_com_layout_adjustment_async(presentation_path: str) -> bool:
         调整是否成功
     """
     try:
-        # 在线程池中执行COM操作以避免阻塞
-        loop = asyncio.get_event_loop()
+        return await _run_autofit('set_textbox_autofit_com', presentation_path, _com_pool)
+    except Exception as e:
+        logger.error(f"强制COM布局调整过程出错: {e}")
+        return False
 
-        def _call_set_textbox_autofit_com():
-            """调用COM的set_textbox_autofit函数"""
-            try:
-                # 导入COM的set_textbox_autofit函数
-                from .adjust_text_size import set_textbox_autofit_com
 
-                # 获取绝对路径
-                abs_path = os.path.abspath(presentation_path)
-                logger.debug(f"调用set_textbox_autofit_com，文件路径: {abs_path}")
+def _iter_paragraph_texts(prs):
+    """逐个产出演示文稿中所有文本框的非空段落文本（已去除首尾空白）"""
+    for slide in prs.slides:
+        for shape in slide.shapes:
+            if not shape.has_text_frame:
+                continue
+            for paragraph in shape.text_frame.paragraphs:
+                text = paragraph.text.strip()
+                if text:
+                    yield text
 
-                # 调用COM的布局调整函数
-                result = set_textbox_autofit_com(abs_path)
 
-                if result:
-                    logger.info("set_textbox_autofit_com调用成功")
-                    return True
-                else:
-                    logger.warning("set_textbox_autofit_com调用失败")
-                    return False
+def _open_presentation(presentation):
+    """
+    接受文件路径或已加载的Presentation对象，避免同一文件被重复解压和解析XML
 
-            except ImportError as import_error:
-                logger.warning(f"无法导入set_textbox_autofit_com函数: {import_error}")
-                return False
-            except Exception as e:
-                logger.error(f"调用set_textbox_autofit_com时出错: {e}")
-                return False
+    Args:
+        presentation: PPT文件路径或Presentation对象
+
+    Returns:
+        (Presentation对象, 需要回写的文件路径；传入对象时为None，由调用方负责保存)
+    """
+    if isinstance(presentation, (str, os.PathLike)):
+        return Presentation(presentation), presentation
+    return presentation, None
 
-        # 在线程池中执行COM操作
-        result = await loop.run_in_executor(None, _call_set_textbox_autofit_com)
+def _set_text_to_fit_shape(text_frame, word_wrap: bool = False):
+    """
+    直接修改 <a:bodyPr>，等价于设置 auto_size = TEXT_TO_FIT_SHAPE（及 word_wrap = True）
 
-        return result
+    已经是 <a:normAutofit/> 的文本框保持不变，省去属性描述符和重建XML元素的开销
 
-    except Exception as e:
-        logger.error(f"强制COM布局调整过程出错: {e}")
-        return False
+    Args:
+        text_frame: 文本框对象
+        word_wrap: 是否同时开启自动换行
+    """
+    body_pr = text_frame._bodyPr
+    # 已有 normAutofit 时直接返回，否则移除其他 autofit 元素后按架构顺序插入
+    body_pr.get_or_change_to_normAutofit()
+    if word_wrap:
+        body_pr.set('wrap', 'square')
 
-async def ensure_all_textboxes_autofit_async(presentation_path: str) -> bool:
+async def ensure_all_textboxes_autofit_async(presentation_path: Union[str, Any]) -> bool:
     """
     确保PPT中所有文本框都设置为自动调整大小
     这是一个专门的函数，用于解决文本框未全部设置为MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE的问题
 
     Args:
-        presentation_path: PPT文件路径
+        presentation_path: PPT文件路径，或已加载的Presentation对象（此时只修改内存中的对象，不读写文件）
 
     Returns:
         调整是否成功
     """
     try:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
 
         def _ensure_all_autofit():
+            # 逐形状的详细日志只在调试级别开启，避免每个形状重复生成内容摘要
+            verbose = logger.isEnabledFor(logging.DEBUG)
             try:
                 # 加载演示文稿
-                prs = Presentation(presentation_path)
+                prs, save_path = _open_presentation(presentation_path)
 
                 total_shapes = 0
                 total_textboxes = 0
@@ -283,7 +335,7 @@ async def ensure_all_textboxes_autofit_async(presentation_path: str) -> bool:
 
                 # 遍历所有幻灯片
                 for slide_index, slide in enumerate(prs.slides, 1):
-                    logger.debug(f"检查第 {slide_index} 张幻灯片的所有形状...")
+                    logger.debug("检查第 %s 张幻灯片的所有形状...", slide_index)
 
                     for shape_index, shape in enumerate(slide.shapes):
                         total_shapes += 1
@@ -295,41 +347,40 @@ async def ensure_all_textboxes_autofit_async(presentation_path: str) -> bool:
                                 text_frame = shape.text_frame
 
                                 # 使用内容检测的增强自适应设置
-                                result = safe_set_autofit_with_content_check(text_frame, shape, debug=True)
-                                text_frame.word_wrap = True
+                                result = safe_set_autofit_with_content_check(text_frame, shape, debug=verbose)
+                                text_frame._bodyPr.set('wrap', 'square')
 
                                 if result['adjusted']:
                                     processed_textboxes += 1
-                                    logger.debug(f"✓ 幻灯片{slide_index}-形状{shape_index+1}: 已设置文本框自动调整，内容: {result['content']}")
+                                    logger.debug("✓ 幻灯片%s-形状%s: 已设置文本框自动调整，内容: %s", slide_index, shape_index+1, result['content'])
                                 else:
-                                    logger.debug(f"跳过幻灯片{slide_index}-形状{shape_index+1}: {result['reason']}")
+                                    logger.debug("跳过幻灯片%s-形状%s: %s", slide_index, shape_index+1, result['reason'])
 
                             # 处理表格
                             elif shape.has_table:
                                 table = shape.table
-                                logger.debug(f"处理表格: {table.rows} 行 x {table.columns} 列")
+                                logger.debug("处理表格: %d 行 x %d 列", len(table.rows), len(table.columns))
 
                                 for row_index, row in enumerate(table.rows):
                                     for col_index, cell in enumerate(row.cells):
                                         total_textboxes += 1
 
                                         # 表格单元格的文本框
-                                        text_frame = cell.text_frame
-                                        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-                                        text_frame.word_wrap = True
+                                        _set_text_to_fit_shape(cell.text_frame, word_wrap=True)
 
                                         processed_textboxes += 1
-                                        logger.debug(f"✓ 幻灯片{slide_index}-表格单元格({row_index+1},{col_index+1}): 已设置自动调整")
+                                        logger.debug("✓ 幻灯片%s-表格单元格(%s,%s): 已设置自动调整", slide_index, row_index+1, col_index+1)
 
                             else:
                                 skipped_shapes += 1
-                                logger.debug(f"跳过非文本形状: 幻灯片{slide_index}-形状{shape_index+1} (类型: {shape.shape_type})")
+                                logger.debug("跳过非文本形状: 幻灯片%s-形状%s (类型: %s)", slide_index, shape_index+1, shape.shape_type)
 
                         except Exception as shape_error:
                             logger.warning(f"处理幻灯片{slide_index}-形状{shape_index+1}时出错: {shape_error}")
 
                 # 保存演示文稿
-                prs.save(presentation_path)
+                if save_path is not None:
+                    prs.save(save_path)
 
                 logger.info(f"文本框自动调整设置完成:")
                 logger.info(f"  - 总形状数: {total_shapes}")
@@ -342,34 +393,35 @@ async def ensure_all_textboxes_autofit_async(presentation_path: str) -> bool:
 
             except Exception as e:
                 logger.error(f"确保文本框自动调整失败: {e}")
-                import traceback
                 logger.error(f"错误详情: {traceback.format_exc()}")
                 return False
 
         # 在线程池中执行文件操作
-        return await loop.run_in_executor(None, _ensure_all_autofit)
+        return await loop.run_in_executor(_pptx_pool, _ensure_all_autofit)
 
     except Exception as e:
         logger.error(f"确保文本框自动调整过程出错: {e}")
         return False
 
-async def _preserve_textbox_size_with_autofit_async(presentation_path: str) -> bool:
+async def _preserve_textbox_size_with_autofit_async(presentation_path: Union[str, Any]) -> bool:
     """
     异步设置文本框自适应并保持原始大小
 
     Args:
-        presentation_path: PPT文件路径
+        presentation_path: PPT文件路径，或已加载的Presentation对象（此时只修改内存中的对象，不读写文件）
 
     Returns:
         调整是否成功
     """
     try:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
 
         def _preserve_size_autofit():
+            # 逐形状的详细日志只在调试级别开启，避免每个形状重复生成内容摘要
+            verbose = logger.isEnabledFor(logging.DEBUG)
             try:
                 # 加载演示文稿
-                prs = Presentation(presentation_path)
+                prs, save_path = _open_presentation(presentation_path)
 
                 total_textboxes = 0
                 processed_textboxes = 0
@@ -379,7 +431,7 @@ async def _preserve_textbox_size_with_autofit_async(presentation_path: str) -> b
 
                 # 遍历所有幻灯片
                 for slide_index, slide in enumerate(prs.slides, 1):
-                    logger.debug(f"处理第 {slide_index} 张幻灯片的文本框...")
+                    logger.debug("处理第 %s 张幻灯片的文本框...", slide_index)
 
                     for shape_index, shape in enumerate(slide.shapes):
                         try:
@@ -395,10 +447,10 @@ async def _preserve_textbox_size_with_autofit_async(presentation_path: str) -> b
 
                                 # 使用内容检测的增强自适应设置
                                 text_frame = shape.text_frame
-                                result = safe_set_autofit_with_content_check(text_frame, shape, debug=True)
+                                result = safe_set_autofit_with_content_check(text_frame, shape, debug=verbose)
 
                                 if not result['adjusted']:
-                                    logger.debug(f"跳过文本框: 幻灯片{slide_index}-形状{shape_index+1}, 原因: {result['reason']}")
+                                    logger.debug("跳过文本框: 幻灯片%s-形状%s, 原因: %s", slide_index, shape_index+1, result['reason'])
                                     continue
 
                                 # 检查并恢复原始尺寸
@@ -413,15 +465,15 @@ async def _preserve_textbox_size_with_autofit_async(presentation_path: str) -> b
                                     shape.top = original_top
 
                                     size_preserved_count += 1
-                                    logger.debug(f"✓ 已恢复文本框原始尺寸: 幻灯片{slide_index}-形状{shape_index+1}")
+                                    logger.debug("✓ 已恢复文本框原始尺寸: 幻灯片%s-形状%s", slide_index, shape_index+1)
 
                                 processed_textboxes += 1
-                                logger.debug(f"✓ 幻灯片{slide_index}-形状{shape_index+1}: 已设置文本框自适应")
+                                logger.debug("✓ 幻灯片%s-形状%s: 已设置文本框自适应", slide_index, shape_index+1)
 
                             # 处理表格
                             elif shape.has_table:
                                 table = shape.table
-                                logger.debug(f"处理表格: {table.rows} 行 x {table.columns} 列")
+                                logger.debug("处理表格: %d 行 x %d 列", len(table.rows), len(table.columns))
 
                                 # 记录表格原始尺寸
                                 table_original_width = shape.width
@@ -434,11 +486,10 @@ async def _preserve_textbox_size_with_autofit_async(presentation_path: str) -> b
                                         total_textboxes += 1
 
                                         # 只设置表格单元格文本框自适应，不改变其他格式
-                                        text_frame = cell.text_frame
-                                        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+                                        _set_text_to_fit_shape(cell.text_frame)
 
                                         processed_textboxes += 1
-                                        logger.debug(f"✓ 幻灯片{slide_index}-表格单元格({row_index+1},{col_index+1}): 已设置自适应")
+                                        logger.debug("✓ 幻灯片%s-表格单元格(%s,%s): 已设置自适应", slide_index, row_index+1, col_index+1)
 
                                 # 确保表格整体尺寸不变
                                 if (shape.width != table_original_width or
@@ -452,13 +503,14 @@ async def _preserve_textbox_size_with_autofit_async(presentation_path: str) -> b
                                     shape.top = table_original_top
 
                                     size_preserved_count += 1
-                                    logger.debug(f"✓ 已恢复表格原始尺寸: 幻灯片{slide_index}-表格")
+                                    logger.debug("✓ 已恢复表格原始尺寸: 幻灯片%s-表格", slide_index)
 
                         except Exception as shape_error:
                             logger.warning(f"处理幻灯片{slide_index}-形状{shape_index+1}时出错: {shape_error}")
 
                 # 保存演示文稿
-                prs.save(presentation_path)
+                if save_path is not None:
+                    prs.save(save_path)
 
                 logger.info(f"文本框自适应设置完成（保持原始大小）:")
                 logger.info(f"  - 文本框总数: {total_textboxes}")
@@ -473,7 +525,7 @@ async def _preserve_textbox_size_with_autofit_async(presentation_path: str) -> b
                 return False
 
         # 在线程池中执行文件操作
-        return await loop.run_in_executor(None, _preserve_size_autofit)
+        return await loop.run_in_executor(_pptx_pool, _preserve_size_autofit)
 
     except Exception as e:
         logger.error(f"设置文本框自适应过程出错: {e}")
@@ -482,24 +534,26 @@ async def _preserve_textbox_size_with_autofit_async(presentation_path: str) -> b
 
 
 
-async def _unified_shape_processing_async(presentation_path: str) -> bool:
+async def _unified_shape_processing_async(presentation_path: Union[str, Any]) -> bool:
     """
     统一的形状处理函数（避免多重处理冲突）
     集成布局调整、自适应设置、尺寸保护等功能
 
     Args:
-        presentation_path: PPT文件路径
+        presentation_path: PPT文件路径，或已加载的Presentation对象（此时只修改内存中的对象，不读写文件）
 
     Returns:
         处理是否成功
     """
     try:
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
 
         def _unified_processing():
+            # 逐形状的详细日志只在调试级别开启，避免每个形状重复生成内容摘要
+            verbose = logger.isEnabledFor(logging.DEBUG)
             try:
                 # 加载演示文稿
-                prs = Presentation(presentation_path)
+                prs, save_path = _open_presentation(presentation_path)
 
                 total_shapes = 0
                 total_textboxes = 0
@@ -511,7 +565,7 @@ async def _unified_shape_processing_async(presentation_path: str) -> bool:
 
                 # 遍历所有幻灯片
                 for slide_index, slide in enumerate(prs.slides, 1):
-                    logger.debug(f"处理第 {slide_index} 张幻灯片的形状...")
+                    logger.debug("处理第 %s 张幻灯片的形状...", slide_index)
 
                     for shape_index, shape in enumerate(slide.shapes):
                         total_shapes += 1
@@ -523,18 +577,18 @@ async def _unified_shape_processing_async(presentation_path: str) -> bool:
                                 text_frame = shape.text_frame
 
                                 # 使用增强的内容检测和形状保护
-                                result = safe_set_autofit_with_content_check(text_frame, shape, debug=True)
+                                result = safe_set_autofit_with_content_check(text_frame, shape, debug=verbose)
 
                                 if result['adjusted']:
                                     if result.get('success', True):
                                         processed_textboxes += 1
-                                        logger.debug(f"✓ 幻灯片{slide_index}-形状{shape_index+1}: 处理成功")
+                                        logger.debug("✓ 幻灯片%s-形状%s: 处理成功", slide_index, shape_index+1)
                                     else:
                                         protected_shapes += 1
-                                        logger.debug(f"🛡️ 幻灯片{slide_index}-形状{shape_index+1}: 检测到变形，已保护")
+                                        logger.debug("🛡️ 幻灯片%s-形状%s: 检测到变形，已保护", slide_index, shape_index+1)
                                 else:
                                     skipped_textboxes += 1
-                                    logger.debug(f"⏭️ 幻灯片{slide_index}-形状{shape_index+1}: 跳过处理")
+                                    logger.debug("⏭️ 幻灯片%s-形状%s: 跳过处理", slide_index, shape_index+1)
 
                             # 处理表格（表格单元格使用标准处理）
                             elif shape.has_table:
@@ -544,17 +598,17 @@ async def _unified_shape_processing_async(presentation_path: str) -> bool:
                                         total_textboxes += 1
 
                                         # 表格单元格使用标准自适应（性能考虑）
-                                        text_frame = cell.text_frame
-                                        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+                                        _set_text_to_fit_shape(cell.text_frame)
 
                                         processed_textboxes += 1
-                                        logger.debug(f"✓ 幻灯片{slide_index}-表格单元格({row_index+1},{col_index+1}): 已设置自适应")
+                                        logger.debug("✓ 幻灯片%s-表格单元格(%s,%s): 已设置自适应", slide_index, row_index+1, col_index+1)
 
                         except Exception as shape_error:
                             logger.warning(f"处理幻灯片{slide_index}-形状{shape_index+1}时出错: {shape_error}")
 
                 # 保存演示文稿
-                prs.save(presentation_path)
+                if save_path is not None:
+                    prs.save(save_path)
 
                 logger.info(f"统一形状处理完成:")
                 logger.info(f"  - 形状总数: {total_shapes}")
@@ -571,15 +625,152 @@ async def _unified_shape_processing_async(presentation_path: str) -> bool:
                 return False
 
         # 在线程池中执行文件操作
-        return await loop.run_in_executor(None, _unified_processing)
+        return await loop.run_in_executor(_pptx_pool, _unified_processing)
 
     except Exception as e:
         logger.error(f"统一形状处理过程出错: {e}")
         return False
 
 
+class TranslationBatcher:
+    """
+    跨幻灯片的异步微批量翻译调度器
+
+    各页提交的待翻译文本进入同一个队列，后台协程每隔约 flush_interval 秒
+    把排队的请求按 BATCH_SIZE / MAX_BATCH_CHAR_COUNT 合并为一次API调用，
+    再把合并结果按原文拆分回各个请求的 Future。
+    """
+
+    def __init__(self, field: str, source_language: str, target_language: str,
+                 stop_words: Optional[List[str]] = None,
+                 custom_translations: Optional[Dict[str, str]] = None,
+                 max_items: int = BATCH_SIZE,
+                 max_chars: int = MAX_BATCH_CHAR_COUNT,
+                 max_concurrency: int = SLIDE_PROCESSING_THREADS,
+                 flush_interval: float = 0.02):
+        self.field = field
+        self.source_language = source_language
+        self.target_language = target_language
+        self.stop_words = stop_words or []
+        self.custom_translations = custom_translations or {}
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: set = set()
+
+    def start(self):
+        """启动后台调度协程（需在事件循环内调用）"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        """等待已排队的请求全部发出并完成后停止调度协程"""
+        if self._worker is not None:
+            await self._queue.put(None)
+            await self._worker
+            self._worker = None
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def translate(self, text: str) -> Dict[str, str]:
+        """
+        提交一段待翻译文本并等待结果
+
+        Args:
+            text: 以换行分隔的待翻译段落
+
+        Returns:
+            翻译映射字典 {原文: 译文}
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self):
+        pending = None
+        closing = False
+        while not closing:
+            item = pending if pending is not None else await self._queue.get()
+            pending = None
+            if item is None:
+                break
+
+            # 队列未饱和时稍作等待，让其他幻灯片的请求汇入同一批
+            if self._queue.qsize() < self.max_items:
+                await asyncio.sleep(self.flush_interval)
+
+            batch = [item]
+            char_count = len(item[0])
+            while len(batch) < self.max_items and not self._queue.empty():
+                next_item = self._queue.get_nowait()
+                if next_item is None:
+                    closing = True
+                    break
+                if char_count + len(next_item[0]) > self.max_chars:
+                    pending = next_item
+                    break
+                batch.append(next_item)
+                char_count += len(next_item[0])
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        async with self._semaphore:
+            try:
+                if len(batch) > 1:
+                    logger.info(f"合并 {len(batch)} 个翻译请求为一次API调用")
+                result = await translate_async(
+                    '\n'.join(text for text, _ in batch),
+                    self.field, self.stop_words, self.custom_translations,
+                    self.source_language, self.target_language,
+                    clean_markdown=False
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        for (_, future), partial in zip(batch, self._split_result(batch, result or {})):
+            if not future.done():
+                future.set_result(partial)
+
+    @staticmethod
+    def _split_result(batch: List[Tuple[str, asyncio.Future]],
+                      result: Dict[str, str]) -> List[Dict[str, str]]:
+        """按原文把合并的翻译结果拆回各请求；无法精确归属的条目分发给所有请求，交由模糊匹配处理"""
+        if len(batch) == 1:
+            return [result]
+
+        line_sets = [
+            {line.strip().strip('【】').strip() for line in text.split('\n')}
+            for text, _ in batch
+        ]
+        partials: List[Dict[str, str]] = [{} for _ in batch]
+        for source, target in result.items():
+            key = source.strip().strip('【】').strip()
+            owners = [i for i, lines in enumerate(line_sets) if key in lines]
+            for i in owners or range(len(batch)):
+                partials[i][source] = target
+        return partials
+
+
+def _translation_cache_context(source_language: str, target_language: str, field: str, model_name: str,
+                               stop_words: List[str], custom_words: Dict[str, str]) -> tuple:
+    """影响译文的全部设置，与原文一起组成翻译缓存键；同一任务的所有请求相同，只需计算一次"""
+    return (source_language, target_language, field, model_name,
+            frozenset(stop_words or ()), frozenset((custom_words or {}).items()))
+
+
 async def translate_text_async(text: str, field: str, stop_words: List[str], custom_words: Dict[str, str], 
-                              source_language: str, target_language: str, model_name: str = 'qwen') -> Dict[str, str]:
+                              source_language: str, target_language: str, model_name: str = 'qwen',
+                              batcher: Optional[TranslationBatcher] = None,
+                              cache_context: Optional[tuple] = None) -> Dict[str, str]:
     """
     根据模型名称选择相应的异步翻译函数
     
@@ -591,20 +782,88 @@ async def translate_text_async(text: str, field: str, stop_words: List[str], cus
         source_language: 源语言
         target_language: 目标语言
         model_name: 翻译模型名称 ('qwen', 'deepseek', 'gpt-4o')
+        batcher: 可选的微批量调度器，提供时文本进入其队列与其他请求合并发送
+        cache_context: _translation_cache_context 预先算好的缓存键上下文，为空时按参数计算
     
     Returns:
         翻译结果字典
+
+    按段落查询进程级缓存，只把未命中的段落发送翻译；并发请求中的相同段落共享同一个 Future
     """
-    if model_name == 'deepseek':
-        # TODO: 实现deepseek异步翻译逻辑
-        # return await translate_deepseek_async(text, field, stop_words, custom_words, source_language, target_language)
-        pass
-    elif model_name == 'gpt-4o':
-        # TODO: 实现gpt-4o异步翻译逻辑
-        # return await translate_gpt4o_async(text, field, stop_words, custom_words, source_language, target_language)
-        pass
-    else:  # 默认使用qwen模型
-        return await translate_async(text, field, stop_words, custom_words, source_language, target_language)
+    if not text or not text.strip() or is_page_number(text):
+        return {}
+
+    # 未登记的模型默认使用qwen；登记为None的模型尚未实现
+    translate_func = _MODEL_DISPATCH.get(model_name, translate_async)
+    if translate_func is None and batcher is None:
+        return {}
+
+    async def _dispatch(pending_text: str) -> Dict[str, str]:
+        if batcher is not None:
+            return await batcher.translate(pending_text)
+        return await translate_func(pending_text, field, stop_words, custom_words, source_language, target_language)
+
+    loop = asyncio.get_running_loop()
+    result: Dict[str, str] = {}
+    waiting = []   # 其他请求正在翻译的段落: (原文, Future)
+    owned = {}     # 本次请求负责翻译的段落: 原文 -> (缓存键, Future)
+    pending_lines = []
+
+    if cache_context is None:
+        cache_context = _translation_cache_context(
+            source_language, target_language, field, model_name, stop_words, custom_words
+        )
+
+    with _TRANSLATION_CACHE_LOCK:
+        for line in text.split('\n'):
+            source = line.strip().strip('【】').strip()
+            if not source or is_page_number(source):
+                continue
+            # 自定义翻译直接查词典，命中的段落不再请求API，也不占用缓存
+            custom = custom_words.get(source) if custom_words else None
+            if custom:
+                result[source] = custom
+                continue
+            key = (source,) + cache_context
+            cached = _TRANSLATION_CACHE.get(key)
+            if isinstance(cached, str):
+                result[source] = cached
+            elif isinstance(cached, asyncio.Future) and cached.get_loop() is loop:
+                waiting.append((source, cached))
+            elif source not in owned:
+                future = loop.create_future()
+                if len(_TRANSLATION_CACHE) >= _TRANSLATION_CACHE_MAX_ENTRIES:
+                    _TRANSLATION_CACHE.pop(next(iter(_TRANSLATION_CACHE)))
+                _TRANSLATION_CACHE[key] = future
+                owned[source] = (key, future)
+                pending_lines.append(line)
+
+    if pending_lines:
+        fresh: Dict[str, str] = {}
+        try:
+            fresh = await _dispatch('\n'.join(pending_lines)) or {}
+            result.update(fresh)
+        finally:
+            # 无论成功与否都要完成 Future，避免等待同一段落的其他请求挂起
+            with _TRANSLATION_CACHE_LOCK:
+                for source, (key, future) in owned.items():
+                    translation = fresh.get(source) or fresh.get(f"【{source}】")
+                    # 翻译失败的结果不缓存，以便下次重试
+                    if translation and not str(translation).startswith("[翻译"):
+                        _TRANSLATION_CACHE[key] = translation
+                    else:
+                        translation = None
+                        if _TRANSLATION_CACHE.get(key) is future:
+                            del _TRANSLATION_CACHE[key]
+                    if not future.done():
+                        future.set_result(translation)
+
+    for source, future in waiting:
+        translation = await future
+        if translation is not None:
+            result[source] = translation
+
+    return result
 
 
 async def process_presentation_async(presentation_path: str,
@@ -642,6 +901,8 @@ async def process_presentation_async(presentation_path: str,
     logger.info(f"开始异步处理演示文稿: {os.path.basename(presentation_path)}")
     logger.info(f"源语言: {source_language}, 目标语言: {target_language}, 双语翻译: {bilingual_translation}")
     logger.info(f"选中页面: {select_page}")
+    # 页面选择集合只构建一次，幻灯片循环中的成员判断为O(1)；None 表示处理全部页面
+    select_set = frozenset(select_page) if select_page else None
 
 
     '''
@@ -657,6 +918,30 @@ async def process_presentation_async(presentation_path: str,
         logger.warning("初始布局调整失败，但翻译将继续")
 
 
+    loop = asyncio.get_running_loop()
+
+    # 领域分析只依赖原始文本，与耗时的UNO转换互不依赖，提前在后台启动
+    def _read_first_slide_text():
+        source_prs = Presentation(presentation_path)
+        parts = []
+        total = 0
+        if source_prs.slides:
+            for shape in source_prs.slides[0].shapes:
+                if shape.has_text_frame:
+                    parts.append(shape.text_frame.text)
+                    total += len(parts[-1]) + 1
+                    # 领域分析只使用前500字符，够用即停止收集
+                    if total >= 500:
+                        break
+        return "\n".join(parts)[:500]
+
+    async def _detect_field():
+        logger.info("正在分析文本领域...")
+        first_slide_text = await loop.run_in_executor(_pptx_pool, _read_first_slide_text)
+        return await get_field_async(first_slide_text)  # 只用前500字符分析领域
+
+    field_task = asyncio.create_task(_detect_field())
+
     '''
     添加使用pyuno接口的功能，用libreoffice渲染ppt，实现翻译转化。
     顺序如下：
@@ -665,8 +950,10 @@ async def process_presentation_async(presentation_path: str,
     3. 再打开ppt，并渲染
     '''
     try:
-        from .pynuo_fuc.pyuno_controller import pyuno_controller
-        uno_pptx_path = pyuno_controller(presentation_path, 
+        pyuno_controller = _lazy_module('.pynuo_fuc.pyuno_controller').pyuno_controller
+        # 在线程池中执行UNO转换，让领域分析请求在此期间并行进行
+        uno_pptx_path = await loop.run_in_executor(None, lambda: pyuno_controller(
+                        presentation_path,
                         stop_words_list, 
                         custom_translations, 
                         select_page, 
@@ -676,7 +963,9 @@ async def process_presentation_async(presentation_path: str,
                         progress_callback,
                         model,
                         enable_uno_conversion=enable_uno_conversion  # 使用传入的参数
-                        )
+                        ))
+        if not uno_pptx_path:
+            raise RuntimeError("UNO接口未返回翻译后的文件")
         logger.info(f"调用UNO接口翻译PPT文本框成功，翻译后的PPT文件地址: {uno_pptx_path}")
     except Exception as e:
         logger.error(f"使用pyuno接口功能时出错: {str(e)}")
@@ -685,12 +974,11 @@ async def process_presentation_async(presentation_path: str,
     try:
         # 加载演示文稿
         logger.info("正在加载演示文稿...")
-        loop = asyncio.get_event_loop()
 
         def _read_presentation():
             return Presentation(uno_pptx_path)
 
-        prs = await loop.run_in_executor(None, _read_presentation)
+        prs = await loop.run_in_executor(_pptx_pool, _read_presentation)
         total_slides = len(prs.slides)
         logger.info(f"演示文稿加载成功，共 {total_slides} 张幻灯片")
         logger.info(f" 选择的页面参数: {select_page}")
@@ -703,14 +991,11 @@ async def process_presentation_async(presentation_path: str,
             logger.info(f" 将翻译指定页面: {select_page}")
 
         # 获取领域（使用第一页的内容分析）
-        logger.info("正在分析文本领域...")
-        first_slide_text = ""
-        if prs.slides:
-            for shape in prs.slides[0].shapes:
-                if shape.has_text_frame:
-                    first_slide_text += shape.text_frame.text + "\n"
-
-        field = await get_field_async(first_slide_text[:500])  # 只用前500字符分析领域
+        try:
+            field = await field_task
+        except Exception as e:
+            logger.warning(f"文本领域分析失败，使用通用领域: {e}")
+            field = "通用"
         logger.info(f"文本领域分析结果: {field}")
 
         # 初始化进度
@@ -718,91 +1003,134 @@ async def process_presentation_async(presentation_path: str,
             progress_callback(0, total_slides)
 
         # 处理每张幻灯片
-        processed_slides = 0
-        skipped_slides = 0
         total_translated_paragraphs = 0
 
-        for current_slide_index, slide in enumerate(prs.slides, 1):
-            # 更新翻译进度
-            if progress_callback:
-                progress_callback(current_slide_index - 1, total_slides)
-
-            # 检查是否需要处理当前幻灯片
-            if select_page and current_slide_index not in select_page:
-                logger.info(f"跳过第 {current_slide_index} 张幻灯片 (不在选中页面列表中)")
-                skipped_slides += 1
-                continue
+        # 各页的翻译请求经微批量调度器合并发送，同时在途的API调用数由其内部信号量限制
+        batcher = TranslationBatcher(field, source_language, target_language)
+        batcher.start()
+        # 各页请求共用的缓存键上下文，整个任务只计算一次（模型为 translate_text_async 的默认值）
+        cache_context = _translation_cache_context(
+            source_language, target_language, field, 'qwen', [], custom_translations
+        )
 
-            # 使用基于页面的翻译
+        async def _translate_one(slide, current_slide_index):
             logger.info(f"开始处理第 {current_slide_index} 张幻灯片...")
             slide_start_time = time.time()
 
             translated_count = await translate_slide_by_page(
                 slide, current_slide_index - 1, source_language, target_language,
-                bilingual_translation, field
+                bilingual_translation, field,
+                translate_func=lambda text: translate_text_async(
+                    text, field, [], custom_translations, source_language, target_language,
+                    batcher=batcher, cache_context=cache_context
+                )
             )
 
             slide_elapsed = time.time() - slide_start_time
-            total_translated_paragraphs += translated_count
-            processed_slides += 1
-
             logger.info(f"第 {current_slide_index} 张幻灯片处理完成，翻译了 {translated_count} 个段落，耗时: {slide_elapsed:.2f}秒")
+            return translated_count
+
+        # 所有选中页面并发调度，网络等待相互重叠
+        tasks = [
+            asyncio.create_task(_translate_one(slide, current_slide_index))
+            for current_slide_index, slide in enumerate(prs.slides, 1)
+            if select_set is None or current_slide_index in select_set
+        ]
+        skipped_slides = total_slides - len(tasks)
+        if skipped_slides:
+            logger.info(f"跳过 {skipped_slides} 张幻灯片 (不在选中页面列表中)")
 
-        '''
-        进行最终的布局调整（强制使用COM操作）
-        '''
-        logger.info("正在进行最终的布局调整（强制使用COM操作）...")
-        # 强制使用COM操作进行最终的文本框调整
-        final_layout_result = await _force_com_layout_adjustment_async(uno_pptx_path)
-        if final_layout_result:
-            logger.info("最终COM布局调整完成")
-        else:
-            logger.warning("最终COM布局调整失败，但翻译已完成")
+        processed_slides = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                total_translated_paragraphs += await finished
+                processed_slides += 1
+                # 更新翻译进度
+                if progress_callback:
+                    progress_callback(processed_slides, len(tasks))
+        finally:
+            await batcher.close()
 
-        # 保存演示文稿
+        # 保存演示文稿（须在最终COM布局调整之前写盘，否则COM对文件的调整会被内存中的对象覆盖）
         logger.info("正在保存演示文稿...")
 
-        def _save_presentation():
-            # 创建临时文件以避免内存泄漏
-            temp_path = f"{uno_pptx_path}.temp"
-            # 使用已经修改过的演示文稿对象进行保存
-            prs.save(temp_path)
-
-            # 如果保存成功，替换翻译后文件
-            if os.path.exists(temp_path):
-                if os.path.exists(uno_pptx_path):
-                    os.remove(uno_pptx_path)
-                os.rename(temp_path, uno_pptx_path)
-                return True
-            return False
+        # 先在内存中完成序列化再一次性覆盖写入，序列化出错时原文件保持不变，无需临时文件和重命名
+        await loop.run_in_executor(_pptx_pool, save_presentation, prs, uno_pptx_path)
+        save_result = True
 
-        save_result = await loop.run_in_executor(None, _save_presentation)
+        # 保存后即释放演示文稿的XML树，为后续耗时的OCR步骤腾出内存
+        del prs, tasks
+        gc.collect()
 
         '''
         添加使用ocr接口的功能，用ocr实现ppt图片读取，并实现翻译转化。
         顺序如下：
         1. 打开ppt，读取图片
-        2. 翻译
+        2. 翻译（与最终COM布局调整并行）
         3. 再打开ppt，并渲染
         '''
         ocr_ppt_path = uno_pptx_path
+        ocr_module = None
+        ocr_extractor = None
+        ocr_job = None
         if enable_text_splitting == "False":
             logger.info(f"检测到ocr参数:{enable_text_splitting}，不使用ocr接口功能")
-            ocr_ppt_path = uno_pptx_path
         else:
             logger.info(f"检测到ocr参数:{enable_text_splitting}，开始使用ocr接口功能")
             try:
-                from.image_ocr.ocr_controller import ocr_controller
-                ocr_ppt_path= ocr_controller(uno_pptx_path,
-                                            selected_pages=select_page,
-                                            output_path=None,
-                                            source_language=source_language,
-                                            target_language=target_language,
-                                            enable_text_splitting=enable_text_splitting)
+                ocr_module = _lazy_module('.image_ocr.ocr_controller')
+                # 提取图片只读取文件，在COM调整改写文件之前完成
+                ocr_extractor, ocr_temp_dir, image_mapping = await loop.run_in_executor(
+                    _pptx_pool, ocr_module.ocr_extract_images, uno_pptx_path, select_page
+                )
+                if image_mapping:
+                    # OCR识别和翻译只访问临时目录，与COM布局调整同时进行
+                    ocr_job = loop.run_in_executor(None, lambda: ocr_module.ocr_recognize_and_translate(
+                        ocr_temp_dir,
+                        source_language=source_language,
+                        target_language=target_language,
+                        enable_text_splitting=enable_text_splitting
+                    ))
+                else:
+                    logger.warning("未找到需要处理的图片")
             except Exception as e:
                 logger.error(f"使用ocr接口功能时出错: {str(e)}")
-                ocr_ppt_path = uno_pptx_path
-        # ocr_ppt_path = uno_pptx_path
+
+        try:
+            '''
+            进行最终的布局调整（强制使用COM操作）
+            '''
+            logger.info("正在进行最终的布局调整（强制使用COM操作）...")
+            # 强制使用COM操作进行最终的文本框调整
+            final_layout_result = await _force_com_layout_adjustment_async(uno_pptx_path)
+            if final_layout_result:
+                logger.info("最终COM布局调整完成")
+            else:
+                logger.warning("最终COM布局调整失败，但翻译已完成")
+
+            # COM调整写回后再把OCR结果渲染到文件中
+            if ocr_job is not None:
+                try:
+                    # shield：任务被取消时不取消 ocr_job，finally 中仍能据它等待OCR线程结束
+                    updated_mapping, show_translation = await asyncio.shield(ocr_job)
+                    ocr_ppt_path = await loop.run_in_executor(_pptx_pool, lambda: ocr_module.ocr_render_results(
+                        uno_pptx_path,
+                        updated_mapping,
+                        output_path=None,
+                        enable_translation=show_translation,
+                        enable_text_splitting=enable_text_splitting
+                    ))
+                except Exception as e:
+                    logger.error(f"使用ocr接口功能时出错: {str(e)}")
+                    ocr_ppt_path = uno_pptx_path
+        finally:
+            # 取消或COM步骤出错时OCR线程可能仍在读取临时目录（线程无法被取消），等它结束后再清理
+            if ocr_job is not None:
+                await asyncio.wait({ocr_job})
+                if not ocr_job.cancelled():
+                    ocr_job.exception()  # 错误已无关紧要，仅标记为已取回，避免未取回异常的告警
+            if ocr_extractor is not None:
+                ocr_extractor.cleanup()
 
         # === 新增：将翻译后PPT重命名为原始PPT名，覆盖原文件 ===
         try:
@@ -830,8 +1158,8 @@ async def process_presentation_async(presentation_path: str,
         return save_result
     except Exception as e:
         logger.error(f"处理演示文稿时出错: {str(e)}")
-        import traceback
         logger.error(traceback.format_exc())
+        field_task.cancel()
 
         # 在出错时也更新进度
         if progress_callback:
@@ -882,61 +1210,84 @@ async def  process_presentation_add_annotations_async(presentation_path: str,
             progress_callback(0, total_annotations)
 
         # 使用线程池执行文件IO操作
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
 
         async def _apply_annotations():
             try:
-                # 加载演示文稿
-                prs = Presentation(presentation_path)
+                # 加载演示文稿（在线程池中执行，不阻塞事件循环）
+                prs = await loop.run_in_executor(_pptx_pool, Presentation, presentation_path)
 
                 # 检查幻灯片数量
                 if len(prs.slides) == 0:
                     logger.error("演示文稿中没有幻灯片")
                     return False
 
-                # 收集所有注释文本进行翻译
+                # 收集所有注释文本进行翻译（在线程池中遍历形状，不阻塞事件循环）
                 logger.info("正在收集注释文本...")
-                all_text = ""
-                for slide in prs.slides:
-                    for shape in slide.shapes:
-                        if shape.has_text_frame:
-                            text_frame = shape.text_frame
-                            for paragraph in text_frame.paragraphs:
-                                text = paragraph.text.strip()
-                                if text:
-                                    all_text += text + "\n"
-
-                # 获取领域（使用新的阿里云异步API）
+                all_text = await loop.run_in_executor(_pptx_pool, "\n".join, _iter_paragraph_texts(prs))
+
+                # 获取领域（使用新的阿里云异步API）；等待模型响应期间在线程池中
+                # 构建停止词与自定义翻译的自动机，整份注释只构建一次，各块共用
                 from .local_qwen_async import get_field_async
-                field = await get_field_async(all_text)
+                field, word_automaton = await asyncio.gather(
+                    get_field_async(all_text),
+                    loop.run_in_executor(_pptx_pool, build_word_automaton, stop_words, custom_translations),
+                )
                 logger.info(f"文本领域分析结果: {field}")
 
-                # 准备注释文本进行翻译
-                tage_text = ""
                 annotation_items = annotations["annotations"]
-                for item in annotation_items:
-                    text = item["ocrResult"].replace("\n", " ")
-                    tage_text += text + "\n"
-
-                # 处理停止词和自定义翻译
-                stop_words_filtered = []
-                custom_words = {}
-                for word in stop_words:
-                    if word in tage_text:
-                        stop_words_filtered.append(word)
-                for k, v in custom_translations.items():
-                    if k in tage_text:
-                        custom_words[k] = v
-
-                # 翻译注释文本（使用新的阿里云异步API）
-                logger.info("正在翻译注释文本...")
                 from .local_qwen_async import translate_async
                 from .ppt_translate import find_most_similar
-                data = await translate_async(tage_text, field, stop_words_filtered, custom_words, source_language, target_language)
-                logger.info(f"翻译完成，共翻译 {len(data)} 个文本段")
+
+                async def _translate_chunk(chunk):
+                    # 准备注释文本进行翻译
+                    tage_text = "\n".join(item["ocrResult"].replace("\n", " ") for item in chunk)
+
+                    # 处理停止词和自定义翻译（只保留本块实际出现的词条），按子串判断，与同步注释流程一致；
+                    # 安装了 pyahocorasick 时用预先构建的自动机一次扫描，否则逐个子串查找
+                    stop_words_filtered, custom_words = filter_applicable_words(
+                        tage_text, stop_words, custom_translations, word_automaton
+                    )
+
+                    async with chunk_semaphore:
+                        return await translate_async(tage_text, field, stop_words_filtered, custom_words, source_language, target_language)
+
+                # 翻译注释文本（使用新的阿里云异步API），分块并发请求，网络等待相互重叠
+                logger.info("正在翻译注释文本...")
+                chunk_semaphore = asyncio.Semaphore(SLIDE_PROCESSING_THREADS)
+                chunks = [
+                    annotation_items[start:start + ANNOTATION_BATCH_SIZE]
+                    for start in range(0, len(annotation_items), ANNOTATION_BATCH_SIZE)
+                ]
+                results = await asyncio.gather(*(_translate_chunk(chunk) for chunk in chunks))
+                data = {k: v for result in results for k, v in result.items()}
+                logger.info(f"翻译完成，共 {len(chunks)} 个请求，翻译 {len(data)} 个文本段")
+
+                # 没有任何译文时逐条匹配只会得到N条未命中警告，文件内容也不会改变，直接结束
+                if not data:
+                    logger.warning("翻译结果为空，跳过注释注入")
+                    return True
+
+                # 译文键列表只构建一次；按规范化原文建立索引，大多数注释可直接命中
+                keys_list = list(data.keys())
+                norm_index = {k.replace("\n", " ").strip(): v for k, v in data.items()}
+                # 模糊匹配的候选预先转小写，避免每次查找都重新处理全部键
+                lowered_keys = [k.lower() for k in keys_list] if process is not None else None
+
+                # 注释文本框的位置和大小对整份演示文稿都相同，只计算一次
+                box_width = Inches(2)  # 宽度2英寸
+                box_height = Inches(1)  # 高度1英寸
+                box_left = prs.slide_width - box_width  # 右边距2英寸
+                box_top = 0  # 顶部
+                total_slides = len(prs.slides)
+                # 注释字体样式对所有注释都相同，只构造一次
+                annotation_color = RGBColor(255, 0, 0)  # 红色
+                annotation_size = Pt(12)
 
                 # 处理每个注释，添加到对应页面右上角
                 processed_count = 0
+                # 进度回调可能涉及界面或网络更新，整个过程最多上报约50次
+                progress_step = max(1, total_annotations // 50)
                 for i, item in enumerate(annotation_items):
                     try:
                         page = item["page"]
@@ -944,35 +1295,39 @@ async def  process_presentation_add_annotations_async(presentation_path: str,
 
                         # 页面索引从1开始，转换为0开始
                         slide_index = page - 1
-                        if slide_index < 0 or slide_index >= len(prs.slides):
+                        if slide_index < 0 or slide_index >= total_slides:
                             logger.warning(f"页面索引超出范围: {page}, 跳过此注释")
                             continue
 
                         slide = prs.slides[slide_index]
-                        slide_width = prs.slide_width
-                        slide_height = prs.slide_height
 
-                        # 在右上角添加翻译文本框
-                        left = slide_width - Inches(2)  # 右边距2英寸
-                        top = 0  # 顶部
-                        width = Inches(2)  # 宽度2英寸
-                        height = Inches(1)  # 高度1英寸
-
-                        # 查找最相似的翻译
-                        new_text = find_most_similar(original_text, list(data.keys()))
-                        if new_text in data:
-                            translated_text = data[new_text]
+                        # 先按规范化原文精确查找，未命中时再查找最相似的翻译
+                        translated_text = norm_index.get(original_text.replace("\n", " ").strip())
+                        if translated_text is None:
+                            if lowered_keys is not None:
+                                match = process.extractOne(original_text.lower(), lowered_keys,
+                                                           scorer=fuzz.ratio, score_cutoff=60)
+                                new_text = keys_list[match[2]] if match else None
+                            else:
+                                new_text = find_most_similar(original_text, keys_list)
+                            translated_text = data.get(new_text)
+                        if translated_text is not None:
 
                             # 添加文本框
-                            textbox = slide.shapes.add_textbox(left, top, width, height)
+                            # 在右上角添加翻译文本框
+                            textbox = slide.shapes.add_textbox(box_left, box_top, box_width, box_height)
                             text_frame = textbox.text_frame
                             text_frame.text = translated_text
 
                             # 设置字体为红色（注释功能使用红色以便区分）
-                            for paragraph in text_frame.paragraphs:
-                                for run in paragraph.runs:
-                                    run.font.color.rgb = RGBColor(255, 0, 0)  # 红色
-                                    run.font.size = Pt(12)  # 设置字体大小
+                            # 赋值 text 后每行恰好是一个段落、一个run；单行译文直接访问，不再遍历
+                            paragraphs = text_frame.paragraphs if "\n" in translated_text else text_frame.paragraphs[:1]
+                            for paragraph in paragraphs:
+                                runs = paragraph.runs
+                                if runs:
+                                    font = runs[0].font
+                                    font.color.rgb = annotation_color
+                                    font.size = annotation_size  # 设置字体大小
 
                             # 设置文本框自适应
                             text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
@@ -983,8 +1338,8 @@ async def  process_presentation_add_annotations_async(presentation_path: str,
                         else:
                             logger.warning(f"未找到匹配的翻译: {original_text[:30]}...")
 
-                        # 更新进度
-                        if progress_callback:
+                        # 更新进度（按步长节流，最后一项总是上报）
+                        if progress_callback and ((i + 1) % progress_step == 0 or i + 1 == total_annotations):
                             progress_callback(i + 1, total_annotations)
 
                     except Exception as e:
@@ -993,20 +1348,23 @@ async def  process_presentation_add_annotations_async(presentation_path: str,
 
                 # 保存演示文稿
                 temp_path = f"{presentation_path}.temp"
-                prs.save(temp_path)
 
-                # 如果保存成功，替换原文件
-                if os.path.exists(temp_path):
-                    if os.path.exists(presentation_path):
-                        os.remove(presentation_path)
-                    os.rename(temp_path, presentation_path)
+                def _save_annotated():
+                    prs.save(temp_path)
+
+                    # 保存成功后一次性替换原文件（目标存在时同样适用于Windows）
+                    try:
+                        os.replace(temp_path, presentation_path)
+                    except FileNotFoundError:
+                        logger.warning(f"临时文件不存在，未替换原文件: {temp_path}")
+
+                await loop.run_in_executor(_pptx_pool, _save_annotated)
 
                 logger.info(f"处理了 {processed_count}/{total_annotations} 个注释")
                 return True
 
             except Exception as e:
                 logger.error(f"应用注释时出错: {str(e)}")
-                import traceback
                 logger.error(f"错误详情: {traceback.format_exc()}")
                 return False
 
@@ -1023,7 +1381,6 @@ async def  process_presentation_add_annotations_async(presentation_path: str,
         return result
     except Exception as e:
         logger.error(f"处理带注释的演示文稿失败: {str(e)}")
-        import traceback
         logger.error(f"错误详情: {traceback.format_exc()}")
 
         # 在出错时也更新进度
@@ -1045,25 +1402,22 @@ def run_async_in_thread(func, *args, **kwargs):
     Returns:
         函数结果
     """
-    import asyncio
-    import threading
-    import concurrent.futures
 
     # 检查是否已有运行中的事件循环
     try:
         current_loop = asyncio.get_running_loop()
         # 如果有运行中的循环，在新线程中运行
         def run_in_new_thread():
-            new_loop = asyncio.new_event_loop()
+            # 每个工作线程只创建一次事件循环并在后续任务中复用
+            new_loop = getattr(_WORKER_LOOPS, "loop", None)
+            if new_loop is None or new_loop.is_closed():
+                new_loop = asyncio.new_event_loop()
+                _WORKER_LOOPS.loop = new_loop
             asyncio.set_event_loop(new_loop)
-            try:
-                return new_loop.run_until_complete(func(*args, **kwargs))
-            finally:
-                new_loop.close()
+            return new_loop.run_until_complete(func(*args, **kwargs))
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(run_in_new_thread)
-            return future.result()
+        future = _ASYNC_EXECUTOR.submit(run_in_new_thread)
+        return future.result()
     except RuntimeError:
         # 没有运行中的循环，直接运行
         try:
@@ -1150,7 +1504,6 @@ def process_presentation(presentation_path: str,
         return result
     except Exception as e:
         logger.error(f"处理演示文稿失败: {os.path.basename(presentation_path)}, 错误: {str(e)}")
-        import traceback
         logger.error(f"错误详情: {traceback.format_exc()}")
         return False
 
@@ -1202,6 +1555,5 @@ def process_presentation_add_annotations(presentation_path: str,
         return result
     except Exception as e:
         logger.error(f"处理带注释的演示文稿失败: {presentation_path}, 错误: {str(e)}")
-        import traceback
         logger.error(f"错误详情: {traceback.format_exc()}")
         return False
\ No newline at end of file
@@ -3,13 +3,68 @@
 提供最精确的颜色保护和格式控制
 """
 import os
+import time
 import logging
+import threading
+import contextlib
 from typing import Dict, List, Any, Optional
 
 from .libreoffice_uno_color import LibreOfficeUNOColorManager, UNO_AVAILABLE
 
 logger = logging.getLogger(__name__)
 
+# UNO服务可用性探测结果缓存：每次探测都要启动并关闭一个LibreOffice进程
+_UNO_CHECK_TTL = 60  # 秒
+_UNO_CHECK_CACHE = {"ts": 0.0, "ok": None}
+
+# 共享的UNO会话：嵌套的会话复用同一个LibreOffice进程，最外层会话退出时才清理。
+# 管理器同一时间只持有一个文档，且服务端口固定，因此会话之间用可重入锁串行化
+_uno_session_lock = threading.RLock()
+_uno_session_manager: Optional[LibreOfficeUNOColorManager] = None
+_uno_session_refs = 0
+
+
+@contextlib.contextmanager
+def uno_session():
+    """
+    获取共享的、已启动服务的UNO管理器
+
+    批量处理时在外层包一层 ``with uno_session():``，内部每次调用都复用同一个
+    LibreOffice进程，省去反复启动和关闭服务的开销。
+
+    Yields:
+        已启动服务的管理器；服务启动失败时为 None
+    """
+    global _uno_session_manager, _uno_session_refs
+
+    with _uno_session_lock:
+        if _uno_session_manager is None:
+            manager = LibreOfficeUNOColorManager()
+            if not _record_uno_check(manager.start_libreoffice_service()):
+                logger.error("启动LibreOffice UNO服务失败")
+                manager.cleanup()
+                yield None
+                return
+            _uno_session_manager = manager
+
+        manager = _uno_session_manager
+        _uno_session_refs += 1
+        try:
+            yield manager
+        finally:
+            # 出错时可能留下未关闭的文档，避免影响下一个使用者
+            if manager.document:
+                try:
+                    manager.document.close(True)
+                except Exception:
+                    pass
+                manager.document = None
+
+            _uno_session_refs -= 1
+            if _uno_session_refs == 0:
+                manager.cleanup()
+                _uno_session_manager = None
+
 
 def translate_ppt_with_uno_color_protection(
     ppt_path: str, 
@@ -37,51 +92,56 @@ def translate_ppt_with_uno_color_protection(
         logger.error(f"PPT文件不存在: {ppt_path}")
         return False
     
-    manager = LibreOfficeUNOColorManager()
-    
     try:
-        logger.info(f"开始UNO颜色保护翻译: {os.path.basename(ppt_path)}")
-        
-        # 1. 启动LibreOffice服务
-        if not manager.start_libreoffice_service():
-            logger.error("启动LibreOffice UNO服务失败")
-            return False
-        
-        # 2. 打开PPT文件
-        if not manager.open_presentation(ppt_path):
-            logger.error("打开PPT文件失败")
-            return False
-        
-        # 3. 提取原始颜色和格式信息
-        logger.info("提取原始颜色和格式信息...")
-        color_map = manager.extract_text_colors()
-        
-        if not color_map:
-            logger.warning("未提取到颜色信息，继续处理...")
-        
-        # 4. 执行翻译并保持格式
-        logger.info("执行翻译并保持颜色格式...")
-        translation_map = _prepare_translation_map(translation_data, bilingual_mode)
-        
-        success = manager.apply_text_colors(color_map, translation_map)
-        
-        if not success:
-            logger.warning("应用翻译和颜色时出现问题")
-        
-        # 5. 保存文档
-        save_path = output_path or ppt_path
-        if manager.save_and_close(save_path):
-            logger.info(f"✅ UNO颜色保护翻译完成: {save_path}")
-            return True
-        else:
-            logger.error("保存文档失败")
-            return False
-        
+        with uno_session() as manager:
+            # 1. 获取（必要时启动）LibreOffice服务
+            if manager is None:
+                return False
+            return _translate_with_manager(manager, ppt_path, translation_data, output_path, bilingual_mode)
     except Exception as e:
         logger.error(f"UNO翻译过程中出错: {e}")
         return False
-    finally:
-        manager.cleanup()
+
+
+def _translate_with_manager(
+    manager: LibreOfficeUNOColorManager,
+    ppt_path: str,
+    translation_data: Dict[str, str],
+    output_path: Optional[str],
+    bilingual_mode: bool
+) -> bool:
+    """在已启动的UNO服务中完成翻译并保存"""
+    logger.info(f"开始UNO颜色保护翻译: {os.path.basename(ppt_path)}")
+    
+    # 2. 打开PPT文件
+    if not manager.open_presentation(ppt_path):
+        logger.error("打开PPT文件失败")
+        return False
+    
+    # 3. 提取原始颜色和格式信息
+    logger.info("提取原始颜色和格式信息...")
+    color_map = manager.extract_text_colors()
+    
+    if not color_map:
+        logger.warning("未提取到颜色信息，继续处理...")
+    
+    # 4. 执行翻译并保持格式
+    logger.info("执行翻译并保持颜色格式...")
+    translation_map = _prepare_translation_map(translation_data, bilingual_mode)
+    
+    success = manager.apply_text_colors(color_map, translation_map)
+    
+    if not success:
+        logger.warning("应用翻译和颜色时出现问题")
+    
+    # 5. 保存文档
+    save_path = output_path or ppt_path
+    if manager.save_and_close(save_path):
+        logger.info(f"✅ UNO颜色保护翻译完成: {save_path}")
+        return True
+    else:
+        logger.error("保存文档失败")
+        return False
 
 
 def _prepare_translation_map(translation_data: Dict[str, str], bilingual_mode: bool) -> Dict[str, str]:
@@ -89,23 +149,23 @@ def _prepare_translation_map(translation_data: Dict[str, str], bilingual_mode: b
     if not bilingual_mode:
         return translation_data
     
-    # 双语模式：原文 + 译文
-    bilingual_map = {}
-    for original, translated in translation_data.items():
-        if original != translated:
-            bilingual_map[original] = f"{original}\n{translated}"
-        else:
-            bilingual_map[original] = original
-    
-    return bilingual_map
+    # 双语模式：原文 + 译文；译文与原文相同的条目不写入，
+    # apply_text_colors 查不到时本就保留原文
+    return {
+        original: f"{original}\n{translated}"
+        for original, translated in translation_data.items()
+        if original != translated
+    }
 
 
-def extract_text_from_ppt_uno(ppt_path: str) -> List[str]:
+def extract_text_from_ppt_uno(ppt_path: str, manager: Optional[LibreOfficeUNOColorManager] = None) -> List[str]:
     """
     使用UNO接口从PPT中提取文本
     
     Args:
         ppt_path: PPT文件路径
+        manager: 已启动服务的UNO管理器（可选），传入时复用其服务且不负责清理，
+            未传入时使用共享的 uno_session
         
     Returns:
         List[str]: 提取的文本列表
@@ -114,19 +174,22 @@ def extract_text_from_ppt_uno(ppt_path: str) -> List[str]:
         logger.error("LibreOffice UNO接口不可用")
         return []
     
-    manager = LibreOfficeUNOColorManager()
     texts = []
+    # 未传入管理器时使用共享会话
+    session = contextlib.nullcontext(manager) if manager is not None else uno_session()
     
     try:
-        if manager.start_libreoffice_service():
-            if manager.open_presentation(ppt_path):
-                # 提取文本
+        with session as manager:
+            if manager is not None and manager.open_presentation(ppt_path):
+                # 提取文本（集合判重，列表保持出现顺序）
                 color_map = manager.extract_text_colors()
+                seen = set()
                 
                 for page_key, page_colors in color_map.items():
                     for shape_info in page_colors:
                         text = shape_info.get('text', '').strip()
-                        if text and text not in texts:
+                        if text and text not in seen:
+                            seen.add(text)
                             texts.append(text)
                 
                 manager.save_and_close()
@@ -136,23 +199,32 @@ def extract_text_from_ppt_uno(ppt_path: str) -> List[str]:
     except Exception as e:
         logger.error(f"UNO提取文本失败: {e}")
         return []
-    finally:
-        manager.cleanup()
+
+
+def _record_uno_check(ok: bool) -> bool:
+    """记录UNO服务探测结果"""
+    _UNO_CHECK_CACHE["ts"] = time.monotonic()
+    _UNO_CHECK_CACHE["ok"] = ok
+    return ok
 
 
 def check_uno_availability() -> bool:
-    """检查UNO接口可用性"""
+    """检查UNO接口可用性（结果缓存 _UNO_CHECK_TTL 秒）"""
     if not UNO_AVAILABLE:
         return False
     
+    if (_UNO_CHECK_CACHE["ok"] is not None
+            and time.monotonic() - _UNO_CHECK_CACHE["ts"] < _UNO_CHECK_TTL):
+        return _UNO_CHECK_CACHE["ok"]
+    
     try:
         manager = LibreOfficeUNOColorManager()
         success = manager.start_libreoffice_service()
         if success:
             manager.cleanup()
-        return success
+        return _record_uno_check(success)
     except:
-        return False
+        return _record_uno_check(False)
 
 
 def get_uno_translation_capabilities() -> Dict[str, Any]:
@@ -264,21 +336,23 @@ def create_uno_translation_report(ppt_path: str) -> Dict[str, Any]:
         report['recommendations'].append("PPT文件不存在")
         return report
     
+    # 服务只启动一次：取得会话即说明UNO可用，随后直接用同一服务提取文本
     try:
-        # 检查UNO服务
-        if check_uno_availability():
-            report['can_process'] = True
-            
-            # 提取文本信息
-            texts = extract_text_from_ppt_uno(ppt_path)
-            report['text_count'] = len(texts)
-            
-            if texts:
-                report['recommendations'].append("建议使用UNO接口进行精确颜色保护翻译")
+        with uno_session() as manager:
+            # 检查UNO服务
+            if manager is not None:
+                report['can_process'] = True
+                
+                # 提取文本信息
+                texts = extract_text_from_ppt_uno(ppt_path, manager)
+                report['text_count'] = len(texts)
+                
+                if texts:
+                    report['recommendations'].append("建议使用UNO接口进行精确颜色保护翻译")
+                else:
+                    report['recommendations'].append("PPT中未检测到文本内容")
             else:
-                report['recommendations'].append("PPT中未检测到文本内容")
-        else:
-            report['recommendations'].append("UNO服务启动失败，检查LibreOffice安装")
+                report['recommendations'].append("UNO服务启动失败，检查LibreOffice安装")
     
     except Exception as e:
         report['recommendations'].append(f"UNO检查失败: {e}")
@@ -5,13 +5,61 @@
 """
 import os
 import logging
+import posixpath
+import zipfile
 from pptx import Presentation
 from pptx.enum.text import MSO_AUTO_SIZE
-from pptx.util import Pt
+from pptx.util import Pt, Emu
+from pptx.oxml.ns import qn, namespaces
+from lxml import etree
 
 # 配置日志记录器
 logger = logging.getLogger(__name__)
 
+# 自适应设置值，循环中直接引用模块常量
+_TEXT_TO_FIT_SHAPE = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+
+# 形状位置/尺寸在 xfrm 中的属性：a:off 的 x、y 与 a:ext 的 cx、cy
+_XFRM_ATTRS = (("off", "x"), ("off", "y"), ("ext", "cx"), ("ext", "cy"))
+
+
+def _snapshot_xfrm(shape):
+    """
+    直接从 xfrm 元素读取形状的位置和尺寸（原始字符串），跳过 python-pptx 的属性封装与单位转换
+
+    Returns:
+        (xfrm元素, 属性值元组)；形状没有自己的 xfrm（如继承版式的占位符）时返回 None
+    """
+    xfrm = shape._element.xfrm
+    if xfrm is None:
+        return None
+    values = []
+    for child_name, attr in _XFRM_ATTRS:
+        child = getattr(xfrm, child_name)
+        values.append(child.get(attr) if child is not None else None)
+    return xfrm, tuple(values)
+
+
+def _restore_xfrm(snapshot) -> bool:
+    """
+    将 _snapshot_xfrm 记录的位置和尺寸一次性写回
+
+    Returns:
+        是否有属性被改变并已恢复
+    """
+    if snapshot is None:
+        return False
+    xfrm, original = snapshot
+    changed = False
+    for (child_name, attr), value in zip(_XFRM_ATTRS, original):
+        child = getattr(xfrm, child_name)
+        if child is None or value is None or child.get(attr) == value:
+            continue
+        child.set(attr, value)
+        changed = True
+    return changed
+
+
 def preserve_textbox_size_with_autofit(presentation_path: str, verbose: bool = True) -> bool:
     """
     设置文本框自适应的同时保持文本框大小不变
@@ -31,6 +79,9 @@ def preserve_textbox_size_with_autofit(presentation_path: str, verbose: bool = T
         # 加载演示文稿
         prs = Presentation(presentation_path)
 
+        # 逐形状的调试日志只在DEBUG级别启用时才格式化，避免默认 verbose=True 时为每个形状白白拼接字符串
+        debug = verbose and logger.isEnabledFor(logging.DEBUG)
+
         total_shapes = 0
         total_textboxes = 0
         processed_textboxes = 0
@@ -42,8 +93,8 @@ def preserve_textbox_size_with_autofit(presentation_path: str, verbose: bool = T
 
         # 遍历所有幻灯片
         for slide_index, slide in enumerate(prs.slides, 1):
-            if verbose:
-                logger.debug(f"处理第 {slide_index} 张幻灯片...")
+            if debug:
+                logger.debug("处理第 %d 张幻灯片...", slide_index)
 
             for shape_index, shape in enumerate(slide.shapes):
                 total_shapes += 1
@@ -53,77 +104,49 @@ def preserve_textbox_size_with_autofit(presentation_path: str, verbose: bool = T
                     if shape.has_text_frame:
                         total_textboxes += 1
 
-                        # 记录原始尺寸
-                        original_width = shape.width
-                        original_height = shape.height
-                        original_left = shape.left
-                        original_top = shape.top
+                        # 设置 auto_size 只改写 a:bodyPr，不会改动 a:xfrm 中的位置和尺寸，
+                        # 因此只在调试时记录原始尺寸并校验
+                        original_xfrm = _snapshot_xfrm(shape) if debug else None
 
-                        if verbose:
-                            logger.debug(f"原始尺寸 - 宽度: {original_width}, 高度: {original_height}")
+                        if original_xfrm is not None:
+                            logger.debug("原始尺寸 - 宽度: %s, 高度: %s", original_xfrm[1][2], original_xfrm[1][3])
 
                         # 只设置文本框自适应，不改变其他格式
-                        text_frame = shape.text_frame
-                        text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
-
-                        # 检查尺寸是否被改变
-                        if (shape.width != original_width or
-                            shape.height != original_height or
-                            shape.left != original_left or
-                            shape.top != original_top):
-
-                            # 恢复原始尺寸和位置
-                            shape.width = original_width
-                            shape.height = original_height
-                            shape.left = original_left
-                            shape.top = original_top
+                        shape.text_frame.auto_size = _TEXT_TO_FIT_SHAPE
 
+                        # 尺寸被改变时恢复原始尺寸和位置
+                        if original_xfrm is not None and _restore_xfrm(original_xfrm):
                             size_preserved_count += 1
-                            if verbose:
-                                logger.debug(f"✓ 已恢复文本框原始尺寸: 幻灯片{slide_index}-形状{shape_index+1}")
+                            logger.debug("✓ 已恢复文本框原始尺寸: 幻灯片%d-形状%d", slide_index, shape_index + 1)
 
                         processed_textboxes += 1
-                        if verbose:
-                            logger.debug(f"✓ 幻灯片{slide_index}-形状{shape_index+1}: 已设置文本框自适应")
+                        if debug:
+                            logger.debug("✓ 幻灯片%d-形状%d: 已设置文本框自适应", slide_index, shape_index + 1)
 
                     # 处理表格
                     elif shape.has_table:
                         table = shape.table
-                        if verbose:
-                            logger.debug(f"处理表格: {table.rows} 行 x {table.columns} 列")
+                        if debug:
+                            logger.debug("处理表格: %d 行 x %d 列", len(table.rows), len(table.columns))
 
-                        # 记录表格原始尺寸
-                        table_original_width = shape.width
-                        table_original_height = shape.height
-                        table_original_left = shape.left
-                        table_original_top = shape.top
+                        # 记录表格原始尺寸（同上，仅调试时校验）
+                        table_original_xfrm = _snapshot_xfrm(shape) if debug else None
 
                         for row_index, row in enumerate(table.rows):
                             for col_index, cell in enumerate(row.cells):
                                 total_textboxes += 1
 
                                 # 只设置表格单元格文本框自适应，不改变其他格式
-                                text_frame = cell.text_frame
-                                text_frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+                                cell.text_frame.auto_size = _TEXT_TO_FIT_SHAPE
 
                                 processed_textboxes += 1
-                                if verbose:
-                                    logger.debug(f"✓ 幻灯片{slide_index}-表格单元格({row_index+1},{col_index+1}): 已设置自适应")
+                                if debug:
+                                    logger.debug("✓ 幻灯片%d-表格单元格(%d,%d): 已设置自适应", slide_index, row_index + 1, col_index + 1)
 
                         # 确保表格整体尺寸不变
-                        if (shape.width != table_original_width or
-                            shape.height != table_original_height or
-                            shape.left != table_original_left or
-                            shape.top != table_original_top):
-
-                            shape.width = table_original_width
-                            shape.height = table_original_height
-                            shape.left = table_original_left
-                            shape.top = table_original_top
-
+                        if table_original_xfrm is not None and _restore_xfrm(table_original_xfrm):
                             size_preserved_count += 1
-                            if verbose:
-                                logger.debug(f"✓ 已恢复表格原始尺寸: 幻灯片{slide_index}-表格")
+                            logger.debug("✓ 已恢复表格原始尺寸: 幻灯片%d-表格", slide_index)
 
                 except Exception as shape_error:
                     logger.warning(f"处理幻灯片{slide_index}-形状{shape_index+1}时出错: {shape_error}")
@@ -136,7 +159,9 @@ def preserve_textbox_size_with_autofit(presentation_path: str, verbose: bool = T
             logger.info(f"  - 总形状数: {total_shapes}")
             logger.info(f"  - 文本框总数: {total_textboxes}")
             logger.info(f"  - 已处理文本框: {processed_textboxes}")
-            logger.info(f"  - 尺寸保护次数: {size_preserved_count}")
+            if debug:
+                # 只有调试模式才做尺寸快照/恢复，计数才有意义
+                logger.info(f"  - 尺寸保护次数: {size_preserved_count}")
             logger.info(f"  - 成功率: {(processed_textboxes/total_textboxes*100):.1f}%" if total_textboxes > 0 else "  - 成功率: N/A")
 
         return True
@@ -147,6 +172,166 @@ def preserve_textbox_size_with_autofit(presentation_path: str, verbose: bool = T
         logger.error(f"错误详情: {traceback.format_exc()}")
         return False
 
+# 只读检查时直接从pptx压缩包读取幻灯片XML，不加载python-pptx对象图（图片、图表等部件都不会读入内存）
+_XPATH_NS = namespaces("a", "p", "r")
+_PKG_RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_SLIDE_ID_XPATH = etree.XPath("./p:sldIdLst/p:sldId/@r:id", namespaces=_XPATH_NS)
+_SHAPE_XFRM_XPATH = etree.XPath("./p:spPr/a:xfrm | ./p:xfrm", namespaces=_XPATH_NS)
+_BODY_PR_XPATH = etree.XPath("./p:txBody/a:bodyPr | ./a:txBody/a:bodyPr", namespaces=_XPATH_NS)
+_PH_XPATH = etree.XPath("./*/p:nvPr/p:ph", namespaces=_XPATH_NS)
+_TABLE_XPATH = etree.XPath(
+    "./a:graphic/a:graphicData[@uri='http://schemas.openxmlformats.org/drawingml/2006/table']/a:tbl",
+    namespaces=_XPATH_NS,
+)
+_SHAPE_TAGS = frozenset(qn(tag) for tag in ("p:sp", "p:grpSp", "p:graphicFrame", "p:cxnSp", "p:pic", "p:contentPart"))
+_AUTOFIT_TAGS = {
+    qn("a:noAutofit"): MSO_AUTO_SIZE.NONE,
+    qn("a:spAutoFit"): MSO_AUTO_SIZE.SHAPE_TO_FIT_TEXT,
+    qn("a:normAutofit"): MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE,
+}
+_WRAP_VALUES = {"square": True, "none": False}
+# 版式占位符继承母版占位符时的类型映射（与 python-pptx 一致）
+_MASTER_PH_TYPES = {
+    "body": "body", "chart": "body", "clipArt": "body", "ctrTitle": "title", "dgm": "body",
+    "dt": "dt", "ftr": "ftr", "media": "body", "obj": "body", "pic": "body",
+    "sldNum": "sldNum", "subTitle": "body", "tbl": "body", "title": "title",
+}
+
+
+def _part_rels(zf, part_name):
+    """读取部件的关系，返回 {rId: (关系类型, 目标部件名)}，外部链接不包含在内"""
+    # 压缩包成员名没有前导斜杠；包根 "/" 的关系文件为 "_rels/.rels"
+    rels_name = posixpath.join(posixpath.dirname(part_name), "_rels", posixpath.basename(part_name) + ".rels").lstrip("/")
+    try:
+        root = etree.fromstring(zf.read(rels_name))
+    except KeyError:
+        return {}
+    base_dir = posixpath.dirname(part_name)
+    rels = {}
+    for rel in root.iter("{%s}Relationship" % _PKG_RELS_NS):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = posixpath.normpath(posixpath.join(base_dir, rel.get("Target")))
+        rels[rel.get("Id")] = (rel.get("Type"), target.lstrip("/"))
+    return rels
+
+
+def _related_part(rels, type_suffix):
+    """返回第一个类型以 type_suffix 结尾的关系目标部件名"""
+    for rel_type, target in rels.values():
+        if rel_type.endswith(type_suffix):
+            return target
+    return None
+
+
+def _iter_slide_xml(pptx_path):
+    """
+    按演示文稿中的顺序逐页产出 (幻灯片根元素, 版式根元素, 母版根元素)
+
+    直接解析压缩包中的XML部件；版式和母版在多页间共用，只解析一次
+    """
+    with zipfile.ZipFile(pptx_path) as zf:
+        presentation_part = _related_part(_part_rels(zf, "/"), "/officeDocument") or "ppt/presentation.xml"
+        presentation_rels = _part_rels(zf, presentation_part)
+        presentation = etree.fromstring(zf.read(presentation_part))
+
+        parsed = {}
+
+        def _load(part_name):
+            if part_name is None:
+                return None, {}
+            if part_name not in parsed:
+                parsed[part_name] = (etree.fromstring(zf.read(part_name)), _part_rels(zf, part_name))
+            return parsed[part_name]
+
+        for r_id in _SLIDE_ID_XPATH(presentation):
+            slide_part = presentation_rels[r_id][1]
+            slide = etree.fromstring(zf.read(slide_part))
+            layout, layout_rels = _load(_related_part(_part_rels(zf, slide_part), "/slideLayout"))
+            master, _ = _load(_related_part(layout_rels, "/slideMaster"))
+            yield slide, layout, master
+
+
+def _iter_shape_elements(part_root):
+    """产出部件形状树中的顶层形状元素（与 python-pptx 的 slide.shapes 一一对应）"""
+    sp_tree = part_root.find("./p:cSld/p:spTree", _XPATH_NS)
+    if sp_tree is None:
+        return
+    for element in sp_tree:
+        if element.tag in _SHAPE_TAGS:
+            yield element
+
+
+def _placeholder(element):
+    """返回形状的 (idx, type)，不是占位符时返回 None"""
+    phs = _PH_XPATH(element)
+    if not phs:
+        return None
+    return int(phs[0].get("idx", "0")), phs[0].get("type", "obj")
+
+
+def _find_placeholder(part_root, matches):
+    """在版式/母版中查找第一个满足条件的占位符"""
+    if part_root is None:
+        return None
+    for element in _iter_shape_elements(part_root):
+        ph = _placeholder(element)
+        if ph is not None and matches(ph):
+            return element
+    return None
+
+
+def _direct_geometry(element):
+    """读取形状自身 xfrm 中的 [宽, 高, 左, 上]，缺失的项为 None"""
+    geometry = [None, None, None, None]
+    xfrms = _SHAPE_XFRM_XPATH(element)
+    if xfrms:
+        off = xfrms[0].find(qn("a:off"))
+        ext = xfrms[0].find(qn("a:ext"))
+        if ext is not None:
+            geometry[0], geometry[1] = Emu(int(ext.get("cx"))), Emu(int(ext.get("cy")))
+        if off is not None:
+            geometry[2], geometry[3] = Emu(int(off.get("x"))), Emu(int(off.get("y")))
+    return geometry
+
+
+def _effective_geometry(element, layout, master):
+    """
+    计算形状的实际 (宽, 高, 左, 上)：幻灯片占位符未直接设置的项按 idx 继承版式占位符，
+    版式占位符再按类型继承母版占位符
+    """
+    geometry = _direct_geometry(element)
+    ph = _placeholder(element)
+    if ph is None or None not in geometry:
+        return tuple(geometry)
+
+    layout_ph = _find_placeholder(layout, lambda candidate: candidate[0] == ph[0])
+    if layout_ph is not None:
+        base = _direct_geometry(layout_ph)
+        if None in base:
+            master_type = _MASTER_PH_TYPES.get(_placeholder(layout_ph)[1])
+            master_ph = _find_placeholder(master, lambda candidate: candidate[1] == master_type)
+            if master_ph is not None:
+                master_geometry = _direct_geometry(master_ph)
+                base = [value if value is not None else master_geometry[i] for i, value in enumerate(base)]
+        geometry = [value if value is not None else base[i] for i, value in enumerate(geometry)]
+    return tuple(geometry)
+
+
+def _text_props(element):
+    """从 a:bodyPr 读取 (auto_size, word_wrap)，取值与 python-pptx 的 text_frame 属性一致"""
+    body_prs = _BODY_PR_XPATH(element)
+    if not body_prs:
+        return None, None
+    body_pr = body_prs[0]
+    auto_size = None
+    for child in body_pr:
+        if child.tag in _AUTOFIT_TAGS:
+            auto_size = _AUTOFIT_TAGS[child.tag]
+            break
+    return auto_size, _WRAP_VALUES.get(body_pr.get("wrap"))
+
+
 def check_textbox_size_changes(presentation_path: str) -> dict:
     """
     检查PPT处理前后文本框大小的变化
@@ -161,51 +346,61 @@ def check_textbox_size_changes(presentation_path: str) -> dict:
         return {"error": f"文件不存在: {presentation_path}"}
 
     try:
-        # 加载演示文稿
-        prs = Presentation(presentation_path)
-
         textbox_info = []
 
-        # 遍历所有幻灯片
-        for slide_index, slide in enumerate(prs.slides, 1):
-            for shape_index, shape in enumerate(slide.shapes):
+        sp_tag = qn("p:sp")
+        graphic_frame_tag = qn("p:graphicFrame")
+
+        # 遍历所有幻灯片（直接读取XML，不加载整个演示文稿）
+        for slide_index, (slide, layout, master) in enumerate(_iter_slide_xml(presentation_path), 1):
+            for shape_index, element in enumerate(_iter_shape_elements(slide)):
                 # 处理普通文本框
-                if shape.has_text_frame:
+                if element.tag == sp_tag:
+                    width, height, left, top = _effective_geometry(element, layout, master)
+                    auto_size, word_wrap = _text_props(element)
                     textbox_info.append({
                         "slide": slide_index,
                         "shape": shape_index + 1,
                         "type": "textbox",
-                        "width": shape.width,
-                        "height": shape.height,
-                        "left": shape.left,
-                        "top": shape.top,
-                        "auto_size": shape.text_frame.auto_size,
-                        "word_wrap": shape.text_frame.word_wrap
+                        "width": width,
+                        "height": height,
+                        "left": left,
+                        "top": top,
+                        "auto_size": auto_size,
+                        "word_wrap": word_wrap
                     })
+                    continue
+
+                if element.tag != graphic_frame_tag:
+                    continue
+                tables = _TABLE_XPATH(element)
 
                 # 处理表格
-                elif shape.has_table:
-                    table = shape.table
+                if tables:
+                    table = tables[0]
+                    rows = table.findall(qn("a:tr"))
+                    width, height, left, top = _effective_geometry(element, layout, master)
                     textbox_info.append({
                         "slide": slide_index,
                         "shape": f"table-{shape_index+1}",
                         "type": "table",
-                        "width": shape.width,
-                        "height": shape.height,
-                        "left": shape.left,
-                        "top": shape.top,
-                        "rows": table.rows,
-                        "columns": table.columns
+                        "width": width,
+                        "height": height,
+                        "left": left,
+                        "top": top,
+                        "rows": len(rows),
+                        "columns": len(table.findall("./a:tblGrid/a:gridCol", _XPATH_NS))
                     })
 
-                    for row_index, row in enumerate(table.rows):
-                        for col_index, cell in enumerate(row.cells):
+                    for row_index, row in enumerate(rows):
+                        for col_index, cell in enumerate(row.findall(qn("a:tc"))):
+                            auto_size, word_wrap = _text_props(cell)
                             textbox_info.append({
                                 "slide": slide_index,
                                 "shape": f"table-{shape_index+1}-cell-{row_index+1}-{col_index+1}",
                                 "type": "table_cell",
-                                "auto_size": cell.text_frame.auto_size,
-                                "word_wrap": cell.text_frame.word_wrap
+                                "auto_size": auto_size,
+                                "word_wrap": word_wrap
                             })
 
         return {
@@ -235,37 +430,35 @@ def compare_textbox_sizes(before_info: dict, after_info: dict) -> dict:
     unchanged_count = 0
     changed_count = 0
 
-    # 创建查找字典
-    before_dict = {f"{info['slide']}-{info['shape']}": info for info in before_info["textbox_info"]}
-    after_dict = {f"{info['slide']}-{info['shape']}": info for info in after_info["textbox_info"]}
+    # 创建查找字典（以 (幻灯片, 形状) 元组为键）
+    before_dict = {(info["slide"], info["shape"]): info for info in before_info["textbox_info"]}
+    after_dict = {(info["slide"], info["shape"]): info for info in after_info["textbox_info"]}
+    sized_types = ("textbox", "table")
 
     # 比较每个文本框
     for key, before in before_dict.items():
-        if key in after_dict:
-            after = after_dict[key]
-
-            if before["type"] in ["textbox", "table"]:
-                # 检查尺寸变化
-                width_changed = before.get("width") != after.get("width")
-                height_changed = before.get("height") != after.get("height")
-                left_changed = before.get("left") != after.get("left")
-                top_changed = before.get("top") != after.get("top")
-
-                if width_changed or height_changed or left_changed or top_changed:
-                    changes.append({
-                        "slide": before["slide"],
-                        "shape": before["shape"],
-                        "type": before["type"],
-                        "width_change": after.get("width", 0) - before.get("width", 0),
-                        "height_change": after.get("height", 0) - before.get("height", 0),
-                        "left_change": after.get("left", 0) - before.get("left", 0),
-                        "top_change": after.get("top", 0) - before.get("top", 0)
-                    })
-                    changed_count += 1
-                else:
-                    unchanged_count += 1
+        after = after_dict.get(key)
+        if after is None:
+            continue
+
+        if before["type"] in sized_types and after["type"] in sized_types:
+            # 检查尺寸变化；文本框和表格记录总是带有完整的尺寸字段
+            if (before["width"] != after["width"] or before["height"] != after["height"] or
+                    before["left"] != after["left"] or before["top"] != after["top"]):
+                changes.append({
+                    "slide": before["slide"],
+                    "shape": before["shape"],
+                    "type": before["type"],
+                    "width_change": after["width"] - before["width"],
+                    "height_change": after["height"] - before["height"],
+                    "left_change": after["left"] - before["left"],
+                    "top_change": after["top"] - before["top"]
+                })
+                changed_count += 1
             else:
                 unchanged_count += 1
+        else:
+            unchanged_count += 1
 
     return {
         "total_compared": len(before_dict),
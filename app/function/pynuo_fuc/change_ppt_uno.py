@@ -1,8 +1,52 @@
 import uno # type: ignore
 import sys, os
+import math
 sys.path.insert(0, os.path.dirname(__file__))
 from read_ppt_page_uno import connect_to_libreoffice, read_slide_texts, extract_text_and_attrs
 
+# 译文最小字号；原文没有有效字号时使用的默认起始字号
+_MIN_FONT_SIZE = 8
+_DEFAULT_FONT_SIZE = 18
+
+def _fit_font_size(start_size, min_font_size, total_lines, box_height):
+    """
+    计算译文字号：从 start_size 起每次减1，返回第一个满足
+    size * 1.5 * total_lines < box_height 的字号；都不满足时返回不小于 min_font_size 的最小字号
+    """
+    if total_lines <= 0:
+        return start_size
+    # 满足条件需要减去的最少次数 k，即最小的整数 k 使 start_size - k < box_height / (1.5 * total_lines)
+    excess = start_size - box_height / (1.5 * total_lines)
+    steps = 0 if excess < 0 else math.floor(excess) + 1
+    max_steps = math.floor(start_size - min_font_size)
+    return start_size - min(steps, max_steps)
+
+
+# 片段格式属性名；XMultiPropertySet.setPropertyValues 要求属性名按字母顺序排列
+_FRAGMENT_PROPERTY_NAMES = ("CharColor", "CharEscapement", "CharHeight", "CharUnderline", "CharWeight")
+
+
+def _fragment_style(attrs):
+    """
+    把片段属性 (颜色, 下划线, 加粗, 上下标, 字号) 预先换算为UNO属性值，
+    返回 (CharColor, CharEscapement, 字号缩放系数, CharUnderline, CharWeight)
+    """
+    color, underline, bold, escapement, _ = attrs
+    return color, escapement, 0.6 if escapement != 0 else 1, 1 if underline else 0, 150 if bold else 100
+
+
+def _write_fragment(text, cursor, frag, style, font_size):
+    """在光标处写入一个片段并设置其格式（style 由 _fragment_style 得到，字号使用 font_size）"""
+    color, escapement, height_scale, underline, weight = style
+    text.insertString(cursor, frag, False)
+    cursor.goLeft(len(frag), True)
+    # 一次UNO调用设置全部格式属性
+    cursor.setPropertyValues(_FRAGMENT_PROPERTY_NAMES, (
+        color, escapement, font_size * height_scale, underline, weight
+    ))
+    cursor.gotoEnd(False)
+
+
 def clone_texts_in_ppt(context, ppt_path, save_path, page_index=0, translated_path="translated.txt"):
     desktop = context.ServiceManager.createInstanceWithContext(
         "com.sun.star.frame.Desktop", context)
@@ -28,23 +72,9 @@ def clone_texts_in_ppt(context, ppt_path, save_path, page_index=0, translated_pa
             shape = slide.getByIndex(j)
             text = shape.getText()
             cursor = text.createTextCursor()
-            cursor.gotoEnd(False)  # 移到文本末尾
-            # 先写入原文
-            for frag, attrs in zip(content_queue, attr_queue):
-                color, underline, bold, escapement, font_size = attrs
-                text.insertString(cursor, frag, False)
-                cursor.goLeft(len(frag), True)
-                cursor.CharColor = color
-                cursor.CharUnderline = 1 if underline else 0
-                cursor.CharWeight = 150 if bold else 100
-                cursor.CharEscapement = escapement
-                if escapement != 0:
-                    cursor.CharHeight = font_size * 0.6
-                else:
-                    cursor.CharHeight = font_size
-                cursor.gotoEnd(False)
-            # 收集译文及格式
+            # 收集译文及格式（格式在这里一次换算为UNO属性值）
             frag_attr_trans = []
+            frag_styles = []
             for frag, attrs in zip(content_queue, attr_queue):
                 if frag_idx < len(translated_fragments):
                     trans_frag = translated_fragments[frag_idx]
@@ -52,55 +82,27 @@ def clone_texts_in_ppt(context, ppt_path, save_path, page_index=0, translated_pa
                 else:
                     trans_frag = ""
                 frag_attr_trans.append((trans_frag, attrs))
+                frag_styles.append(_fragment_style(attrs))
                 color, underline, bold, escapement, font_size = attrs
                 table_rows.append((frag, trans_frag, color, underline, bold, escapement, font_size))
-            # 手动递减字号写入译文，直到适应文本框高度
+            # 按估算高度选择译文字号，直到适应文本框高度；
+            # 文本框高度（UNO调用）和估算行数与字号无关，每个文本框只取一次
             box_height = shape.getSize().Height
-            min_font_size = 8
+            total_lines = len(content_queue) + len(frag_attr_trans)
             # 取原字号最小值作为起点
-            font_sizes = [attrs[-1] for _, attrs in frag_attr_trans if attrs[-1] > 0]
-            if not font_sizes:
-                font_size = 18
-            else:
-                font_size = min(font_sizes)
-            while font_size >= min_font_size:
-                # 先清除原有译文（只保留原文）
-                text.setString("")
-                cursor.gotoEnd(False)
-                # 重新写入原文
-                for frag, attrs in zip(content_queue, attr_queue):
-                    color, underline, bold, escapement, orig_font_size = attrs
-                    text.insertString(cursor, frag, False)
-                    cursor.goLeft(len(frag), True)
-                    cursor.CharColor = color
-                    cursor.CharUnderline = 1 if underline else 0
-                    cursor.CharWeight = 150 if bold else 100
-                    cursor.CharEscapement = escapement
-                    if escapement != 0:
-                        cursor.CharHeight = orig_font_size * 0.6
-                    else:
-                        cursor.CharHeight = orig_font_size
-                    cursor.gotoEnd(False)
-                # 写入译文
-                for trans_frag, attrs in frag_attr_trans:
-                    color, underline, bold, escapement, _ = attrs
-                    text.insertString(cursor, trans_frag, False)
-                    cursor.goLeft(len(trans_frag), True)
-                    cursor.CharColor = color
-                    cursor.CharUnderline = 1 if underline else 0
-                    cursor.CharWeight = 150 if bold else 100
-                    cursor.CharEscapement = escapement
-                    if escapement != 0:
-                        cursor.CharHeight = font_size * 0.6
-                    else:
-                        cursor.CharHeight = font_size
-                    cursor.gotoEnd(False)
-                # 检查文本高度是否适应
-                # 这里用文本框内容行数*字号估算高度（简化版）
-                total_lines = (len(content_queue) + len(frag_attr_trans))
-                if font_size * 1.5 * total_lines < box_height:
-                    break
-                font_size -= 1
+            font_size = min((attrs[-1] for _, attrs in frag_attr_trans if attrs[-1] > 0), default=_DEFAULT_FONT_SIZE)
+            if font_size >= _MIN_FONT_SIZE:
+                # 用文本框内容行数*字号估算高度（简化版），与字号呈线性关系，
+                # 直接求出从起点逐次减1后第一个满足 font_size * 1.5 * total_lines < box_height 的字号，
+                # 不满足时停在不小于 _MIN_FONT_SIZE 的最小字号
+                font_size = _fit_font_size(font_size, _MIN_FONT_SIZE, total_lines, box_height)
+            # 文本框中的现有文本就是原文：保留它（连同段落的对齐、间距、项目符号等格式），
+            # 不再用 setString("") 清空后逐片段重写，只在末尾追加译文
+            cursor.gotoEnd(False)
+            for (trans_frag, _), style in zip(frag_attr_trans, frag_styles):
+                # 空译文（译文行数不足时）不需要任何UNO调用
+                if trans_frag:
+                    _write_fragment(text, cursor, trans_frag, style, font_size)
 
     # 输出检测表格
     print(f"{'原文片段':<30} | {'译文片段':<30} | {'颜色':<8} | {'下划线':<4} | {'加粗':<4} | {'上下标':<6} | {'字号':<6}")
@@ -7,236 +7,300 @@ import uno # type: ignore
 import sys, os
 import argparse
 import json
+import threading
+import concurrent.futures
 from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(__file__))
 from logger_config import get_logger, log_function_call, log_execution_time, setup_subprocess_logging
 
-def convert_pptx_to_odp_pyuno(pptx_path, output_dir=None):
+# UNO连接地址
+UNO_URL = "uno:socket,host=localhost,port=2002;urp;StarOffice.ComponentContext"
+
+# 转换模式 -> (输出扩展名, 保存过滤器名称, 输入格式, 输出格式)
+CONVERSION_MODES = {
+    'pptx2odp': (".odp", "impress8", "PPTX", "ODP"),  # ODP格式的过滤器名称
+    'odp2pptx': (".pptx", "Impress MS PowerPoint 2007 XML", "ODP", "PPTX"),  # PPTX格式的过滤器名称
+}
+
+# 同一进程内复用的桌面服务，避免每次转换都重新建立UNO桥接
+_desktop = None
+_desktop_lock = threading.Lock()
+
+
+def _property_value(name, value):
+    """创建 PropertyValue 结构"""
+    prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+# 加载文档时设置为隐藏模式；参数不变，只构建一次
+_LOAD_PROPS = (_property_value("Hidden", True),)
+# 各转换模式的保存参数：过滤器 + 覆盖已存在文件
+_SAVE_PROPS = {
+    mode: (_property_value("FilterName", filter_name), _property_value("Overwrite", True))
+    for mode, (_, filter_name, _, _) in CONVERSION_MODES.items()
+}
+
+
+def _get_desktop():
+    """获取（必要时连接并缓存）LibreOffice桌面服务"""
+    global _desktop
+    with _desktop_lock:
+        if _desktop is None:
+            # 连接到LibreOffice
+            localContext = uno.getComponentContext()
+            resolver = localContext.ServiceManager.createInstanceWithContext(
+                "com.sun.star.bridge.UnoUrlResolver", localContext)
+            context = resolver.resolve(UNO_URL)
+
+            # 获取桌面服务
+            _desktop = context.ServiceManager.createInstanceWithContext(
+                "com.sun.star.frame.Desktop", context)
+        return _desktop
+
+
+def _reset_desktop():
+    """丢弃缓存的桌面服务（连接可能已失效），下次使用时重新连接"""
+    global _desktop
+    with _desktop_lock:
+        _desktop = None
+
+
+def _load_document(input_path, mode, desktop):
     """
-    使用PyUNO接口将PPTX文件转换为ODP文件
-    :param pptx_path: 输入的PPTX文件路径
-    :param output_dir: 输出目录（默认为PPTX文件所在目录）
-    :return: 转换后ODP文件路径，失败返回None
+    以隐藏模式打开输入文件
+    :return: 文档对象，文件不存在或无法加载时返回None；UNO连接异常向上抛出
     """
     logger = get_logger("pyuno.subprocess")
-    
-    if not os.path.exists(pptx_path):
-        logger.error(f"PPTX文件不存在: {pptx_path}")
+    _, _, source_format, target_format = CONVERSION_MODES[mode]
+
+    if not os.path.exists(input_path):
+        logger.error(f"{source_format}文件不存在: {input_path}")
+        return None
+
+    logger.info(f"使用PyUNO接口转换{source_format}到{target_format}: {input_path}")
+
+    # 打开输入文件
+    file_url = uno.systemPathToFileUrl(os.path.abspath(input_path))
+    logger.debug(f"打开{source_format}文件: {file_url}")
+
+    presentation = desktop.loadComponentFromURL(file_url, "_blank", 0, _LOAD_PROPS)
+    if not presentation:
+        logger.error(f"无法加载{source_format}文件")
         return None
+    return presentation
+
+
+def _store_document(presentation, input_path, output_dir, mode):
+    """
+    将已打开的文档保存为目标格式并关闭
+    :return: 转换后文件路径，失败返回None
+    """
+    logger = get_logger("pyuno.subprocess")
+    extension, _, source_format, target_format = CONVERSION_MODES[mode]
 
     if output_dir is None:
-        output_dir = os.path.dirname(pptx_path)
+        output_dir = os.path.dirname(input_path)
 
     try:
-        logger.info(f"使用PyUNO接口转换PPTX到ODP: {pptx_path}")
-        
-        # 连接到LibreOffice
-        localContext = uno.getComponentContext()
-        resolver = localContext.ServiceManager.createInstanceWithContext(
-            "com.sun.star.bridge.UnoUrlResolver", localContext)
-        context = resolver.resolve(
-            "uno:socket,host=localhost,port=2002;urp;StarOffice.ComponentContext")
-        
-        # 获取桌面服务
-        desktop = context.ServiceManager.createInstanceWithContext(
-            "com.sun.star.frame.Desktop", context)
-        
-        # 打开PPTX文件
-        file_url = uno.systemPathToFileUrl(os.path.abspath(pptx_path))
-        logger.debug(f"打开PPTX文件: {file_url}")
-        
-        # 加载文档时设置为隐藏模式
-        props = []
-        prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        prop.Name = "Hidden"
-        prop.Value = True
-        props.append(prop)
-        
-        presentation = desktop.loadComponentFromURL(file_url, "_blank", 0, tuple(props))
-        
-        if not presentation:
-            logger.error("无法加载PPTX文件")
-            return None
-        
-        # 生成ODP输出路径
-        base_name = os.path.splitext(os.path.basename(pptx_path))[0]
-        odp_path = os.path.join(output_dir, base_name + ".odp")
-        output_url = uno.systemPathToFileUrl(os.path.abspath(odp_path))
-        
-        logger.debug(f"保存为ODP文件: {output_url}")
-        
-        # 设置保存参数为ODP格式
-        save_props = []
-        
-        # 设置过滤器为ODP格式
-        filter_prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        filter_prop.Name = "FilterName"
-        filter_prop.Value = "impress8"  # ODP格式的过滤器名称
-        save_props.append(filter_prop)
-        
-        # 设置覆盖已存在文件
-        overwrite_prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        overwrite_prop.Name = "Overwrite"
-        overwrite_prop.Value = True
-        save_props.append(overwrite_prop)
-        
-        # 保存为ODP格式
-        presentation.storeToURL(output_url, tuple(save_props))
-        
+        # 生成输出路径
+        base_name = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(output_dir, base_name + extension)
+        output_url = uno.systemPathToFileUrl(os.path.abspath(output_path))
+
+        logger.debug(f"保存为{target_format}文件: {output_url}")
+
+        # 按目标格式保存
+        presentation.storeToURL(output_url, _SAVE_PROPS[mode])
+
         # 关闭文档
         presentation.close(True)
-        
+        presentation = None
+
         # 验证文件是否创建成功
-        if os.path.exists(odp_path):
-            logger.info(f"✅ PPTX转ODP成功: {odp_path}")
-            return odp_path
+        if os.path.exists(output_path):
+            logger.info(f"✅ {source_format}转{target_format}成功: {output_path}")
+            return output_path
         else:
-            logger.error("ODP文件保存失败，文件不存在")
+            logger.error(f"{target_format}文件保存失败，文件不存在")
             return None
-            
+
     except Exception as e:
-        logger.error(f"PyUNO转换PPTX到ODP时出错: {e}", exc_info=True)
+        logger.error(f"PyUNO转换{source_format}到{target_format}时出错: {e}", exc_info=True)
         # 尝试关闭可能打开的文档
         try:
-            if 'presentation' in locals() and presentation:
+            if presentation:
                 presentation.close(True)
         except:
             pass
         return None
 
-def convert_odp_to_pptx_pyuno(odp_path, output_dir=None):
+
+def _convert_pyuno(input_path, output_dir, mode, desktop=None):
+    """
+    使用PyUNO接口按转换模式转换文件
+    :param input_path: 输入文件路径
+    :param output_dir: 输出目录（默认为输入文件所在目录）
+    :param mode: 转换模式，见 CONVERSION_MODES
+    :param desktop: 已连接的桌面服务（可选，默认使用缓存的连接）
+    :return: 转换后文件路径，失败返回None
+    """
+    logger = get_logger("pyuno.subprocess")
+    _, _, source_format, target_format = CONVERSION_MODES[mode]
+
+    try:
+        if desktop is None:
+            desktop = _get_desktop()
+        presentation = _load_document(input_path, mode, desktop)
+    except Exception as e:
+        logger.error(f"PyUNO转换{source_format}到{target_format}时出错: {e}", exc_info=True)
+        # 连接可能已断开，下次重新连接
+        _reset_desktop()
+        return None
+
+    if not presentation:
+        return None
+    return _store_document(presentation, input_path, output_dir, mode)
+
+
+def convert_pptx_to_odp_pyuno(pptx_path, output_dir=None, desktop=None):
+    """
+    使用PyUNO接口将PPTX文件转换为ODP文件
+    :param pptx_path: 输入的PPTX文件路径
+    :param output_dir: 输出目录（默认为PPTX文件所在目录）
+    :param desktop: 已连接的桌面服务（可选，默认使用缓存的连接）
+    :return: 转换后ODP文件路径，失败返回None
+    """
+    return _convert_pyuno(pptx_path, output_dir, 'pptx2odp', desktop)
+
+
+def convert_odp_to_pptx_pyuno(odp_path, output_dir=None, desktop=None):
     """
     使用PyUNO接口将ODP文件转换为PPTX文件
     :param odp_path: 输入的ODP文件路径
     :param output_dir: 输出目录（默认为ODP文件所在目录）
+    :param desktop: 已连接的桌面服务（可选，默认使用缓存的连接）
     :return: 转换后PPTX文件路径，失败返回None
     """
-    logger = get_logger("pyuno.subprocess")
-    
-    if not os.path.exists(odp_path):
-        logger.error(f"ODP文件不存在: {odp_path}")
-        return None
+    return _convert_pyuno(odp_path, output_dir, 'odp2pptx', desktop)
 
-    if output_dir is None:
-        output_dir = os.path.dirname(odp_path)
+
+def convert_many(paths, mode, output_dir=None):
+    """
+    批量转换文件，所有文件共用同一个UNO连接
+
+    保存与加载流水线执行：上一个文件在后台线程中保存时，主线程已开始加载下一个文件，
+    同一时刻最多只有一个文件在保存，打开的文档数不超过两个。
+    :param paths: 输入文件路径列表
+    :param mode: 转换模式：pptx2odp 或 odp2pptx
+    :param output_dir: 输出目录（默认为各输入文件所在目录）
+    :return: 与输入顺序对应的转换结果路径列表，失败项为None
+    """
+    logger = get_logger("pyuno.subprocess")
+    _, _, source_format, target_format = CONVERSION_MODES[mode]
+    results = [None] * len(paths)
 
     try:
-        logger.info(f"使用PyUNO接口转换ODP到PPTX: {odp_path}")
-        
-        # 连接到LibreOffice
-        localContext = uno.getComponentContext()
-        resolver = localContext.ServiceManager.createInstanceWithContext(
-            "com.sun.star.bridge.UnoUrlResolver", localContext)
-        context = resolver.resolve(
-            "uno:socket,host=localhost,port=2002;urp;StarOffice.ComponentContext")
-        
-        # 获取桌面服务
-        desktop = context.ServiceManager.createInstanceWithContext(
-            "com.sun.star.frame.Desktop", context)
-        
-        # 打开ODP文件
-        file_url = uno.systemPathToFileUrl(os.path.abspath(odp_path))
-        logger.debug(f"打开ODP文件: {file_url}")
-        
-        # 加载文档时设置为隐藏模式
-        props = []
-        prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        prop.Name = "Hidden"
-        prop.Value = True
-        props.append(prop)
-        
-        presentation = desktop.loadComponentFromURL(file_url, "_blank", 0, tuple(props))
-        
-        if not presentation:
-            logger.error("无法加载ODP文件")
-            return None
-        
-        # 生成PPTX输出路径
-        base_name = os.path.splitext(os.path.basename(odp_path))[0]
-        pptx_path = os.path.join(output_dir, base_name + ".pptx")
-        output_url = uno.systemPathToFileUrl(os.path.abspath(pptx_path))
-        
-        logger.debug(f"保存为PPTX文件: {output_url}")
-        
-        # 设置保存参数为PPTX格式
-        save_props = []
-        
-        # 设置过滤器为PPTX格式
-        filter_prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        filter_prop.Name = "FilterName"
-        filter_prop.Value = "Impress MS PowerPoint 2007 XML"  # PPTX格式的过滤器名称
-        save_props.append(filter_prop)
-        
-        # 设置覆盖已存在文件
-        overwrite_prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        overwrite_prop.Name = "Overwrite"
-        overwrite_prop.Value = True
-        save_props.append(overwrite_prop)
-        
-        # 保存为PPTX格式
-        presentation.storeToURL(output_url, tuple(save_props))
-        
-        # 关闭文档
-        presentation.close(True)
-        
-        # 验证文件是否创建成功
-        if os.path.exists(pptx_path):
-            logger.info(f"✅ ODP转PPTX成功: {pptx_path}")
-            return pptx_path
-        else:
-            logger.error("PPTX文件保存失败，文件不存在")
-            return None
-            
+        desktop = _get_desktop()
     except Exception as e:
-        logger.error(f"PyUNO转换ODP到PPTX时出错: {e}", exc_info=True)
-        # 尝试关闭可能打开的文档
-        try:
-            if 'presentation' in locals() and presentation:
-                presentation.close(True)
-        except:
-            pass
-        return None
+        logger.error(f"连接LibreOffice失败: {e}", exc_info=True)
+        return results
 
-def main():
+    pending = None  # (结果下标, 保存任务)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='uno-store') as store_pool:
+        for index, path in enumerate(paths):
+            try:
+                presentation = _load_document(path, mode, desktop)
+            except Exception as e:
+                logger.error(f"PyUNO转换{source_format}到{target_format}时出错: {e}", exc_info=True)
+                presentation = None
+                # 连接可能已失效，重新连接后继续处理剩余文件
+                _reset_desktop()
+                try:
+                    desktop = _get_desktop()
+                except Exception as e:
+                    logger.error(f"重新连接LibreOffice失败: {e}", exc_info=True)
+                    break
+
+            # 等待上一个文件保存完成，再提交当前文件的保存
+            if pending is not None:
+                results[pending[0]] = pending[1].result()
+                pending = None
+            if presentation:
+                pending = (index, store_pool.submit(_store_document, presentation, path, output_dir, mode))
+
+        if pending is not None:
+            results[pending[0]] = pending[1].result()
+
+    return results
+
+
+def _run_batch(args, logger):
     """
-    主程序入口 - 支持子进程调用
+    批量转换 --input-list 中列出的文件
     """
-    # 设置子进程日志
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    logs_dir = os.path.join(current_dir, "logs")
-    
-    # 确保logs目录存在
-    if not os.path.exists(logs_dir):
-        os.makedirs(logs_dir)
+    with open(args.input_list, "r", encoding="utf-8") as f:
+        input_paths = [os.path.abspath(line.strip()) for line in f if line.strip()]
     
-    log_file = os.path.join(logs_dir, "conversion_functions_subprocess.log")
-    logger = setup_subprocess_logging(log_file)
+    output_dir = os.path.abspath(args.output) if args.output else None
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        logger.debug(f"创建输出目录: {output_dir}")
     
-    logger.info("=" * 60)
-    logger.info("启动conversion_functions子进程")
-    logger.info("=" * 60)
+    logger.info(f"批量转换模式: {args.mode}，共 {len(input_paths)} 个文件")
     
-    parser = argparse.ArgumentParser(description='PPTX/ODP格式转换工具')
-    parser.add_argument('--mode', required=True, choices=['pptx2odp', 'odp2pptx'], 
-                       help='转换模式：pptx2odp 或 odp2pptx')
-    parser.add_argument('--input', required=True, help='输入文件路径')
-    parser.add_argument('--output', required=True, help='输出文件路径')
+    try:
+        output_paths = convert_many(input_paths, args.mode, output_dir)
+    except Exception as e:
+        logger.error(f"批量转换过程中出错: {e}", exc_info=True)
+        return 1
     
-    args = parser.parse_args()
+    results = [
+        {
+            'success': output_path is not None,
+            'output_path': output_path,
+            'input_path': input_path
+        }
+        for input_path, output_path in zip(input_paths, output_paths)
+    ]
+    success_count = sum(1 for item in results if item['success'])
+    logger.info(f"批量转换完成: 成功 {success_count}/{len(results)}")
     
+    # 输出结果到标准输出（供主进程读取）
+    print(json.dumps({
+        'success': success_count == len(results),
+        'mode': args.mode,
+        'results': results
+    }))
+    return 0 if success_count == len(results) else 1
+
+def _convert_single(mode, input_path, output_path, logger):
+    """
+    转换单个文件到指定输出路径
+    :return: 成功时返回结果字典，失败返回None
+    """
+    if mode not in CONVERSION_MODES:
+        logger.error(f"不支持的转换模式: {mode}")
+        return None
+    if not input_path or not output_path:
+        logger.error("缺少输入或输出文件路径")
+        return None
+
     # 统一路径为绝对路径，避免cwd差异
-    abs_input = os.path.abspath(args.input)
-    abs_output = os.path.abspath(args.output)
+    abs_input = os.path.abspath(input_path)
+    abs_output = os.path.abspath(output_path)
 
-    logger.info(f"转换模式: {args.mode}")
+    logger.info(f"转换模式: {mode}")
     logger.info(f"输入文件: {abs_input}")
     logger.info(f"输出文件: {abs_output}")
     
     # 检查输入文件是否存在
     if not os.path.exists(abs_input):
         logger.error(f"输入文件不存在: {abs_input}")
-        return 1
+        return None
     
     # 确保输出目录存在
     output_dir = os.path.dirname(abs_output)
@@ -245,13 +309,7 @@ def main():
         logger.debug(f"创建输出目录: {output_dir}")
     
     try:
-        if args.mode == 'pptx2odp':
-            result_path = convert_pptx_to_odp_pyuno(abs_input, output_dir)
-        elif args.mode == 'odp2pptx':
-            result_path = convert_odp_to_pptx_pyuno(abs_input, output_dir)
-        else:
-            logger.error(f"不支持的转换模式: {args.mode}")
-            return 1
+        result_path = _convert_pyuno(abs_input, output_dir, mode)
         
         if result_path:
             # 如果输出路径与指定路径不同，重命名
@@ -259,24 +317,98 @@ def main():
                 os.rename(result_path, abs_output)
                 logger.info(f"重命名输出文件: {abs_output}")
             
-            logger.info(f"✅ 转换成功: {args.output}")
-            
-            # 输出结果到标准输出（供主进程读取）
-            result = {
+            logger.info(f"✅ 转换成功: {output_path}")
+            return {
                 'success': True,
                 'output_path': abs_output,
                 'input_path': abs_input,
-                'mode': args.mode
+                'mode': mode
             }
-            print(json.dumps(result))
-            return 0
         else:
             logger.error("转换失败")
-            return 1
+            return None
             
     except Exception as e:
         logger.error(f"转换过程中出错: {e}", exc_info=True)
+        return None
+
+def _run_server(logger):
+    """
+    常驻模式：从标准输入逐行读取JSON请求，每个请求向标准输出写一行JSON响应
+
+    请求格式: {"id": ..., "mode": "pptx2odp", "input": "...", "output": "..."}，
+    {"command": "shutdown"} 结束进程。响应带回请求的 id；标准输出中也会混有日志行，
+    调用方按 id 识别响应。解释器、uno模块和UNO连接在多次转换之间复用。
+    """
+    logger.info("进入常驻转换模式，等待请求...")
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError:
+            logger.error(f"无法解析请求: {line}")
+            continue
+        if request.get('command') == 'shutdown':
+            logger.info("收到退出请求")
+            break
+        
+        result = _convert_single(request.get('mode'), request.get('input'), request.get('output'), logger)
+        response = result or {'success': False, 'input_path': request.get('input'), 'mode': request.get('mode')}
+        response['id'] = request.get('id')
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+    return 0
+
+def main():
+    """
+    主程序入口 - 支持子进程调用
+    """
+    # 设置子进程日志
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    logs_dir = os.path.join(current_dir, "logs")
+    
+    # 确保logs目录存在
+    if not os.path.exists(logs_dir):
+        os.makedirs(logs_dir)
+    
+    log_file = os.path.join(logs_dir, "conversion_functions_subprocess.log")
+    logger = setup_subprocess_logging(log_file)
+    
+    logger.info("=" * 60)
+    logger.info("启动conversion_functions子进程")
+    logger.info("=" * 60)
+    
+    parser = argparse.ArgumentParser(description='PPTX/ODP格式转换工具')
+    parser.add_argument('--mode', choices=['pptx2odp', 'odp2pptx'], 
+                       help='转换模式：pptx2odp 或 odp2pptx（常驻模式下由每个请求指定）')
+    parser.add_argument('--input', help='输入文件路径')
+    parser.add_argument('--output', help='输出文件路径（批量模式下为输出目录，可选）')
+    parser.add_argument('--input-list', help='批量模式：每行一个输入文件路径的文本文件，所有文件共用一个UNO连接')
+    parser.add_argument('--server', action='store_true', help='常驻模式：从标准输入逐行读取JSON转换请求')
+    
+    args = parser.parse_args()
+    
+    if args.server:
+        return _run_server(logger)
+    
+    if not args.mode:
+        parser.error('需要指定 --mode')
+    
+    if args.input_list:
+        return _run_batch(args, logger)
+    
+    if not args.input or not args.output:
+        parser.error('单文件模式需要同时指定 --input 和 --output')
+    
+    result = _convert_single(args.mode, args.input, args.output, logger)
+    if not result:
         return 1
+    
+    # 输出结果到标准输出（供主进程读取）
+    print(json.dumps(result))
+    return 0
 
 if __name__ == "__main__":
     exit_code = main()
@@ -9,6 +9,18 @@ from logger_config import get_logger, log_function_call, log_execution_time
 from write_ppt_page_uno import write_from_presentation, validate_paragraph_structure
 from datetime import datetime
 
+def _property_value(name, value):
+    """创建 PropertyValue 结构"""
+    prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+# 加载/保存参数不随调用变化，模块加载时构建一次：隐藏窗口 + ODP过滤器（因为我们处理的是ODP文件）
+_LOAD_PROPS = (_property_value("Hidden", True), _property_value("FilterName", "impress8"))
+# 保存为ODP格式，允许覆盖现有文件
+_SAVE_PROPS = (_property_value("FilterName", "impress8"), _property_value("Overwrite", True))
+
 def connect_to_libreoffice():
     """连接本地soffice服务"""
     try:
@@ -151,20 +163,7 @@ def write_entire_ppt_direct(input_ppt, output_ppt, translated_data, mode='paragr
         abs_input_ppt = os.path.abspath(input_ppt)
         file_url = uno.systemPathToFileUrl(abs_input_ppt)
 
-        load_props = []
-
-        hidden_prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        hidden_prop.Name = "Hidden"
-        hidden_prop.Value = True
-        load_props.append(hidden_prop)
-
-        # 指定文件过滤器
-        filter_prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        filter_prop.Name = "FilterName"
-        filter_prop.Value = "impress8"  # 因为我们处理的是ODP文件
-        load_props.append(filter_prop)
-
-        presentation = desktop.loadComponentFromURL(file_url, "_blank", 0, tuple(load_props))
+        presentation = desktop.loadComponentFromURL(file_url, "_blank", 0, _LOAD_PROPS)
         slides = presentation.getDrawPages()
         logger.info(f"PPT总页数: {slides.getCount()}")
         
@@ -247,23 +246,8 @@ def write_entire_ppt_direct(input_ppt, output_ppt, translated_data, mode='paragr
         file_url_save = uno.systemPathToFileUrl(abs_output_ppt)
         logger.info(f"保存PPT到: {file_url_save}")
 
-        # 设置保存属性（关键修复）
-        save_props = []
-
-        # 指定ODP格式过滤器
-        filter_prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        filter_prop.Name = "FilterName"
-        filter_prop.Value = "impress8"  # ODP格式
-        save_props.append(filter_prop)
-
-        # 允许覆盖现有文件
-        overwrite_prop = uno.createUnoStruct('com.sun.star.beans.PropertyValue')
-        overwrite_prop.Name = "Overwrite"
-        overwrite_prop.Value = True
-        save_props.append(overwrite_prop)
-
-        # 保存文件（使用正确的参数）
-        presentation.storeToURL(file_url_save, tuple(save_props))
+        # 保存文件（ODP过滤器 + 覆盖）
+        presentation.storeToURL(file_url_save, _SAVE_PROPS)
         logger.info(f"已保存到 {abs_output_ppt}")
         
         # 6. 关闭文件
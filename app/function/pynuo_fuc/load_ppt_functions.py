@@ -16,6 +16,31 @@ from read_ppt_page_uno import connect_to_libreoffice, read_slide_texts_improved,
 from logger_config import get_logger, log_function_call, log_execution_time, setup_subprocess_logging
 
 
+def _property_value(name, value):
+    """创建 PropertyValue 结构"""
+    prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+# 文件扩展名 -> 加载过滤器；未知格式使用 impress8
+_LOAD_FILTERS = {
+    ".odp": "impress8",
+    ".pptx": "Impress MS PowerPoint 2007 XML",
+}
+_DEFAULT_LOAD_FILTER = "impress8"
+# 加载参数（隐藏窗口、只读模式、文件格式过滤器）不随调用变化，模块加载时按过滤器构建一次
+_LOAD_PROPS = {
+    filter_name: (
+        _property_value("Hidden", True),
+        _property_value("ReadOnly", True),
+        _property_value("FilterName", filter_name),
+    )
+    for filter_name in set(_LOAD_FILTERS.values()) | {_DEFAULT_LOAD_FILTER}
+}
+
+
 def load_entire_ppt_direct(ppt_path, page_indices=None):
     """
     直接读入整个PPT文件，返回指定页面的内容（包含段落层级）
@@ -50,38 +75,17 @@ def load_entire_ppt_direct(ppt_path, page_indices=None):
 
         file_url = uno.systemPathToFileUrl(abs_ppt_path)
 
-        # 设置加载属性（关键修复）
-        properties = []
-
-        # 隐藏窗口
-        hidden_prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
-        hidden_prop.Name = "Hidden"
-        hidden_prop.Value = True
-        properties.append(hidden_prop)
-
-        # 只读模式
-        readonly_prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
-        readonly_prop.Name = "ReadOnly"
-        readonly_prop.Value = True
-        properties.append(readonly_prop)
-
         # 关键：指定文件格式过滤器
-        filter_prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
-        filter_prop.Name = "FilterName"
         file_ext = os.path.splitext(abs_ppt_path.lower())[1]
-        if file_ext == ".odp":
-            filter_prop.Value = "impress8"
-            logger.info("设置ODP文件过滤器: impress8")
-        elif file_ext == ".pptx":
-            filter_prop.Value = "Impress MS PowerPoint 2007 XML"
-            logger.info("设置PPTX文件过滤器: Impress MS PowerPoint 2007 XML")
+        filter_name = _LOAD_FILTERS.get(file_ext)
+        if filter_name:
+            logger.info(f"设置{file_ext[1:].upper()}文件过滤器: {filter_name}")
         else:
-            filter_prop.Value = "impress8"
-            logger.warning(f"未知文件格式{file_ext}，使用默认过滤器: impress8")
-        properties.append(filter_prop)
+            filter_name = _DEFAULT_LOAD_FILTER
+            logger.warning(f"未知文件格式{file_ext}，使用默认过滤器: {filter_name}")
 
         logger.debug(f"打开PPT文件: {file_url}")
-        presentation = desktop.loadComponentFromURL(file_url, "_blank", 0, tuple(properties))
+        presentation = desktop.loadComponentFromURL(file_url, "_blank", 0, _LOAD_PROPS[filter_name])
         slides = presentation.getDrawPages()
 
         # 获取总页数
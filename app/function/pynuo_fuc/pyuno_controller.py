@@ -30,6 +30,10 @@ except ImportError as e:
 import subprocess  # 仍需要用于启动soffice服务
 import psutil
 import time
+import atexit
+import itertools
+import queue
+import threading
 import socket
 import tempfile
 import json
@@ -227,6 +231,15 @@ def convert_odp_to_pptx_pyuno(odp_path, output_dir=None):
 
 # 移除直接函数模式，Windows专用子进程模式
 
+def _subprocess_env():
+    """子进程环境变量：把SOFFICE_PATH所在目录加到PATH前面，确保LibreOffice能找到soffice"""
+    env = os.environ.copy()
+    soffice_path = os.environ.get('SOFFICE_PATH')
+    if soffice_path:
+        env['PATH'] = os.path.dirname(soffice_path) + os.pathsep + env.get('PATH', '')
+        get_logger("pyuno.main").debug(f"设置PATH环境变量包含soffice路径: {os.path.dirname(soffice_path)}")
+    return env
+
 def load_ppt_with_subprocess(ppt_path, page_indices=None):
     """
     使用子进程模式加载PPT（Windows推荐，使用LibreOffice自带的Python解释器）
@@ -275,11 +288,7 @@ def load_ppt_with_subprocess(ppt_path, page_indices=None):
         logger.debug(f"子进程命令: {' '.join(cmd)}")
         
         # 设置环境变量，确保LibreOffice能找到soffice
-        env = os.environ.copy()
-        soffice_path = os.environ.get('SOFFICE_PATH')
-        if soffice_path:
-            env['PATH'] = os.path.dirname(soffice_path) + os.pathsep + env.get('PATH', '')
-            logger.debug(f"设置PATH环境变量包含soffice路径: {os.path.dirname(soffice_path)}")
+        env = _subprocess_env()
         
         # 执行子进程
         result = subprocess.run(
@@ -321,6 +330,105 @@ def load_ppt_with_subprocess(ppt_path, page_indices=None):
         logger.error(f"子进程模式加载失败: {e}", exc_info=True)
         return None
 
+# 常驻转换子进程（conversion_functions.py --server），所有格式转换请求复用同一个
+# LibreOffice Python解释器和UNO连接，免去每次转换的进程启动和uno导入开销
+_CONVERSION_TIMEOUT = 300  # 单次转换超时（秒）
+_conversion_server = None  # (Popen, 响应队列)
+_conversion_server_lock = threading.Lock()
+_conversion_request_ids = itertools.count(1)
+
+
+def _read_server_responses(stdout, responses):
+    """后台读取常驻子进程的标准输出，把JSON响应放入队列（日志行忽略），进程退出时放入None"""
+    for line in stdout:
+        line = line.strip()
+        if line.startswith('{') and line.endswith('}'):
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                pass
+    responses.put(None)
+
+
+def _start_conversion_server(libreoffice_python, script_path, env):
+    """启动常驻转换子进程，返回 (Popen, 响应队列)"""
+    proc = subprocess.Popen(
+        [libreoffice_python, script_path, "--server"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        errors='replace',
+        cwd=os.path.dirname(script_path),
+        env=env
+    )
+    responses = queue.Queue()
+    threading.Thread(
+        target=_read_server_responses, args=(proc.stdout, responses),
+        name='conversion-server-reader', daemon=True
+    ).start()
+    return proc, responses
+
+
+def _stop_conversion_server():
+    """通知常驻转换子进程退出（退出超时则强制结束）"""
+    global _conversion_server
+    server, _conversion_server = _conversion_server, None
+    if server is None:
+        return
+    proc = server[0]
+    try:
+        proc.stdin.write(json.dumps({'command': 'shutdown'}) + "\n")
+        proc.stdin.flush()
+        proc.wait(timeout=5)
+    except Exception:
+        proc.kill()
+
+
+atexit.register(_stop_conversion_server)
+
+
+def _convert_with_server(mode, input_path, output_path, libreoffice_python, script_path, env):
+    """
+    通过常驻转换子进程完成一次转换
+    
+    Returns:
+        dict: 子进程返回的结果；常驻子进程不可用（启动失败、退出或超时）时返回None，
+        调用方应回退到一次性子进程
+    """
+    global _conversion_server
+    logger = get_logger("pyuno.main")
+    
+    with _conversion_server_lock:
+        try:
+            if _conversion_server is None or _conversion_server[0].poll() is not None:
+                logger.info("启动常驻转换子进程")
+                _conversion_server = _start_conversion_server(libreoffice_python, script_path, env)
+            proc, responses = _conversion_server
+            
+            request_id = next(_conversion_request_ids)
+            proc.stdin.write(json.dumps({
+                'id': request_id,
+                'mode': mode,
+                'input': input_path,
+                'output': output_path
+            }) + "\n")
+            proc.stdin.flush()
+            
+            deadline = time.monotonic() + _CONVERSION_TIMEOUT
+            while True:
+                response = responses.get(timeout=max(0, deadline - time.monotonic()))
+                if response is None:
+                    raise EOFError("常驻转换子进程已退出")
+                if response.get('id') == request_id:
+                    return response
+        except (OSError, ValueError, EOFError, queue.Empty) as e:
+            logger.warning(f"常驻转换子进程不可用: {e!r}")
+            if _conversion_server is not None:
+                _conversion_server[0].kill()
+                _conversion_server = None
+            return None
+
+
 def convert_with_subprocess(mode, input_path, output_path):
     """
     使用子进程模式进行格式转换（Windows推荐）
@@ -356,6 +464,19 @@ def convert_with_subprocess(mode, input_path, output_path):
         # 构建子进程命令
         script_path = os.path.join(os.path.dirname(__file__), "conversion_functions.py")
         
+        # 设置环境变量，确保LibreOffice能找到soffice
+        env = _subprocess_env()
+        
+        # 优先交给常驻转换子进程
+        output_data = _convert_with_server(mode, abs_input_path, abs_output_path, libreoffice_python, script_path, env)
+        if output_data is not None:
+            if output_data.get('success'):
+                logger.info(f"子进程转换成功: {output_data.get('output_path')}")
+                return output_data.get('output_path')
+            logger.error(f"常驻子进程转换失败: {output_data}")
+            return None
+        
+        logger.info("回退到一次性子进程进行转换")
         cmd = [
             libreoffice_python, script_path,
             "--mode", mode,
@@ -366,18 +487,14 @@ def convert_with_subprocess(mode, input_path, output_path):
         logger.debug(f"子进程命令: {' '.join(cmd)}")
         
         # 设置环境变量，确保LibreOffice能找到soffice
-        env = os.environ.copy()
-        soffice_path = os.environ.get('SOFFICE_PATH')
-        if soffice_path:
-            env['PATH'] = os.path.dirname(soffice_path) + os.pathsep + env.get('PATH', '')
-            logger.debug(f"设置PATH环境变量包含soffice路径: {os.path.dirname(soffice_path)}")
+        env = _subprocess_env()
         
         # 执行子进程
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=300,  # 5分钟超时
+            timeout=_CONVERSION_TIMEOUT,  # 5分钟超时
             cwd=os.path.dirname(script_path),
             env=env
         )
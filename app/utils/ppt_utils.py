@@ -8,6 +8,12 @@ import logging
 from typing import Optional, Tuple, Any
 from pptx.dml.color import RGBColor
 
+# 可选依赖：RapidFuzz 批量模糊匹配（C实现），未安装时回退到 difflib
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,15 +92,32 @@ def find_most_similar(target: str, candidates: list, threshold: float = 0.6) ->
     if not target or not candidates:
         return target
     
+    if process is not None:
+        # 与 difflib 路径一致，跳过空候选；一次调用在C层完成对全部候选的打分
+        result = process.extractOne(
+            target,
+            [candidate for candidate in candidates if candidate],
+            scorer=fuzz.ratio,
+            processor=str.lower,
+            score_cutoff=threshold * 100,
+        )
+        return result[0] if result else target
+    
     best_match = target
     best_ratio = 0
     
+    # 目标串放在 seq1、候选串放在 seq2（ratio 不对称，角色与逐个比较时保持一致）
+    matcher = difflib.SequenceMatcher(None, target.lower())
     for candidate in candidates:
         if not candidate:
             continue
         
-        # 使用序列匹配器计算相似度
-        ratio = difflib.SequenceMatcher(None, target.lower(), candidate.lower()).ratio()
+        # 使用序列匹配器计算相似度；先用廉价的上界排除不可能胜出的候选
+        matcher.set_seq2(candidate.lower())
+        floor = max(best_ratio, threshold)
+        if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+            continue
+        ratio = matcher.ratio()
         
         if ratio > best_ratio and ratio >= threshold:
             best_ratio = ratio